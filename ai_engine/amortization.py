@@ -0,0 +1,95 @@
+"""
+Fin AI – Amortization Schedules
+Full month-by-month schedules for level-payment loans.  Every row comes
+from the closed-form balance in ``finance``, so month 300 of a 360-month
+mortgage costs the same as month 1, rows are produced lazily by a
+generator and pages are addressed by a month cursor.
+"""
+
+from ai_engine import finance
+
+MAX_TENURE_MONTHS = 600
+MAX_PAGE = 120
+
+
+class AmortizationSchedule:
+
+    __slots__ = ('principal', 'annual_rate', 'tenure_months', 'rate', 'emi')
+
+    def __init__(self, principal, annual_rate, tenure_months):
+        self.principal = float(principal)
+        self.annual_rate = float(annual_rate)
+        self.tenure_months = int(tenure_months)
+        self.rate = self.annual_rate / 12 / 100
+        self.emi = finance.emi(self.principal, self.rate, self.tenure_months)
+
+    @classmethod
+    def from_request(cls, data):
+        """Build from a request payload, or return an ``{'error': ...}`` dict."""
+        try:
+            principal = float(data.get('principal', data.get('amount', 0)))
+            annual_rate = float(data.get('annual_rate', data.get('interest_rate', 10)))
+            tenure = int(data.get('tenure_months', 12))
+        except (TypeError, ValueError):
+            return {'error': 'principal, annual_rate and tenure_months must be numbers.'}
+        if principal <= 0 or annual_rate < 0:
+            return {'error': 'Provide a positive principal and a non-negative rate.'}
+        if not 1 <= tenure <= MAX_TENURE_MONTHS:
+            return {'error': f'tenure_months must be between 1 and {MAX_TENURE_MONTHS}.'}
+        return cls(principal, annual_rate, tenure)
+
+    def balance(self, month):
+        """Balance outstanding after ``month`` payments."""
+        if month <= 0:
+            return self.principal
+        if month >= self.tenure_months:
+            return 0.0
+        return finance.balance(self.principal, self.rate, self.tenure_months, month)
+
+    def row(self, month):
+        """One schedule row, computed directly in O(1)."""
+        opening = self.balance(month - 1)
+        interest = opening * self.rate
+        principal = self.emi - interest
+        closing = self.balance(month)
+        return {
+            'month': month,
+            'emi': round(self.emi, 2),
+            'principal': round(principal, 2),
+            'interest': round(interest, 2),
+            'balance': round(max(0, closing), 2),
+            'total_interest_paid': round(self.emi * month - (self.principal - closing), 2),
+        }
+
+    def iter_rows(self, from_month=1):
+        """Yield rows lazily from ``from_month`` to the end of the tenure."""
+        for month in range(max(1, from_month), self.tenure_months + 1):
+            yield self.row(month)
+
+    def page(self, from_month=1, limit=12):
+        """Rows ``from_month .. from_month + limit - 1`` plus the next cursor."""
+        from_month = max(1, int(from_month))
+        limit = max(1, min(MAX_PAGE, int(limit)))
+        rows = []
+        for row in self.iter_rows(from_month):
+            rows.append(row)
+            if len(rows) == limit:
+                break
+        next_month = from_month + limit
+        return {
+            'summary': self.summary(),
+            'rows': rows,
+            'from_month': from_month,
+            'next_from_month': next_month if next_month <= self.tenure_months else None,
+        }
+
+    def summary(self):
+        total = self.emi * self.tenure_months
+        return {
+            'principal': self.principal,
+            'annual_rate': self.annual_rate,
+            'tenure_months': self.tenure_months,
+            'emi': round(self.emi, 2),
+            'total_repayment': round(total, 2),
+            'total_interest': round(total - self.principal, 2),
+        }
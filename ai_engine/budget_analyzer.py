@@ -2,119 +2,164 @@
 Fin AI – Budget Analyzer
 Uses the 50/30/20 rule to analyze income vs expenses and provide
 AI-powered recommendations for healthier spending patterns.
+Other splits (e.g. 60/20/20) are selected per request from the compiled
+rule sets in ``budget_rules``.
 """
 
+import numpy as np
+
+from ai_engine.budget_rules import (DEFAULT_RULE_SET, NEEDS, RISK_LEVELS, RULE_SETS,
+                                    SAVINGS, WANTS, compile_rule_sets)
+
 
 class BudgetAnalyzer:
-    NEEDS = ['housing', 'utilities', 'groceries', 'transportation', 'insurance', 'healthcare']
-    WANTS = ['entertainment', 'dining_out', 'shopping', 'subscriptions', 'hobbies']
-    SAVINGS = ['savings', 'investments', 'debt_payment', 'emergency_fund']
+    VERSION = 1
+    NEEDS = NEEDS
+    WANTS = WANTS
+    SAVINGS = SAVINGS
+
+    def __init__(self, rule_sets=None):
+        # Compiled once; requests only look a rule set up by name.
+        self.rule_sets = compile_rule_sets(rule_sets or RULE_SETS)
+
+    def _rule_set(self, data):
+        return self.rule_sets.get(data.get('rule_set') or DEFAULT_RULE_SET)
+
+    def analyze_table(self, table, income, rule_set=None):
+        """Analyze a categorized TransactionTable against ``income``."""
+        return self.analyze({'income': income, 'expenses': table.category_totals(),
+                             'rule_set': rule_set})
 
     def analyze(self, data):
         income = float(data.get('income', 0))
         expenses = data.get('expenses', {})
+        rules = self._rule_set(data)
 
+        if rules is None:
+            return {'error': f'Unknown rule set. Choose one of: {", ".join(self.rule_sets)}.'}
         if income <= 0:
             return {'error': 'Please provide a valid income amount.'}
 
-        # Totals by bucket
-        needs_total = sum(float(expenses.get(c, 0)) for c in self.NEEDS)
-        wants_total = sum(float(expenses.get(c, 0)) for c in self.WANTS)
-        savings_total = sum(float(expenses.get(c, 0)) for c in self.SAVINGS)
-        total_expenses = needs_total + wants_total + savings_total
-
-        needs_pct = needs_total / income * 100
-        wants_pct = wants_total / income * 100
-        savings_pct = savings_total / income * 100
-
-        ideal_needs = income * 0.50
-        ideal_wants = income * 0.30
-        ideal_savings = income * 0.20
+        values, unmapped = rules.row(expenses)
+        totals = rules.bucket_totals(values)
+        matched, health_score, risk_level = rules.evaluate(income, totals)
+
+        return self._report(rules, income, expenses, unmapped, totals, matched,
+                            health_score, risk_level)
+
+    def analyze_batch(self, data):
+        """Score a cohort of households at once.
+
+        ``data['households']`` is a list of ``analyze()`` payloads scored
+        with one rule set (``data['rule_set']``).  Bucket totals, health
+        scores and risk levels are computed on a households x categories
+        matrix; each row's result is identical to ``analyze()`` for that
+        household.
+        """
+        rules = self._rule_set(data)
+        if rules is None:
+            return {'error': f'Unknown rule set. Choose one of: {", ".join(self.rule_sets)}.'}
+
+        households = data.get('households', [])
+        n = len(households)
+        income = np.fromiter((float(h.get('income', 0)) for h in households), dtype=np.float64, count=n)
+        matrix, unmapped = rules.matrix(h.get('expenses', {}) for h in households)
+        totals = rules.bucket_totals_matrix(matrix)
+        matched, health, risk = rules.evaluate_matrix(income, totals)
+
+        valid = income > 0
+        total = np.zeros(n)
+        for b in range(totals.shape[1]):
+            total += totals[:, b]
+        pcts = totals / np.where(valid, income, 1.0)[:, None] * 100
+
+        results = []
+        for i, h in enumerate(households):
+            if not valid[i]:
+                results.append({'error': 'Please provide a valid income amount.'})
+                continue
+            results.append(self._report(
+                rules, float(income[i]), h.get('expenses', {}), unmapped[i],
+                totals[i].tolist(), matched[i].tolist(), int(health[i]), str(risk[i])))
+
+        count = int(valid.sum())
+        cohort = {
+            'households': n,
+            'analyzed': count,
+            'rule_set': rules.name,
+            'avg_health_score': round(float(health[valid].mean()), 1) if count else 0,
+            'median_health_score': float(np.median(health[valid])) if count else 0,
+            'risk_levels': {lvl: int(((risk == lvl) & valid).sum()) for lvl in RISK_LEVELS},
+            'overspending_households': int(((total > income) & valid).sum()),
+            'total_income': round(float(income[valid].sum()), 2),
+            'total_expenses': round(float(total[valid].sum()), 2),
+        }
+        for b, name in enumerate(rules.bucket_names):
+            cohort[f'avg_{name}_pct'] = round(float(pcts[valid, b].mean()), 1) if count else 0
+
+        return {'results': results, 'cohort': cohort}
+
+    def _report(self, rules, income, expenses, unmapped, totals, matched,
+                health_score, risk_level):
+        total_expenses = 0.0
+        for t in totals:
+            total_expenses += t
+        pcts = [t / income * 100 for t in totals]
+        ideals = [income * share for share in rules.shares]
+        remaining = income - total_expenses
 
-        #  Recommendations & health score 
+        #  Recommendations
         recommendations = []
-        health_score = 100
-        risk_level = 'low'
-
-        if needs_pct > 55:
-            recommendations.append({
-                'type': 'warning',
-                'category': 'Needs',
-                'message': (f'Essential expenses are {needs_pct:.1f}% of income '
-                            f'(recommended ≤ 50%). Consider reducing housing or utility costs.'),
-                'saving_potential': round(needs_total - ideal_needs, 2),
-            })
-            health_score -= 15
-
-        if wants_pct > 35:
+        for (bucket, _, _, _, _, kind, message), hit in zip(rules.predicates, matched):
+            if not hit or not kind:
+                continue
+            if bucket < 0:
+                amount = total_expenses - income
+                recommendations.append({
+                    'type': kind,
+                    'category': 'Overall',
+                    'message': message.format(amount=amount),
+                    'saving_potential': round(amount, 2),
+                })
+                continue
+            gap = ideals[bucket] - totals[bucket] if rules.at_least[bucket] else totals[bucket] - ideals[bucket]
             recommendations.append({
-                'type': 'warning',
-                'category': 'Wants',
-                'message': (f'Discretionary spending is {wants_pct:.1f}% '
-                            f'(recommended ≤ 30%). Look for areas to cut back.'),
-                'saving_potential': round(wants_total - ideal_wants, 2),
+                'type': kind,
+                'category': rules.labels[bucket],
+                'message': message.format(pct=pcts[bucket], target=rules.targets[bucket]),
+                'saving_potential': round(gap, 2),
             })
-            health_score -= 10
 
-        if savings_pct < 15:
-            recommendations.append({
-                'type': 'critical',
-                'category': 'Savings',
-                'message': (f'Savings rate is {savings_pct:.1f}% '
-                            f'(recommended ≥ 20%). Increase your savings contributions.'),
-                'saving_potential': round(ideal_savings - savings_total, 2),
-            })
-            health_score -= 20
-            risk_level = 'medium'
-
-        if savings_pct < 5:
-            risk_level = 'high'
-            health_score -= 15
-
-        if total_expenses > income:
-            recommendations.append({
-                'type': 'critical',
-                'category': 'Overall',
-                'message': (f'You are spending Ksh {total_expenses - income:,.2f} '
-                            f'more than you earn!'),
-                'saving_potential': round(total_expenses - income, 2),
-            })
-            risk_level = 'high'
-            health_score -= 30
-
-        remaining = income - total_expenses
-        if remaining > 0 and savings_pct >= 20:
+        targets_met = all(pcts[b] >= rules.targets[b]
+                          for b in range(len(totals)) if rules.at_least[b])
+        if rules.success and remaining > 0 and targets_met:
             recommendations.append({
                 'type': 'success',
                 'category': 'Overall',
-                'message': (f'Great job! Ksh {remaining:,.2f} remaining and '
-                            f'you meet the 20% savings target.'),
+                'message': rules.success.format(
+                    remaining=remaining,
+                    **{f'{n}_target': t for n, t in zip(rules.bucket_names, rules.targets)}),
                 'saving_potential': 0,
             })
 
-        #  Expense breakdown 
+        #  Expense breakdown
         all_expenses = {k: float(v) for k, v in expenses.items() if float(v) > 0}
         sorted_expenses = sorted(all_expenses.items(), key=lambda x: x[1], reverse=True)
 
-        budget_data = {
-            'needs': {'amount': needs_total, 'percentage': round(needs_pct, 1),
-                      'ideal': 50, 'status': 'good' if needs_pct <= 50 else 'warning'},
-            'wants': {'amount': wants_total, 'percentage': round(wants_pct, 1),
-                      'ideal': 30, 'status': 'good' if wants_pct <= 30 else 'warning'},
-            'savings': {'amount': savings_total, 'percentage': round(savings_pct, 1),
-                        'ideal': 20, 'status': 'good' if savings_pct >= 20 else 'warning'},
-        }
-
-        optimized = {
-            'needs': round(min(needs_total, ideal_needs), 2),
-            'wants': round(min(wants_total, ideal_wants), 2),
-            'savings': round(max(savings_total, ideal_savings), 2),
-        }
-
-        health_score = max(0, min(100, health_score))
+        budget_data, optimized = {}, {}
+        for b, name in enumerate(rules.bucket_names):
+            if rules.at_least[b]:
+                good = pcts[b] >= rules.targets[b]
+                optimized[name] = round(max(totals[b], ideals[b]), 2)
+            else:
+                good = pcts[b] <= rules.targets[b]
+                optimized[name] = round(min(totals[b], ideals[b]), 2)
+            budget_data[name] = {'amount': totals[b], 'percentage': round(pcts[b], 1),
+                                 'ideal': rules.targets[b], 'status': 'good' if good else 'warning'}
 
         return {
             'income': income,
+            'rule_set': rules.name,
             'total_expenses': round(total_expenses, 2),
             'remaining': round(remaining, 2),
             'health_score': health_score,
@@ -124,4 +169,5 @@ class BudgetAnalyzer:
             'top_expenses': sorted_expenses[:5],
             'optimized_budget': optimized,
             'expense_breakdown': all_expenses,
+            'unmapped_categories': unmapped,
         }
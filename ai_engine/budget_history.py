@@ -0,0 +1,156 @@
+"""
+Fin AI – Budget History
+Monthly budget snapshots per user in finai.db.  Every snapshot row also
+stores running (prefix) sums of its metrics, maintained on insert, so
+any rolling average is the difference of two prefix rows and a trends
+query reads at most the last 13 snapshots through the primary key.
+"""
+
+import re
+import sqlite3
+from datetime import date
+
+# Metrics kept per snapshot; each has a running-sum column ``cum_<name>``.
+METRICS = ('income', 'total_expenses', 'needs', 'wants', 'savings', 'health_score')
+WINDOWS = (3, 6, 12)
+# Months sort as text, so they must be zero-padded: '2024-01', not '2024-1'.
+MONTH_PATTERN = re.compile(r'\d{4}-(0[1-9]|1[0-2])')
+
+
+def valid_month(month):
+    return isinstance(month, str) and MONTH_PATTERN.fullmatch(month) is not None
+
+
+class BudgetHistory:
+
+    def __init__(self, db_path='finai.db'):
+        self.db_path = db_path
+        conn = self._connect()
+        columns = ',\n'.join(f'                {m} REAL NOT NULL, cum_{m} REAL NOT NULL'
+                             for m in METRICS)
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS budget_snapshots (
+                user_id TEXT NOT NULL,
+                month TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                risk_level TEXT NOT NULL,
+{columns},
+                PRIMARY KEY (user_id, month)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def record(self, user_id, analysis, month=None):
+        """Store a BudgetAnalyzer result as the ``month`` ('YYYY-MM') snapshot.
+
+        Appending the latest month touches one row.  Re-recording or
+        back-filling an earlier month shifts the running sums of the later
+        snapshots by the difference in one UPDATE.  The reads and writes
+        share one write transaction, so concurrent recorders cannot build
+        on the same previous row.  Raises ValueError for a malformed month.
+        """
+        month = month or date.today().strftime('%Y-%m')
+        if not valid_month(month):
+            raise ValueError(f"month must be 'YYYY-MM', got {month!r}")
+        buckets = analysis.get('budget_data', {})
+        values = [float(analysis.get('income', 0)), float(analysis.get('total_expenses', 0)),
+                  *(float(buckets.get(b, {}).get('amount', 0)) for b in ('needs', 'wants', 'savings')),
+                  float(analysis.get('health_score', 0))]
+
+        conn = self._connect()
+        with conn:
+            # sqlite3 would only open the transaction at the first write;
+            # take the write lock before reading the rows we build on.
+            conn.execute('BEGIN IMMEDIATE')
+            old = conn.execute(
+                f'SELECT {", ".join(METRICS)} FROM budget_snapshots WHERE user_id = ? AND month = ?',
+                (user_id, month)).fetchone()
+            prev = conn.execute(
+                f'SELECT seq, {", ".join("cum_" + m for m in METRICS)} FROM budget_snapshots '
+                f'WHERE user_id = ? AND month < ? ORDER BY month DESC LIMIT 1',
+                (user_id, month)).fetchone()
+            seq = prev[0] + 1 if prev else 1
+            prev_cum = prev[1:] if prev else (0.0,) * len(METRICS)
+            delta = [v - (old[i] if old else 0.0) for i, v in enumerate(values)]
+
+            # Later months: shift running sums (and positions, on back-fill).
+            conn.execute(
+                f'UPDATE budget_snapshots SET '
+                f'{", ".join(f"cum_{m} = cum_{m} + ?" for m in METRICS)}, seq = seq + ? '
+                f'WHERE user_id = ? AND month > ?',
+                (*delta, 0 if old else 1, user_id, month))
+            conn.execute(
+                f'INSERT OR REPLACE INTO budget_snapshots (user_id, month, seq, risk_level, '
+                f'{", ".join(METRICS)}, {", ".join("cum_" + m for m in METRICS)}) '
+                f'VALUES ({", ".join(["?"] * (4 + 2 * len(METRICS)))})',
+                (user_id, month, seq, analysis.get('risk_level', 'low'), *values,
+                 *(c + v for c, v in zip(prev_cum, values))))
+        conn.close()
+
+    def trends(self, user_id):
+        """Rolling 3/6/12-month averages, deltas and health trajectory.
+
+        Windows count recorded months, so a gap month is skipped rather
+        than averaged in as zero.
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            f'SELECT month, seq, risk_level, {", ".join(METRICS)}, '
+            f'{", ".join("cum_" + m for m in METRICS)} FROM budget_snapshots '
+            f'WHERE user_id = ? ORDER BY month DESC LIMIT ?',
+            (user_id, max(WINDOWS) + 1)).fetchall()
+        conn.close()
+
+        if not rows:
+            return {'user_id': user_id, 'months_recorded': 0, 'latest': None,
+                    'rolling': {}, 'deltas': {}, 'health_trajectory': [],
+                    'health_direction': 'insufficient_data'}
+
+        k = len(METRICS)
+        n = rows[0][1]
+        zeros = (0.0,) * k
+
+        def window(size, offset=0):
+            """Averages over ``size`` snapshots ending ``offset`` before the latest."""
+            if offset >= n:
+                return None
+            size = min(size, n - offset)
+            hi = rows[offset][3 + k:]
+            lo = rows[offset + size][3 + k:] if offset + size < n else zeros
+            avg = {m: round((h - l) / size, 2) for m, h, l in zip(METRICS, hi, lo)}
+            income, savings = hi[0] - lo[0], hi[4] - lo[4]
+            avg['savings_rate'] = round(savings / income * 100, 1) if income else 0
+            avg['months'] = size
+            return avg
+
+        rolling = {f'{size}m': window(size) for size in WINDOWS}
+
+        current = dict(zip(METRICS, rows[0][3:3 + k]))
+        previous = dict(zip(METRICS, rows[1][3:3 + k])) if len(rows) > 1 else None
+        deltas = {
+            'month_over_month': ({m: round(current[m] - previous[m], 2) for m in METRICS}
+                                 if previous else None),
+            'vs_3m_average': {m: round(current[m] - rolling['3m'][m], 2) for m in METRICS},
+        }
+
+        recent, earlier = window(3), window(3, offset=3)
+        if earlier is None:
+            direction = 'insufficient_data'
+        else:
+            change = recent['health_score'] - earlier['health_score']
+            direction = 'improving' if change > 2 else 'declining' if change < -2 else 'stable'
+
+        return {
+            'user_id': user_id,
+            'months_recorded': n,
+            'latest': {'month': rows[0][0], 'risk_level': rows[0][2], **current},
+            'rolling': rolling,
+            'deltas': deltas,
+            'health_trajectory': [{'month': r[0], 'health_score': int(r[3 + METRICS.index('health_score')]),
+                                   'risk_level': r[2]} for r in reversed(rows[:max(WINDOWS)])],
+            'health_direction': direction,
+        }
@@ -0,0 +1,211 @@
+"""
+Fin AI – Budget Rule Sets
+Budget rules (bucket targets, category lists, health-score penalties and
+risk levels) defined as data.  Each rule set is compiled once into a
+category→column index, a column→bucket map and an ordered predicate
+table; the same compiled table is evaluated on one household or on a
+whole households x columns matrix.
+"""
+
+import operator
+
+import numpy as np
+
+NEEDS = ['housing', 'utilities', 'groceries', 'transportation', 'insurance', 'healthcare']
+WANTS = ['entertainment', 'dining_out', 'shopping', 'subscriptions', 'hobbies']
+SAVINGS = ['savings', 'investments', 'debt_payment', 'emergency_fund']
+
+RISK_LEVELS = ('low', 'medium', 'high')
+
+
+def _rules(needs_max, wants_max):
+    return [
+        {'bucket': 'needs', 'op': '>', 'value': needs_max, 'penalty': 15,
+         'recommendation': 'warning',
+         'message': ('Essential expenses are {pct:.1f}% of income '
+                     '(recommended ≤ {target}%). Consider reducing housing or utility costs.')},
+        {'bucket': 'wants', 'op': '>', 'value': wants_max, 'penalty': 10,
+         'recommendation': 'warning',
+         'message': ('Discretionary spending is {pct:.1f}% '
+                     '(recommended ≤ {target}%). Look for areas to cut back.')},
+        {'bucket': 'savings', 'op': '<', 'value': 15, 'penalty': 20, 'risk': 'medium',
+         'recommendation': 'critical',
+         'message': ('Savings rate is {pct:.1f}% '
+                     '(recommended ≥ {target}%). Increase your savings contributions.')},
+        {'bucket': 'savings', 'op': '<', 'value': 5, 'penalty': 15, 'risk': 'high'},
+        {'metric': 'overspend', 'penalty': 30, 'risk': 'high',
+         'recommendation': 'critical',
+         'message': 'You are spending Ksh {amount:,.2f} more than you earn!'},
+    ]
+
+
+def _buckets(needs, wants, savings):
+    return [
+        {'name': 'needs', 'label': 'Needs', 'target': needs, 'direction': 'max', 'categories': NEEDS},
+        {'name': 'wants', 'label': 'Wants', 'target': wants, 'direction': 'max', 'categories': WANTS},
+        {'name': 'savings', 'label': 'Savings', 'target': savings, 'direction': 'min', 'categories': SAVINGS},
+    ]
+
+
+SUCCESS_MESSAGE = ('Great job! Ksh {remaining:,.2f} remaining and '
+                   'you meet the {savings_target}% savings target.')
+
+RULE_SETS = {
+    # Classic 50/30/20 split.
+    '50/30/20': {
+        'buckets': _buckets(50, 30, 20),
+        'default_bucket': 'wants',
+        'rules': _rules(55, 35),
+        'success': SUCCESS_MESSAGE,
+    },
+    # Low-income regions, where essentials take a larger share.
+    '60/20/20': {
+        'buckets': _buckets(60, 20, 20),
+        'default_bucket': 'wants',
+        'rules': _rules(65, 25),
+        'success': SUCCESS_MESSAGE,
+    },
+}
+
+DEFAULT_RULE_SET = '50/30/20'
+
+_OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+
+class CompiledRuleSet:
+    """A rule set compiled for evaluation.
+
+    Expense categories map to columns; one extra trailing column collects
+    categories the rule set does not know, and is counted in
+    ``default_bucket``.  Each predicate is ``(bucket, op, value, penalty,
+    severity, recommendation, message)`` where ``bucket`` is -1 for the
+    overspend check (total > income).
+    """
+
+    def __init__(self, name, definition):
+        self.name = name
+        buckets = definition['buckets']
+        self.bucket_names = [b['name'] for b in buckets]
+        self.labels = [b.get('label', b['name'].title()) for b in buckets]
+        self.targets = [b['target'] for b in buckets]
+        # target / 100 is the same double as the literal share (0.3 etc.).
+        self.shares = [b['target'] / 100 for b in buckets]
+        # 'min' buckets (savings) should reach their target, 'max' ones stay under it.
+        self.at_least = [b.get('direction', 'max') == 'min' for b in buckets]
+        bucket_id = {n: i for i, n in enumerate(self.bucket_names)}
+
+        if definition.get('default_bucket') not in bucket_id:
+            raise ValueError(f'Rule set {name!r}: unknown default_bucket')
+        self.default_bucket = bucket_id[definition['default_bucket']]
+
+        self.columns, column_bucket = [], []
+        for i, b in enumerate(buckets):
+            self.columns.extend(b['categories'])
+            column_bucket.extend([i] * len(b['categories']))
+        self.index = {c: j for j, c in enumerate(self.columns)}
+        if len(self.index) != len(self.columns):
+            raise ValueError(f'Rule set {name!r}: category listed in two buckets')
+        column_bucket.append(self.default_bucket)
+        self.column_bucket = np.array(column_bucket, dtype=np.intp)
+        self.bucket_columns = [np.flatnonzero(self.column_bucket == i).tolist()
+                               for i in range(len(buckets))]
+
+        self.predicates = []
+        for rule in definition['rules']:
+            if rule.get('metric') == 'overspend':
+                bucket, op, value = -1, operator.gt, None
+            else:
+                if rule.get('bucket') not in bucket_id:
+                    raise ValueError(f'Rule set {name!r}: unknown bucket {rule.get("bucket")!r}')
+                if rule.get('op') not in _OPS:
+                    raise ValueError(f'Rule set {name!r}: unknown operator {rule.get("op")!r}')
+                bucket, op, value = bucket_id[rule['bucket']], _OPS[rule['op']], float(rule['value'])
+            self.predicates.append((
+                bucket, op, value, int(rule.get('penalty', 0)),
+                RISK_LEVELS.index(rule.get('risk', 'low')),
+                rule.get('recommendation'), rule.get('message', ''),
+            ))
+        self.success = definition.get('success')
+
+    #  Scalar path
+    def row(self, expenses):
+        """One pass over ``expenses``: (column values, unmapped keys)."""
+        values = [0.0] * (len(self.columns) + 1)
+        unmapped = []
+        index = self.index
+        for key, amount in expenses.items():
+            j = index.get(key)
+            if j is None:
+                values[-1] += float(amount)
+                unmapped.append(key)
+            else:
+                values[j] = float(amount)
+        return values, unmapped
+
+    def bucket_totals(self, values):
+        totals = []
+        for cols in self.bucket_columns:
+            total = 0.0
+            for j in cols:
+                total += values[j]
+            totals.append(total)
+        return totals
+
+    def evaluate(self, income, totals):
+        """Return (matched flags, health score, risk level) for one household."""
+        total = 0.0
+        for t in totals:
+            total += t
+        pcts = [t / income * 100 for t in totals]
+        matched, health, severity = [], 100, 0
+        for bucket, op, value, penalty, sev, _, _ in self.predicates:
+            hit = total > income if bucket < 0 else op(pcts[bucket], value)
+            matched.append(hit)
+            if hit:
+                health -= penalty
+                severity = max(severity, sev)
+        return matched, max(0, min(100, health)), RISK_LEVELS[severity]
+
+    #  Vectorized path
+    def matrix(self, expense_dicts):
+        """(households x columns matrix, unmapped keys per household)."""
+        rows, unmapped = [], []
+        for expenses in expense_dicts:
+            values, keys = self.row(expenses)
+            rows.append(values)
+            unmapped.append(keys)
+        m = np.array(rows, dtype=np.float64).reshape(len(rows), len(self.columns) + 1)
+        return m, unmapped
+
+    def bucket_totals_matrix(self, m):
+        # Columns are added left to right, as in bucket_totals().
+        out = np.zeros((m.shape[0], len(self.bucket_columns)))
+        for i, cols in enumerate(self.bucket_columns):
+            for j in cols:
+                out[:, i] += m[:, j]
+        return out
+
+    def evaluate_matrix(self, income, totals):
+        """Vectorized evaluate(): (matched masks, health, risk) arrays.
+
+        Rows with non-positive income are scored against an income of 1
+        and should be discarded by the caller.
+        """
+        total = np.zeros(len(income))
+        for i in range(totals.shape[1]):
+            total += totals[:, i]
+        pcts = totals / np.where(income > 0, income, 1.0)[:, None] * 100
+        n = len(income)
+        matched = np.zeros((n, len(self.predicates)), dtype=bool)
+        health = np.full(n, 100, dtype=np.int64)
+        severity = np.zeros(n, dtype=np.int64)
+        for k, (bucket, op, value, penalty, sev, _, _) in enumerate(self.predicates):
+            hit = total > income if bucket < 0 else op(pcts[:, bucket], value)
+            matched[:, k] = hit
+            health -= penalty * hit
+            severity = np.maximum(severity, sev * hit)
+        return matched, np.clip(health, 0, 100), np.array(RISK_LEVELS)[severity]
+
+
+def compile_rule_sets(definitions):
+    return {name: CompiledRuleSet(name, d) for name, d in definitions.items()}
@@ -0,0 +1,70 @@
+"""
+Fin AI – Caching helpers
+Small, thread-safe LRU cache with hit / miss / eviction counters so
+cache sizes can be tuned from real traffic.  Entries can optionally
+expire after ``ttl`` seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+
+    def __init__(self, maxsize=4096, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        # Reads skip the lock: each OrderedDict call is atomic under the
+        # GIL and a concurrent eviction only turns a hit into a miss.
+        try:
+            value = self._data[key]
+            self._data.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        if self.ttl is not None:
+            value, expires = value
+            if time.monotonic() >= expires:
+                self._data.pop(key, None)
+                self.expirations += 1
+                self.misses += 1
+                return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.ttl is not None:
+            value = (value, time.monotonic() + self.ttl)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,131 @@
+"""
+Fin AI – Catalogs
+Product and strategy catalogs loaded from JSON files under
+``ai_engine/catalogs``.  Each load builds an immutable snapshot
+(e.g. a score-sorted loan product index); reloads happen when the
+file's mtime changes or on demand, and swap the snapshot in with one
+assignment, so requests in flight keep the snapshot they started with.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+from types import MappingProxyType
+
+from ai_engine.portfolio import Frontier
+
+CATALOG_DIR = os.path.join(os.path.dirname(__file__), 'catalogs')
+
+Snapshot = namedtuple('Snapshot', 'value version mtime_ns')
+
+
+class Catalog:
+
+    def __init__(self, path, build, check_interval=2.0):
+        self.path = path
+        self.build = build
+        self.check_interval = check_interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + check_interval
+        self._snapshot = self._load()
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+            mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        value = self.build(json.loads(raw))
+        return Snapshot(value, hashlib.sha256(raw).hexdigest()[:12], mtime_ns)
+
+    def snapshot(self):
+        """Current snapshot; checks the file's mtime at most every
+        ``check_interval`` seconds."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            try:
+                changed = os.stat(self.path).st_mtime_ns != self._snapshot.mtime_ns
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+        return self._snapshot
+
+    def reload(self):
+        """Rebuild from disk.  A broken file keeps the previous snapshot."""
+        with self._lock:
+            try:
+                snapshot = self._load()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.last_error = f'{type(e).__name__}: {e}'
+                return False
+            self._snapshot = snapshot
+            self.last_error = None
+            return True
+
+    def status(self):
+        return {
+            'path': self.path,
+            'version': self._snapshot.version,
+            'last_error': self.last_error,
+        }
+
+
+#  Loan products
+PRODUCT_FIELDS = ('name', 'min_score', 'max_amount', 'interest_rate', 'tenure_months')
+
+
+class ProductIndex:
+    """Loan products sorted by ``min_score``; products unlocked by a score
+    are a prefix found with one bisect."""
+
+    __slots__ = ('products', 'min_scores')
+
+    def __init__(self, products):
+        for p in products:
+            missing = [f for f in PRODUCT_FIELDS if f not in p]
+            if missing:
+                raise ValueError(f'Product {p.get("name", "?")!r} is missing {", ".join(missing)}')
+        ordered = sorted(products, key=lambda p: p['min_score'])
+        self.products = tuple(MappingProxyType(dict(p)) for p in ordered)
+        self.min_scores = tuple(p['min_score'] for p in ordered)
+
+    def __len__(self):
+        return len(self.products)
+
+    def eligible_count(self, score):
+        return bisect_right(self.min_scores, score)
+
+    def eligible(self, score):
+        return self.products[:bisect_right(self.min_scores, score)]
+
+
+def build_product_index(data):
+    return ProductIndex(data['products'])
+
+
+#  Savings strategies
+StrategyCatalog = namedtuple('StrategyCatalog', 'strategies rates volatility frontier default')
+
+
+def build_strategy_catalog(data):
+    strategies = MappingProxyType({
+        name: tuple(MappingProxyType(dict(s)) for s in items)
+        for name, items in data['strategies'].items()})
+    rates = MappingProxyType({name: float(r) for name, r in data['rates'].items()})
+    # Annual volatility of returns; strategies without one are deterministic.
+    vols = data.get('volatility', {})
+    volatility = MappingProxyType({name: float(vols.get(name, 0.0)) for name in rates})
+    default = data.get('default', 'moderate')
+    if default not in strategies or default not in rates:
+        raise ValueError(f'Default strategy {default!r} is not defined')
+    # Numeric instrument parameters make a mean-variance frontier; each
+    # strategy's volatility is its tier's cap on it.
+    frontier = None
+    if 'instruments' in data:
+        frontier = Frontier(data['instruments'], data['correlation'], volatility)
+    return StrategyCatalog(strategies, rates, volatility, frontier, default)
@@ -4,6 +4,53 @@ Keyword-based AI categorizer that classifies transactions,
 computes totals per category, and generates spending insights.
 """
 
+import math
+import string
+from itertools import islice
+
+import numpy as np
+
+from ai_engine.cache import LRUCache
+from ai_engine.keyword_matcher import KeywordMatcher
+from ai_engine.transactions import TransactionTable, category_sums
+
+_PUNCTUATION = bytes.maketrans(string.punctuation.encode(), b' ' * len(string.punctuation))
+_DIGITS = bytes.maketrans(string.digits.encode(), b' ' * len(string.digits))
+
+
+def normalize_merchant(description, keep=None):
+    """Reduce a statement line to a stable merchant key.
+
+    'UBER *TRIP 8X2' and 'Uber trip 4K7' both become 'uber trip':
+    punctuation and digits are stripped and reference codes (tokens that
+    switch between letters and digits more than once) are dropped.
+    ``keep`` rescues letter runs of such tokens: a run of two or more
+    letters is kept when ``keep(run)`` is true, so 'Netflix4K' can still
+    key as 'netflix'.  Single letters are code noise and never rescued.
+
+    This runs on every row, cache hit or not, so it must stay cheaper
+    than a keyword match: one pass over the words, and ``keep`` is only
+    consulted for the rare multi-letter runs inside codes.
+    """
+    # Work on ASCII bytes: keywords are ASCII and bytes.translate is far
+    # cheaper than str.translate.  Other characters become separators.
+    words = description.lower().encode('ascii', 'replace').translate(_PUNCTUATION).split()
+    key = []
+    append = key.append
+    for w in words:
+        if w.isalpha():
+            append(w)
+        elif not w.isdigit():
+            pieces = w.translate(_DIGITS).split()
+            if len(pieces) == 1:
+                if not (w[:1].isdigit() and w[-1:].isdigit()):
+                    append(pieces[0])
+            elif keep is not None:
+                for piece in pieces:
+                    if len(piece) > 1 and keep(piece.decode()):
+                        append(piece)
+    return b' '.join(key).decode()
+
 
 class ExpenseCategorizer:
 
@@ -30,30 +77,141 @@ class ExpenseCategorizer:
         'other': '',
     }
 
+    # Integer codes used by the columnar API; 'other' is always last.
+    CATEGORY_CODES = [*CATEGORIES, 'other']
+
+    # Rows per merchant-index query when streaming.
+    STREAM_CHUNK = 500
+
+    def __init__(self, word_boundary=False, cache_size=4096, merchant_index=None,
+                 fallback_model=None, fallback_threshold=0.9):
+        # The keyword table is compiled once into a single automaton;
+        # earlier categories keep priority over later ones.
+        self._matcher = KeywordMatcher(self.CATEGORIES, word_boundary=word_boundary)
+        # Letter runs of reference-code-like tokens ('Netflix4K') stay in
+        # the merchant key when they contain a keyword.
+        self._has_keyword = lambda run: self._matcher.match(run) is not None
+        # Statements repeat the same merchants, so remember the category
+        # of each normalized merchant key.  On bench_categorizer.py's
+        # 30k-row statement (99.7% hits) this is about 1.3x faster than
+        # matching every row, and about 2.3x with word_boundary.
+        self._cache = LRUCache(cache_size)
+        self._code_of = {cat: i for i, cat in enumerate(self.CATEGORY_CODES)}
+        # Optional MerchantIndex with remembered (user-corrected) merchants;
+        # it takes precedence over the keyword heuristics.
+        self.merchant_index = merchant_index
+        # Optional HashedNaiveBayes for rows the keywords leave in 'other';
+        # its label is used only when the posterior clears the threshold.
+        self.fallback_model = fallback_model
+        self.fallback_threshold = fallback_threshold
+
     def categorize(self, data):
         transactions = data.get('transactions', [])
-        results = []
+        table = self.categorize_table([t.get('description', '') for t in transactions],
+                                      [float(t.get('amount', 0)) for t in transactions])
+        totals = table.category_totals()
+        total = math.fsum(table.amounts)
+
+        return {
+            'transactions': list(table.iter_records(self.ICONS)),
+            'category_totals': totals,
+            'total': total,
+            'insights': self._insights(totals, total),
+            'num_transactions': len(transactions),
+            'categories_found': len(totals),
+        }
+
+    def categorize_table(self, descriptions, amounts):
+        """Categorize into a compact TransactionTable (no per-row dicts)."""
+        table = TransactionTable(self.CATEGORY_CODES)
+        code_of = self._code_of
+        table.extend(descriptions, amounts,
+                     (code_of[c] for c in self._categorize_many(descriptions)))
+        return table
+
+    def categorize_stream(self, rows):
+        """Categorize an iterable of transactions lazily.
+
+        Yields one result dict per row, then a final ``{'summary': ...}``
+        trailer with the running category totals and insights.  Only the
+        totals are kept in memory, so statement size does not matter.
+        Rows carrying an ``'error'`` (malformed input lines) are passed
+        through in place and counted in the summary's ``errors``.
+        """
         totals: dict[str, float] = {}
+        total = 0.0
+        count = 0
+        errors = 0
+        rows = iter(rows)
+
+        while True:
+            chunk = list(islice(rows, self.STREAM_CHUNK))
+            if not chunk:
+                break
+            categories = iter(self._categorize_many(
+                [t.get('description', '') for t in chunk if 'error' not in t]))
+            for txn in chunk:
+                if 'error' in txn:
+                    errors += 1
+                    yield txn
+                    continue
+                cat = next(categories)
+                desc = txn.get('description', '')
+                amount = float(txn.get('amount', 0))
+                totals[cat] = totals.get(cat, 0) + amount
+                total += amount
+                count += 1
+                yield {
+                    'description': desc,
+                    'amount': amount,
+                    'category': cat,
+                    'icon': self.ICONS.get(cat, ''),
+                }
+
+        yield {'summary': {
+            'category_totals': totals,
+            'total': total,
+            'insights': self._insights(totals, total),
+            'num_transactions': count,
+            'categories_found': len(totals),
+            'errors': errors,
+        }}
+
+    def categorize_batch(self, descriptions, amounts):
+        """Columnar categorization for large ledgers.
+
+        Takes parallel sequences (lists or NumPy arrays) of descriptions
+        and amounts.  Returns integer category ``codes`` indexing
+        ``CATEGORY_CODES`` plus per-category totals summed straight from
+        the columns instead of per-row dicts.  Totals use ``math.fsum``,
+        as ``categorize`` and the sharded file categorizer do.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if len(descriptions) != len(amounts):
+            return {'error': 'descriptions and amounts must have the same length.'}
+
+        codes = np.fromiter(map(self._code_of.__getitem__, self._categorize_many(descriptions)),
+                            dtype=np.uint8, count=len(amounts))
+        totals = {self.CATEGORY_CODES[code]: total
+                  for code, total in category_sums(codes, amounts).items()}
+        total = math.fsum(amounts.tolist())
+
+        return {
+            'codes': codes,
+            'categories': self.CATEGORY_CODES,
+            'category_totals': totals,
+            'total': total,
+            'insights': self._insights(totals, total),
+            'num_transactions': len(amounts),
+            'categories_found': len(totals),
+        }
 
-        for txn in transactions:
-            desc = txn.get('description', '')
-            amount = float(txn.get('amount', 0))
-            cat = self._match(desc)
-            results.append({
-                'description': desc,
-                'amount': amount,
-                'category': cat,
-                'icon': self.ICONS.get(cat, ''),
-            })
-            totals[cat] = totals.get(cat, 0) + amount
-
-        total = sum(float(t.get('amount', 0)) for t in transactions)
-
-        # Insights
+    @staticmethod
+    def _insights(totals, total):
         insights = []
         ranked = sorted(totals.items(), key=lambda x: x[1], reverse=True)
 
-        if ranked:
+        if ranked and total:
             top = ranked[0]
             insights.append(
                 f'Highest spending: {top[0].replace("_", " ").title()} '
@@ -75,18 +233,56 @@ class ExpenseCategorizer:
                 f'aim for under 30%.'
             )
 
-        return {
-            'transactions': results,
-            'category_totals': totals,
-            'total': total,
-            'insights': insights,
-            'num_transactions': len(transactions),
-            'categories_found': len(totals),
-        }
+        return insights
+
+    def cache_stats(self):
+        return self._cache.stats()
+
+    def correct(self, description, category):
+        """Remember a user's category for this merchant."""
+        if category not in self._code_of:
+            return {'error': f'Unknown category: {category}'}
+        if self.merchant_index is None:
+            return {'error': 'No merchant index configured.'}
+        key = normalize_merchant(description, self._has_keyword)
+        if not key:
+            return {'error': 'Description has no merchant name.'}
+        self.merchant_index.set_category(key, category)
+        return {'merchant_key': key, 'category': category}
+
+    def _categorize_many(self, descriptions):
+        keys = [normalize_merchant(d, self._has_keyword) for d in descriptions]
+        known = self.merchant_index.lookup_many(keys) if self.merchant_index else {}
+        cache_get = self._cache.get
+        cats = [known.get(k) or cache_get(k) for k in keys]
+        missing = [i for i, c in enumerate(cats) if c is None]
+        if missing:
+            fresh = self._classify(dict.fromkeys(keys[i] for i in missing))
+            for i in missing:
+                cats[i] = fresh[keys[i]]
+        return cats
+
+    def _categorize_one(self, description: str) -> str:
+        key = normalize_merchant(description, self._has_keyword)
+        cat = self._cache.get(key)
+        if cat is None:
+            cat = self._classify([key])[key]
+        return cat
+
+    def _classify(self, keys):
+        """Keyword-match unseen merchant keys, send the 'other' ones to the
+        fallback model in one batch, and cache the outcome."""
+        found = {k: self._match(k) for k in keys}
+        if self.fallback_model is not None:
+            unknown = [k for k, c in found.items() if c == 'other' and k]
+            if unknown:
+                labels, confidence = self.fallback_model.predict(unknown)
+                for k, label, p in zip(unknown, labels, confidence):
+                    if p >= self.fallback_threshold:
+                        found[k] = label
+        for k, c in found.items():
+            self._cache.put(k, c)
+        return found
 
     def _match(self, description: str) -> str:
-        desc = description.lower()
-        for cat, keywords in self.CATEGORIES.items():
-            if any(kw in desc for kw in keywords):
-                return cat
-        return 'other'
+        return self._matcher.match(description) or 'other'
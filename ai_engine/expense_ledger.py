@@ -0,0 +1,98 @@
+"""
+Fin AI – Expense Ledger
+Per-user running ledger backed by finai.db.  Transactions are appended
+in batches and category totals are updated in place, so each update
+costs O(batch) instead of re-categorizing the full history.
+"""
+
+import sqlite3
+
+
+class ExpenseLedger:
+
+    def __init__(self, categorizer, db_path='finai.db'):
+        self.categorizer = categorizer
+        self.db_path = db_path
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS ledger_transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                description TEXT NOT NULL,
+                amount REAL NOT NULL,
+                category TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_ledger_transactions_user '
+                     'ON ledger_transactions (user_id)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS ledger_totals (
+                user_id TEXT NOT NULL,
+                category TEXT NOT NULL,
+                total REAL NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (user_id, category)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def append(self, user_id, transactions):
+        """Categorize and append a batch, then return the updated summary."""
+        table = self.categorizer.categorize_table(
+            [t.get('description', '') for t in transactions],
+            [float(t.get('amount', 0)) for t in transactions])
+        totals, counts = table.category_totals(), table.category_counts()
+
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                'INSERT INTO ledger_transactions (user_id, description, amount, category) '
+                'VALUES (?, ?, ?, ?)',
+                ((user_id, d, a, c) for d, a, c in table))
+            conn.executemany('''
+                INSERT INTO ledger_totals (user_id, category, total, count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id, category) DO UPDATE SET
+                    total = total + excluded.total,
+                    count = count + excluded.count
+            ''', [(user_id, cat, totals[cat], counts[cat]) for cat in totals])
+        summary = self._summary(conn, user_id)
+        conn.close()
+
+        summary['appended'] = len(transactions)
+        return summary
+
+    def summary(self, user_id):
+        conn = self._connect()
+        result = self._summary(conn, user_id)
+        conn.close()
+        return result
+
+    def _summary(self, conn, user_id):
+        # At most one row per category, regardless of history length.
+        rows = conn.execute('SELECT category, total, count FROM ledger_totals '
+                            'WHERE user_id = ?', (user_id,)).fetchall()
+        totals = {cat: total for cat, total, _ in rows}
+        total = sum(totals.values())
+        ranking = sorted(totals, key=totals.get, reverse=True)
+
+        dining = totals.get('dining_out', 0)
+        groceries = totals.get('groceries', 0)
+        discretionary = totals.get('entertainment', 0) + totals.get('shopping', 0)
+
+        return {
+            'user_id': user_id,
+            'category_totals': totals,
+            'total': round(total, 2),
+            'ranking': ranking,
+            'top_category': ranking[0] if ranking else None,
+            'dining_to_groceries': round(dining / groceries, 2) if groceries else None,
+            'discretionary_ratio': round(discretionary / total, 4) if total else 0,
+            'insights': self.categorizer._insights(totals, total),
+            'num_transactions': sum(count for _, _, count in rows),
+        }
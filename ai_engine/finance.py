@@ -0,0 +1,258 @@
+"""
+Fin AI – Finance Kernel
+Shared annuity, compounding and bond math for the ai_engine analyzers.
+Every function accepts Python scalars or NumPy arrays (broadcast
+together) and returns a float for scalar input.  Rates are per period
+as fractions (a 12% annual loan repaid monthly has ``rate=0.01``).
+
+Compounding factors for scalar (rate, periods) pairs are memoized, since
+the engines price the same product terms over and over.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+_SCALARS = (int, float)
+
+
+def _out(x):
+    return float(x) if np.ndim(x) == 0 else x
+
+
+def _scalar(*values):
+    # isinstance first: np.ndim alone costs more than the arithmetic.
+    for v in values:
+        if not isinstance(v, _SCALARS) and np.ndim(v) != 0:
+            return False
+    return True
+
+
+@lru_cache(maxsize=4096)
+def annuity_factors(rate, periods):
+    """Return ``(growth, fv_factor)`` for one (rate, periods) pair.
+
+    ``growth`` is (1 + r)^n and ``fv_factor`` the future value of paying
+    1 per period, ((1 + r)^n - 1) / r (or n when r is 0).
+    """
+    growth = (1 + rate) ** periods
+    return growth, ((growth - 1) / rate if rate else float(periods))
+
+
+def growth(rate, periods):
+    """(1 + rate) ** periods."""
+    if _scalar(rate, periods):
+        return annuity_factors(float(rate), periods)[0]
+    return np.power(1 + np.asarray(rate, dtype=np.float64), periods)
+
+
+def emi(principal, rate, periods):
+    """Level payment that repays ``principal`` over ``periods``.
+
+    Zero for non-positive principal or tenure, ``principal / periods``
+    at a zero rate.
+    """
+    if _scalar(rate, periods):
+        if isinstance(principal, _SCALARS) or np.ndim(principal) == 0:
+            if principal <= 0 or periods <= 0:
+                return 0.0
+            if rate == 0:
+                return principal / periods
+            g = annuity_factors(float(rate), periods)[0]
+            return principal * rate * g / (g - 1)
+        principal = np.asarray(principal, dtype=np.float64)
+        if periods <= 0:
+            return np.zeros_like(principal)
+        if rate == 0:
+            payment = principal / periods
+        else:
+            g = annuity_factors(float(rate), periods)[0]
+            payment = principal * rate * g / (g - 1)
+        return np.where(principal > 0, payment, 0.0)
+
+    principal, rate, periods = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64), np.asarray(rate, dtype=np.float64),
+        np.asarray(periods, dtype=np.float64))
+    g = np.power(1 + rate, periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payment = np.where(rate == 0, principal / periods, principal * rate * g / (g - 1))
+    return np.where((principal > 0) & (periods > 0), payment, 0.0)
+
+
+def fv(present, rate, periods):
+    """Future value of a lump sum."""
+    if _scalar(present, rate, periods):
+        return present * annuity_factors(float(rate), periods)[0]
+    return _out(np.asarray(present, dtype=np.float64) * growth(rate, periods))
+
+
+def fv_annuity(payment, rate, periods):
+    """Future value of ``payment`` made at the end of each period."""
+    if _scalar(rate, periods):
+        factor = annuity_factors(float(rate), periods)[1]
+        if _scalar(payment):
+            return payment * factor
+    else:
+        rate = np.asarray(rate, dtype=np.float64)
+        g = np.power(1 + rate, periods)
+        factor = np.where(rate == 0, periods, (g - 1) / np.where(rate == 0, 1, rate))
+    return _out(np.asarray(payment, dtype=np.float64) * factor)
+
+
+def pv_annuity(payment, rate, periods):
+    """Present value of ``payment`` made at the end of each period."""
+    return _out(fv_annuity(payment, rate, periods) / growth(rate, periods))
+
+
+def required_payment(target, present, rate, periods):
+    """Level end-of-period payment that grows ``present`` to ``target``.
+
+    Closed-form inversion of ``fv + fv_annuity``; zero when ``present``
+    reaches the target on its own.  ``periods`` must be positive.
+    """
+    shortfall = np.subtract(target, fv(present, rate, periods))
+    return _out(np.maximum(shortfall / fv_annuity(1.0, rate, periods), 0.0))
+
+
+def periods_to_target(target, present, payment, rate):
+    """Fractional number of periods until ``present`` plus end-of-period
+    ``payment`` reaches ``target``.
+
+    Closed form n = ln((T r + c) / (P r + c)) / ln(1 + r), or (T - P) / c
+    at a zero rate.  Zero when already reached, ``inf`` when never.
+    """
+    target, present, payment, rate = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (target, present, payment, rate)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        start = present * rate + payment
+        end = target * rate + payment
+        grown = np.log(end / start) / np.log1p(rate)
+        linear = (target - present) / payment
+        n = np.where(rate == 0, np.where(payment > 0, linear, np.inf),
+                     np.where(start > 0, grown, np.inf))
+    return _out(np.where(present >= target, 0.0, n))
+
+
+def solve_rate(target, present, payment, periods, hi=0.1, iterations=64):
+    """Per-period rate at which ``present`` plus ``payment`` per period
+    grows to ``target`` after ``periods``.
+
+    No closed form exists, so this bisects on [0, ``hi``], vectorized
+    over all inputs.  Zero when no growth is needed, NaN when even
+    ``hi`` falls short.
+    """
+    target, present, payment, periods = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (target, present, payment, periods)))
+    shape = target.shape
+    target, present, payment, periods = (v.ravel() for v in (target, present, payment, periods))
+
+    def value(r):
+        return fv(present, r, periods) + fv_annuity(payment, r, periods)
+
+    lo = np.zeros(target.shape)
+    top = np.full(target.shape, float(hi))
+    for _ in range(iterations):
+        mid = (lo + top) / 2
+        short = value(mid) < target
+        lo = np.where(short, mid, lo)
+        top = np.where(short, top, mid)
+    rate = np.where(value(np.zeros(target.shape)) >= target, 0.0, top)
+    rate = np.where(value(np.full(target.shape, float(hi))) < target, np.nan, rate)
+    return _out(rate.reshape(shape))
+
+
+def balance(principal, rate, periods, k):
+    """Outstanding balance after ``k`` of ``periods`` level payments.
+
+    Closed form, P(1+r)^k - EMI * ((1+r)^k - 1) / r, so any month costs
+    O(1).  ``k`` may be an array; ``rate`` is a scalar.  Not memoized,
+    since callers walk many distinct ``k``.
+    """
+    payment = emi(principal, rate, periods)
+    if rate == 0:
+        return _out(principal - payment * np.asarray(k, dtype=np.float64))
+    g = (1 + rate) ** np.asarray(k, dtype=np.float64)
+    return _out(principal * g - payment * (g - 1) / rate)
+
+
+def amortization(principal, rate, periods, months=None):
+    """Per-period split of a level-payment loan, in closed form.
+
+    Returns ``(payment, interest, principal_paid, balance)``; the last
+    three are arrays over the first ``months`` periods (all by default).
+    """
+    months = periods if months is None else min(months, periods)
+    payment = emi(principal, rate, periods)
+    closing = balance(principal, rate, periods, np.arange(1, months + 1))
+    opening = np.concatenate(([float(principal)], closing))[:months]
+    interest = opening * rate
+    return payment, interest, payment - interest, closing
+
+
+def coupon_times(years):
+    """Annual coupon dates of a bond maturing at ``years``: counting back
+    from maturity, so a 2.5-year bond pays at 0.5, 1.5 and 2.5."""
+    return years - np.arange(math.ceil(years) - 1, -1, -1, dtype=np.float64)
+
+
+def cash_flows(face, coupon_rate, years):
+    """Padded cash-flow matrices for a book of bonds.
+
+    Returns ``(times, flows)``, one row per bond and one column per
+    coupon date (see ``coupon_times``), latest date first so maturity is
+    column 0; unused columns have time 0 and flow 0.
+    """
+    face, coupon_rate, years = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (face, coupon_rate, years)))
+    count = np.ceil(years).astype(np.int64)
+    k = np.arange(max(1, int(count.max(initial=1))))
+    used = k < count[:, None]
+    times = np.where(used, years[:, None] - k, 0.0)
+    flows = np.where(used, (face * coupon_rate)[:, None], 0.0)
+    flows[:, 0] += face
+    return times, flows
+
+
+def bond_prices(face, coupon_rate, yield_rate, years):
+    """Price of annual-coupon bonds in closed form, broadcast over all inputs.
+
+    The coupons form a geometric series, so
+    P = (1+y)^-T [F + c ((1+y)^n - 1) / y] with n = ceil(T) coupons.
+    """
+    face, coupon_rate, yield_rate, years = (np.asarray(v, dtype=np.float64)
+                                            for v in (face, coupon_rate, yield_rate, years))
+    n = np.ceil(years)
+    g = np.power(1 + yield_rate, n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(yield_rate == 0, n, (g - 1) / yield_rate)
+    return _out(np.power(1 + yield_rate, -years) * (face + face * coupon_rate * annuity))
+
+
+def bond_metrics(face, coupon_rate, yield_rate, years):
+    """Price, Macaulay and modified duration and convexity of a bond.
+
+    Annual coupons of ``face * coupon_rate`` are paid on the dates from
+    ``coupon_times`` and the face at ``years``, which may be fractional.
+    Convexity is in years squared.
+    """
+    coupon = face * coupon_rate
+    t = coupon_times(years)
+    y = 1 + yield_rate
+    df = np.power(y, -t)
+    df_face = y ** -years
+
+    pv_coupons = coupon * df
+    price = float(pv_coupons.sum()) + face * df_face
+    if not price:
+        return {'price': 0.0, 'macaulay_duration': 0.0, 'modified_duration': 0.0, 'convexity': 0.0}
+    macaulay = (float(pv_coupons @ t) + years * face * df_face) / price
+    convexity = ((float(pv_coupons @ (t * (t + 1))) + years * (years + 1) * face * df_face)
+                 / (price * y * y))
+    return {
+        'price': price,
+        'macaulay_duration': macaulay,
+        'modified_duration': macaulay / y,
+        'convexity': convexity,
+    }
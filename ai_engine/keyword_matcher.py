@@ -0,0 +1,96 @@
+"""
+Fin AI – Keyword Matcher
+Aho-Corasick automaton that finds every keyword of a prioritised
+keyword table in a single pass over the text.
+"""
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher compiled once from ``{label: [keywords]}``.
+
+    ``match`` returns the label of the highest-priority hit, where
+    priority follows the insertion order of the table (first label
+    wins), or ``None`` when nothing matches.
+
+    With ``word_boundary=True`` a keyword only counts when it is not
+    preceded or followed by a letter or digit, so short keywords such
+    as 'fd' no longer fire inside unrelated words.
+    """
+
+    def __init__(self, table, word_boundary=False):
+        self.labels = list(table)
+        self.word_boundary = word_boundary
+
+        # State 0 is the root.  ``goto[s]`` maps a character to the
+        # next state; ``out[s]`` holds (priority, keyword_length) for
+        # every keyword ending at ``s`` (including via failure links).
+        goto = [{}]
+        out = [[]]
+        for prio, label in enumerate(self.labels):
+            for kw in table[label]:
+                s = 0
+                for ch in kw.lower():
+                    nxt = goto[s].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[s][ch] = nxt
+                        goto.append({})
+                        out.append([])
+                    s = nxt
+                out[s].append((prio, len(kw)))
+
+        # Breadth-first pass: compute failure links, merge outputs and
+        # resolve missing transitions ahead of time, giving a full DFA
+        # where scanning is one dict lookup per character.
+        fail = [0] * len(goto)
+        queue = [0]
+        for s in queue:
+            edges = list(goto[s].items())
+            for ch, nxt in edges:
+                fail[nxt] = goto[fail[s]].get(ch, 0) if s else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+                queue.append(nxt)
+            if s:
+                for ch, nxt in goto[fail[s]].items():
+                    goto[s].setdefault(ch, nxt)
+
+        self._goto = goto
+        self._out = [tuple(sorted(o)) for o in out]
+        # Cheapest possible answer for the "best" hit of each state.
+        self._best = [o[0][0] if o else None for o in self._out]
+
+    def match(self, text):
+        """Return the label of the highest-priority keyword in ``text``."""
+        text = text.lower()
+        goto = self._goto
+        best = len(self.labels)
+        s = 0
+
+        if not self.word_boundary:
+            best_of = self._best
+            for ch in text:
+                s = goto[s].get(ch, 0)
+                p = best_of[s]
+                if p is not None and p < best:
+                    if p == 0:
+                        return self.labels[0]
+                    best = p
+            return self.labels[best] if best < len(self.labels) else None
+
+        out = self._out
+        n = len(text)
+        for i, ch in enumerate(text):
+            s = goto[s].get(ch, 0)
+            for p, length in out[s]:
+                if p >= best:
+                    break
+                start = i - length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if i + 1 < n and text[i + 1].isalnum():
+                    continue
+                if p == 0:
+                    return self.labels[0]
+                best = p
+                break
+        return self.labels[best] if best < len(self.labels) else None
@@ -0,0 +1,89 @@
+"""
+Fin AI – Loan Book Scoring
+Rescores a whole applicant book (CSV in, CSV out) with
+``LoanEligibilityChecker.check_eligibility_batch``.
+
+Usage:  python -m ai_engine.loan_book applicants.csv --out scored.csv
+
+Input columns use the ``/api/loan/check`` field names; an optional
+``applicant_id`` (or ``id``) column is copied to the output.
+"""
+
+import argparse
+import csv
+import sys
+
+from ai_engine.loan_eligibility import LoanEligibilityChecker
+
+NUMERIC_FIELDS = ('monthly_income', 'monthly_expenses', 'existing_debt', 'savings',
+                  'employment_months', 'dependents', 'requested_amount')
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+
+
+def _number(value):
+    value = (value or '').strip().replace(',', '')
+    return float(value) if value else 0.0
+
+
+def read_book(f):
+    """Read an applicant CSV into (ids, columns)."""
+    reader = csv.DictReader(f)
+    ids, columns = [], {name: [] for name in (*NUMERIC_FIELDS, 'has_bank_account')}
+    for i, row in enumerate(reader):
+        ids.append(row.get('applicant_id') or row.get('id') or str(i + 1))
+        for name in NUMERIC_FIELDS:
+            columns[name].append(_number(row.get(name)))
+        columns['has_bank_account'].append(
+            (row.get('has_bank_account') or '').strip().lower() in TRUE_VALUES)
+    return ids, columns
+
+
+def _slug(name):
+    return name.lower().replace(' ', '_')
+
+
+def write_results(f, ids, result):
+    factors = list(result['factors'])
+    products = [_slug(p) for p in result['products']]
+    header = ['applicant_id', 'score', 'verdict', 'risk_level',
+              *(f'factor_{_slug(name)}' for name in factors),
+              'monthly_disposable', 'safe_emi']
+    for p in products:
+        header += [f'{p}_eligible', f'{p}_max_amount', f'{p}_emi', f'{p}_affordable']
+
+    writer = csv.writer(f)
+    writer.writerow(header)
+    factor_cols = [result['factors'][name].tolist() for name in factors]
+    columns = [ids, result['score'].tolist(), result['verdict'].tolist(),
+               result['risk_level'].tolist(),
+               *([round(v, 1) if v == v else '' for v in col] for col in factor_cols),
+               [round(v, 2) for v in result['monthly_disposable'].tolist()],
+               result['safe_emi'].tolist()]
+    for j in range(len(products)):
+        columns += [result['eligible'][:, j].astype(int).tolist(),
+                    result['max_eligible_amount'][:, j].tolist(),
+                    result['monthly_emi'][:, j].tolist(),
+                    result['affordable'][:, j].astype(int).tolist()]
+    writer.writerows(zip(*columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rescore a CSV applicant book.')
+    parser.add_argument('path', help='applicant CSV')
+    parser.add_argument('--out', default=None, help='output CSV (default: stdout)')
+    args = parser.parse_args(argv)
+
+    with open(args.path, newline='', encoding='utf-8-sig') as f:
+        ids, columns = read_book(f)
+    result = LoanEligibilityChecker().check_eligibility_batch(columns)
+
+    if args.out:
+        with open(args.out, 'w', newline='') as f:
+            write_results(f, ids, result)
+        print(f'Scored {len(ids)} applicants; wrote {args.out}', file=sys.stderr)
+    else:
+        write_results(sys.stdout, ids, result)
+
+
+if __name__ == '__main__':
+    main()
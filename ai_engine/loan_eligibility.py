@@ -1,44 +1,30 @@
 """
 Fin AI – Loan Eligibility Checker
 Scores users on multiple financial-health factors and matches them
-with suitable microfinance products.
+with suitable microfinance products from the loan catalog
+(ai_engine/catalogs/loan_products.json).
 """
 
+import base64
+import os
+
+import numpy as np
+
+from ai_engine import finance
+from ai_engine.catalog import CATALOG_DIR, Catalog, build_product_index
+
 
 class LoanEligibilityChecker:
 
-    PRODUCTS = [
-        {
-            'name': 'Community Starter Loan',
-            'min_score': 30, 'max_amount': 25000,
-            'interest_rate': 12, 'tenure_months': 12,
-            'description': 'Entry-level microfinance for first-time borrowers.',
-        },
-        {
-            'name': 'Growth Accelerator Loan',
-            'min_score': 50, 'max_amount': 75000,
-            'interest_rate': 10, 'tenure_months': 24,
-            'description': 'For small-business owners looking to expand.',
-        },
-        {
-            'name': 'Enterprise Builder Loan',
-            'min_score': 70, 'max_amount': 20000,
-            'interest_rate': 8, 'tenure_months': 36,
-            'description': 'Premium product for high-potential entrepreneurs.',
-        },
-        {
-            'name': 'Women Empowerment Fund',
-            'min_score': 25, 'max_amount': 50000,
-            'interest_rate': 7, 'tenure_months': 18,
-            'description': 'Low-interest fund for women entrepreneurs.',
-        },
-        {
-            'name': 'Agricultural Support Loan',
-            'min_score': 35, 'max_amount': 100000,
-            'interest_rate': 9, 'tenure_months': 12,
-            'description': 'Seasonal funding for farmers and agri-workers.',
-        },
-    ]
+    VERSION = 2
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog or Catalog(os.path.join(CATALOG_DIR, 'loan_products.json'),
+                                          build_product_index)
+
+    @property
+    def cache_version(self):
+        return f'{self.VERSION}:{self.catalog.snapshot().version}'
 
     # 
     def check_eligibility(self, data):
@@ -100,20 +86,19 @@ class LoanEligibilityChecker:
 
         score = min(100, max(0, round(score)))
 
-        # Eligible products
+        # Eligible products: a prefix of the score-sorted catalog
         eligible = []
-        for p in self.PRODUCTS:
-            if score >= p['min_score']:
-                max_eligible = min(p['max_amount'],
-                                   monthly_income * p['tenure_months'] * 0.3)
-                emi = self._emi(min(requested_amount, max_eligible),
-                                p['interest_rate'], p['tenure_months'])
-                eligible.append({
-                    **p,
-                    'max_eligible_amount': round(max_eligible),
-                    'monthly_emi': round(emi),
-                    'affordable': emi < (monthly_income - monthly_expenses) * 0.5,
-                })
+        for p in self.catalog.snapshot().value.eligible(score):
+            max_eligible = min(p['max_amount'],
+                               monthly_income * p['tenure_months'] * 0.3)
+            emi = finance.emi(min(requested_amount, max_eligible),
+                              p['interest_rate'] / 12 / 100, p['tenure_months'])
+            eligible.append({
+                **p,
+                'max_eligible_amount': round(max_eligible),
+                'monthly_emi': round(emi),
+                'affordable': emi < (monthly_income - monthly_expenses) * 0.5,
+            })
 
         # Improvement tips
         tips = []
@@ -156,11 +141,163 @@ class LoanEligibilityChecker:
             'safe_emi': round((monthly_income - monthly_expenses) * 0.4),
         }
 
-    @staticmethod
-    def _emi(principal, annual_rate, months):
-        if principal <= 0 or months <= 0:
-            return 0
-        r = annual_rate / 12 / 100
-        if r == 0:
-            return principal / months
-        return principal * r * (1 + r) ** months / ((1 + r) ** months - 1)
+    def check_eligibility_batch(self, columns):
+        """Score a whole applicant book given as columns.
+
+        ``columns`` maps the ``check_eligibility`` field names to equal-length
+        sequences.  Returns NumPy arrays: ``score``, ``verdict``, ``risk_level``,
+        one raw score per factor in ``factors`` (NaN where the scalar path
+        omits the factor), unrounded ``monthly_disposable``, ``safe_emi`` and, with
+        one column per entry of ``products``, ``eligible``,
+        ``max_eligible_amount``, ``monthly_emi`` and ``affordable``.  Every
+        value matches ``check_eligibility`` for the same row.
+        """
+        n = len(next(iter(columns.values()), []))
+
+        def col(name, default=0):
+            values = columns.get(name)
+            if values is None:
+                return np.full(n, float(default))
+            return np.asarray(values, dtype=np.float64)
+
+        income = col('monthly_income')
+        expenses = col('monthly_expenses')
+        debt = col('existing_debt')
+        savings = col('savings')
+        employment = np.trunc(col('employment_months'))
+        dependents = np.trunc(col('dependents'))
+        bank = np.asarray(columns.get('has_bank_account', np.zeros(n)), dtype=bool)
+        requested = col('requested_amount')
+
+        has_income = income > 0
+        safe_income = np.where(has_income, income, 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dti = debt / safe_income * 100
+            disp_pct = (income - expenses) / safe_income * 100
+            factors = {
+                'Income Level': np.minimum(25, income / 1000 * 2),
+                'Debt-to-Income': np.maximum(0, 20 - dti * 0.4),
+                'Savings Buffer': np.minimum(20, savings / (safe_income * 6) * 100 * 0.2),
+                'Employment Stability': np.minimum(15, employment / 12 * 5),
+                'Financial Inclusion': np.where(bank, 5, 0) + np.maximum(0, np.minimum(5, 5 - dependents)),
+                'Disposable Income': np.minimum(10, np.maximum(0, disp_pct * 0.3)),
+            }
+        income_only = ('Income Level', 'Debt-to-Income', 'Savings Buffer', 'Disposable Income')
+
+        # Accumulate in the scalar path's order so the sums are identical.
+        total = np.zeros(n)
+        for name, s in factors.items():
+            if name in income_only:
+                s = np.where(has_income, s, np.nan)
+                factors[name] = s
+                total += np.where(has_income, s, 0)
+            else:
+                total += s
+        score = np.clip(np.round(total), 0, 100).astype(np.int64)
+
+        verdict = np.select([score >= 70, score >= 50, score >= 30],
+                            ['Excellent', 'Good', 'Fair'], 'Needs Improvement')
+        risk = np.select([score >= 70, score >= 50, score >= 30],
+                         ['low', 'moderate', 'elevated'], 'high')
+
+        disposable = income - expenses
+        index = self.catalog.snapshot().value
+        n_products = len(index)
+        # Column j is unlocked when j < the number of min_scores <= score.
+        unlocked = np.searchsorted(index.min_scores, score, side='right')
+        eligible = np.arange(n_products) < unlocked[:, None]
+        max_eligible = np.zeros((n, n_products))
+        emi = np.zeros((n, n_products))
+        for j, p in enumerate(index.products):
+            max_eligible[:, j] = np.minimum(p['max_amount'], income * p['tenure_months'] * 0.3)
+            emi[:, j] = finance.emi(np.minimum(requested, max_eligible[:, j]),
+                                    p['interest_rate'] / 12 / 100, p['tenure_months'])
+        affordable = emi < (disposable * 0.5)[:, None]
+
+        return {
+            'score': score,
+            'verdict': verdict,
+            'risk_level': risk,
+            'factors': factors,
+            'products': [p['name'] for p in index.products],
+            'eligible': eligible,
+            'max_eligible_amount': np.where(eligible, np.round(max_eligible), 0).astype(np.int64),
+            'monthly_emi': np.where(eligible, np.round(emi), 0).astype(np.int64),
+            'affordable': affordable & eligible,
+            'monthly_disposable': disposable,
+            'safe_emi': np.round(disposable * 0.4).astype(np.int64),
+        }
+
+    #  What-if surface
+    GRID_AXES = (
+        # field, default steps, default upper bound as (multiple of base, floor)
+        ('monthly_income', 50, (2, 100000)),
+        ('existing_debt', 50, (2, 200000)),
+        ('savings', 20, (2, 200000)),
+    )
+    MAX_GRID_CELLS = 250000
+
+    def what_if_grid(self, data):
+        """Score an income x existing debt x savings grid around one applicant.
+
+        ``data`` is a ``check_eligibility`` payload; ``data['grid']`` may set
+        ``values`` or ``min``/``max``/``steps`` per axis.  Scores and product
+        bitmasks (bit j = ``products[j]``) come back as base64 typed arrays
+        in C order over ``shape``, so a client can redraw any slider
+        position without another request.
+        """
+        spec = data.get('grid', {})
+        if not isinstance(spec, dict) or not all(isinstance(spec.get(f, {}), dict) for f, *_ in self.GRID_AXES):
+            return {'error': 'grid must map each axis to {"values": [...]} or {"min", "max", "steps"}.'}
+        axes = {}
+        try:
+            for field, steps, (mult, floor) in self.GRID_AXES:
+                axis = spec.get(field, {})
+                if 'values' in axis:
+                    values = np.asarray(axis['values'], dtype=np.float64)
+                else:
+                    steps = int(axis.get('steps', steps))
+                    # Checked before linspace allocates the axis.
+                    if not 1 <= steps <= self.MAX_GRID_CELLS:
+                        return {'error': f'{field} steps must be between 1 and {self.MAX_GRID_CELLS:,}.'}
+                    base = float(data.get(field, 0))
+                    bounds = np.array([axis.get('min', 0), axis.get('max', max(base * mult, floor))],
+                                      dtype=np.float64)
+                    if not np.all(np.isfinite(bounds)):
+                        raise ValueError
+                    values = np.linspace(*bounds, steps)
+                if values.ndim != 1 or not np.all(np.isfinite(values)):
+                    raise ValueError
+                axes[field] = values
+        except (TypeError, ValueError, OverflowError):
+            return {'error': 'Grid values, min, max and steps must be finite numbers.'}
+        shape = tuple(len(v) for v in axes.values())
+        cells = int(np.prod(shape))
+        if not 0 < cells <= self.MAX_GRID_CELLS:
+            return {'error': f'Grid must have between 1 and {self.MAX_GRID_CELLS:,} cells.'}
+
+        columns = {k: np.full(cells, data.get(k, 0)) for k in (
+            'monthly_expenses', 'employment_months', 'dependents', 'requested_amount')}
+        columns['has_bank_account'] = np.full(cells, bool(data.get('has_bank_account', False)))
+        for field, grid in zip(axes, np.meshgrid(*axes.values(), indexing='ij')):
+            columns[field] = grid.ravel()
+        result = self.check_eligibility_batch(columns)
+
+        n_products = len(result['products'])
+        mask_dtype = np.dtype('<u1' if n_products <= 8 else '<u2' if n_products <= 16 else '<u4')
+        bits = (1 << np.arange(n_products)).astype(mask_dtype)
+        eligible = (result['eligible'] * bits).sum(axis=1, dtype=mask_dtype)
+        affordable = (result['affordable'] * bits).sum(axis=1, dtype=mask_dtype)
+
+        def typed(array, dtype):
+            array = np.ascontiguousarray(array, dtype=dtype)
+            return {'dtype': array.dtype.str, 'data': base64.b64encode(array.tobytes()).decode('ascii')}
+
+        return {
+            'shape': list(shape),
+            'axes': {k: v.tolist() for k, v in axes.items()},
+            'products': result['products'],
+            'score': typed(result['score'], '<u1'),
+            'eligible_mask': typed(eligible, mask_dtype),
+            'affordable_mask': typed(affordable, mask_dtype),
+        }
@@ -0,0 +1,76 @@
+"""
+Fin AI – Merchant Index
+Persistent merchant -> category table in finai.db, keyed on the
+normalized merchant string, used to remember user corrections.
+"""
+
+import sqlite3
+
+# Stay well under SQLite's host-parameter limit on older builds.
+_MAX_PARAMS = 900
+
+
+class MerchantIndex:
+
+    def __init__(self, db_path='finai.db'):
+        self.db_path = db_path
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS merchant_categories (
+                merchant_key TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                source TEXT NOT NULL DEFAULT 'user',
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def lookup_many(self, keys):
+        """Return {merchant_key: category} for the keys that are known.
+
+        Keys are de-duplicated first, so a whole statement normally costs
+        one indexed ``IN (...)`` query.
+        """
+        unique = list(dict.fromkeys(k for k in keys if k))
+        if not unique:
+            return {}
+        found = {}
+        conn = self._connect()
+        try:
+            for i in range(0, len(unique), _MAX_PARAMS):
+                chunk = unique[i:i + _MAX_PARAMS]
+                marks = ','.join('?' * len(chunk))
+                found.update(conn.execute(
+                    f'SELECT merchant_key, category FROM merchant_categories '
+                    f'WHERE merchant_key IN ({marks})', chunk))
+        finally:
+            conn.close()
+        return found
+
+    def items(self, source=None):
+        """All (merchant_key, category) pairs, optionally for one source."""
+        conn = self._connect()
+        if source is None:
+            rows = conn.execute('SELECT merchant_key, category FROM merchant_categories').fetchall()
+        else:
+            rows = conn.execute('SELECT merchant_key, category FROM merchant_categories '
+                                'WHERE source = ?', (source,)).fetchall()
+        conn.close()
+        return rows
+
+    def set_category(self, merchant_key, category, source='user'):
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO merchant_categories (merchant_key, category, source)
+            VALUES (?, ?, ?)
+            ON CONFLICT(merchant_key) DO UPDATE SET
+                category = excluded.category,
+                source = excluded.source,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (merchant_key, category, source))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,143 @@
+"""
+Fin AI – Monte Carlo
+Seeded, chunked path simulation shared by the stochastic engines.
+
+Paths are generated in fixed-size chunks, each with its own child of a
+``numpy.random.SeedSequence``.  Chunking does not depend on the number
+of workers, so a given seed gives the same result whether the chunks run
+in this process or across a process pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CHUNK_PATHS = 4096
+# Below this many paths a process pool costs more than it saves.
+POOL_MIN_PATHS = 50_000
+MAX_PATHS = 100_000
+
+
+def seed_sequence(seed=None):
+    """A SeedSequence for ``seed``; fresh OS entropy when it is None."""
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+
+def chunk_sizes(paths, chunk=CHUNK_PATHS):
+    full, rest = divmod(paths, chunk)
+    return [chunk] * full + ([rest] if rest else [])
+
+
+def map_chunks(fn, tasks, paths, workers=None):
+    """Run ``fn(*task)`` for every task, in order.
+
+    Uses a process pool when ``paths`` (the total across tasks) is at
+    least ``POOL_MIN_PATHS`` and ``workers`` is not 1.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or paths < POOL_MIN_PATHS or len(tasks) < 2:
+        return [fn(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(fn, *zip(*tasks)))
+
+
+#  Savings growth
+def _savings_chunk(seed, n, current, monthly, annual_rate, volatility, months, steps):
+    """Balances at ``steps`` (1-based months) for ``n`` lognormal paths.
+
+    Monthly gross returns are exp(mu - s^2/2 + s Z) with mu = ln(1 + r/12)
+    and s = volatility / sqrt(12), so their mean matches the deterministic
+    rate.  With P_t the cumulative growth, the end-of-month contribution
+    recurrence B_t = B_{t-1} G_t + c has the closed form
+    B_t = P_t (current + c * sum_{s<=t} 1 / P_s).
+    """
+    rng = np.random.default_rng(seed)
+    s = volatility / np.sqrt(12)
+    log_growth = rng.standard_normal((n, months))
+    log_growth *= s
+    log_growth += np.log1p(annual_rate / 12) - s * s / 2
+    np.cumsum(log_growth, axis=1, out=log_growth)
+    cols = steps - 1
+    contributions = np.cumsum(np.exp(-log_growth), axis=1)[:, cols]
+    return np.exp(log_growth[:, cols]) * (current + monthly * contributions)
+
+
+def simulate_savings(current, monthly, strategies, months, target, steps,
+                     paths=10_000, seed=None, workers=None):
+    """Simulate ``paths`` balance paths for each ``(rate, volatility)``.
+
+    Returns the SeedSequence entropy (to replay the run) and, per
+    strategy, the probability of reaching ``target`` by ``months`` and
+    P5/P50/P95 balances at each month in ``steps`` (which must end at
+    ``months``).
+    """
+    root = seed_sequence(seed)
+    steps = np.asarray(steps, dtype=np.int64)
+    sizes = chunk_sizes(paths)
+    tasks, owners = [], []
+    for i, (child, (rate, vol)) in enumerate(zip(root.spawn(len(strategies)), strategies)):
+        for chunk_seed, n in zip(child.spawn(len(sizes)), sizes):
+            tasks.append((chunk_seed, n, current, monthly, rate, vol, months, steps))
+            owners.append(i)
+    chunks = map_chunks(_savings_chunk, tasks, paths * len(strategies), workers)
+
+    results = []
+    for i in range(len(strategies)):
+        balances = np.concatenate([c for c, owner in zip(chunks, owners) if owner == i])
+        bands = np.percentile(balances, [5, 50, 95], axis=0)
+        results.append({
+            'probability': float(np.mean(balances[:, -1] >= target)),
+            'p5': bands[0], 'p50': bands[1], 'p95': bands[2],
+        })
+    return root.entropy, results
+
+
+#  Interest-rate P&L
+# Cap on path x cash-flow cells per chunk, to bound memory on big books.
+MAX_CELLS = 1 << 21
+
+
+def _rate_chunk(seed, n, chol, loadings, yields, tau, flows, base):
+    """Portfolio P&L on ``n`` paths of a multi-factor Vasicek curve.
+
+    Factor states at the horizon are drawn in one step (the OU
+    transition is Gaussian); the yield at each cash flow's remaining
+    tenor then moves by ``factors @ loadings``, and the flow is
+    repriced at its holding's yield plus that shift.
+    """
+    rng = np.random.default_rng(seed)
+    factors = rng.standard_normal((n, chol.shape[0])) @ chol.T
+    shifted = np.maximum(yields + factors @ loadings, -0.99)
+    values = np.exp(-tau * np.log1p(shifted)) @ flows
+    return values - base
+
+
+def simulate_rate_pnl(flows, times, yields, horizon, speeds, cov,
+                      paths=10_000, seed=None, workers=None):
+    """Simulate portfolio P&L over ``horizon`` years.
+
+    ``flows``, ``times`` and ``yields`` describe every cash flow of the
+    book (one entry each, the yield being its holding's).  ``speeds``
+    and ``cov`` are the factors' mean-reversion speeds and the
+    covariance of their states at the horizon.  Flows paid before the
+    horizon count at face value.  Returns the SeedSequence entropy and
+    the P&L of each path.
+    """
+    flows, times, yields = (np.asarray(v, dtype=np.float64) for v in (flows, times, yields))
+    # P&L = (value at the horizon + flows received by then) - value today.
+    value_now = float(np.sum(flows * np.power(1 + yields, -times)))
+    tau = times - horizon
+    alive = tau > 0
+    base = value_now - float(flows[~alive].sum())
+    flows, tau, yields = flows[alive], tau[alive], yields[alive]
+    speeds = np.asarray(speeds, dtype=np.float64)[:, None]
+    loadings = -np.expm1(-speeds * tau) / (speeds * tau)
+
+    root = seed_sequence(seed)
+    chunk = max(1, min(CHUNK_PATHS, MAX_CELLS // max(1, flows.size)))
+    sizes = chunk_sizes(paths, chunk)
+    chol = np.linalg.cholesky(np.asarray(cov, dtype=np.float64))
+    tasks = [(child, n, chol, loadings, yields, tau, flows, base)
+             for child, n in zip(root.spawn(len(sizes)), sizes)]
+    return root.entropy, np.concatenate(map_chunks(_rate_chunk, tasks, paths, workers))
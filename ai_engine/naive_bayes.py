@@ -0,0 +1,173 @@
+"""
+Fin AI – Hashed Naive Bayes Fallback
+Multinomial naive Bayes over hashed character n-grams, used to place
+transactions the keyword rules leave in 'other'.  Trained from the
+ExpenseCategorizer keyword table plus stored user corrections; runs
+fully offline and scores a whole batch as one (sparse) product of the
+n-gram count matrix with the class log-probability matrix.
+
+Train a model file with:
+    python -m ai_engine.naive_bayes --db finai.db --out expense_nb.npz
+"""
+
+import argparse
+
+import numpy as np
+
+N_FEATURES = 2 ** 12
+NGRAM_RANGE = (3, 4)
+# Rows scored per product, bounding the gathered weight block.
+BATCH_ROWS = 4096
+
+
+_MULT = np.uint32(0x01000193)   # FNV prime
+_MIX = np.uint32(0x9E3779B1)    # golden-ratio multiplier
+
+
+def _hashed_ngrams(texts, n_features, ngram_range):
+    """Hash every character n-gram of every text in one vectorized pass.
+
+    Returns ``(rows, ids)``: the text index and feature id of each n-gram.
+    Hashing is plain uint32 arithmetic, so it is stable across processes.
+    """
+    encoded = [f' {t} '.encode() for t in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    buf = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint32)
+    row_of = np.repeat(np.arange(len(encoded)), lengths)
+    offset = np.arange(len(buf)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    rows, ids = [], []
+    lo, hi = ngram_range
+    for n in range(lo, hi + 1):
+        m = len(buf) - n + 1
+        if m <= 0:
+            continue
+        h = np.full(m, n, dtype=np.uint32)
+        for k in range(n):
+            h = h * _MULT ^ buf[k:k + m]
+        valid = offset[:m] + n <= lengths[row_of[:m]]
+        rows.append(row_of[:m][valid])
+        ids.append((h[valid] * _MIX) % np.uint32(n_features))
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(ids).astype(np.int64)
+
+
+class HashedNaiveBayes:
+
+    def __init__(self, labels, log_prior, feature_log_prob,
+                 n_features=N_FEATURES, ngram_range=NGRAM_RANGE):
+        self.labels = list(labels)
+        self.log_prior = np.asarray(log_prior, dtype=np.float32)
+        self.feature_log_prob = np.asarray(feature_log_prob, dtype=np.float32)
+        # Feature-major copy so each n-gram gathers one contiguous row.
+        self._weights = np.ascontiguousarray(self.feature_log_prob.T)
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+
+    #  Training
+    @classmethod
+    def fit(cls, texts, labels, alpha=1.0, n_features=N_FEATURES, ngram_range=NGRAM_RANGE):
+        classes = list(dict.fromkeys(labels))
+        index = {c: i for i, c in enumerate(classes)}
+        label_ids = np.fromiter((index[c] for c in labels), dtype=np.int64, count=len(labels))
+
+        rows, ids = _hashed_ngrams(list(texts), n_features, ngram_range)
+        counts = np.bincount(label_ids[rows] * n_features + ids,
+                             minlength=len(classes) * n_features).reshape(len(classes), n_features)
+        docs = np.bincount(label_ids, minlength=len(classes)).astype(np.float64)
+
+        smoothed = counts + alpha
+        feature_log_prob = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+        log_prior = np.log(docs / docs.sum())
+        return cls(classes, log_prior, feature_log_prob, n_features, ngram_range)
+
+    @classmethod
+    def from_categorizer(cls, categories, corrections=()):
+        """Train on the keyword table, one document per keyword, plus
+        ``(merchant_key, category)`` corrections."""
+        texts, labels = [], []
+        for cat, keywords in categories.items():
+            texts.extend(keywords)
+            labels.extend([cat] * len(keywords))
+        for key, cat in corrections:
+            if cat in categories:
+                texts.append(key)
+                labels.append(cat)
+        return cls.fit(texts, labels)
+
+    #  Prediction
+    def _matrix(self, texts):
+        """Dense n-gram count matrix, shape (len(texts), n_features)."""
+        rows, ids = _hashed_ngrams(texts, self.n_features, self.ngram_range)
+        counts = np.bincount(rows * self.n_features + ids, minlength=len(texts) * self.n_features)
+        return counts.reshape(len(texts), self.n_features).astype(np.float32)
+
+    def _joint_log_likelihood(self, texts):
+        # Equivalent to ``self._matrix(texts) @ self.feature_log_prob.T``
+        # without materialising the mostly-zero count matrix: gather the
+        # weight row of every n-gram and sum them per text.
+        rows, ids = _hashed_ngrams(texts, self.n_features, self.ngram_range)
+        order = np.argsort(rows, kind='stable')
+        rows = rows[order]
+        weights = self._weights[ids[order]]
+        joint = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        if len(rows):
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            joint[rows[starts]] = np.add.reduceat(weights, starts, axis=0)
+        return joint + self.log_prior
+
+    def predict_proba(self, texts):
+        """Posterior probabilities, shape (len(texts), len(labels))."""
+        out = np.empty((len(texts), len(self.labels)), dtype=np.float32)
+        for start in range(0, len(texts), BATCH_ROWS):
+            chunk = texts[start:start + BATCH_ROWS]
+            joint = self._joint_log_likelihood(chunk)
+            joint -= joint.max(axis=1, keepdims=True)
+            np.exp(joint, out=joint)
+            out[start:start + len(chunk)] = joint / joint.sum(axis=1, keepdims=True)
+        return out
+
+    def predict(self, texts):
+        """Return (labels, confidences) for a batch of texts."""
+        if not len(texts):
+            return [], np.empty(0, dtype=np.float32)
+        proba = self.predict_proba(list(texts))
+        best = proba.argmax(axis=1)
+        return [self.labels[i] for i in best], proba[np.arange(len(best)), best]
+
+    #  Persistence
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            log_prior=self.log_prior,
+            feature_log_prob=self.feature_log_prob,
+            n_features=self.n_features,
+            ngram_range=np.array(self.ngram_range),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f['labels'].tolist(), f['log_prior'], f['feature_log_prob'],
+                       int(f['n_features']), tuple(f['ngram_range'].tolist()))
+
+
+def main(argv=None):
+    from ai_engine.expense_categorizer import ExpenseCategorizer
+    from ai_engine.merchant_index import MerchantIndex
+
+    parser = argparse.ArgumentParser(description='Train the expense naive Bayes fallback model.')
+    parser.add_argument('--db', default=None, help='finai.db path with user corrections')
+    parser.add_argument('--out', default='expense_nb.npz', help='model file to write')
+    args = parser.parse_args(argv)
+
+    corrections = MerchantIndex(args.db).items(source='user') if args.db else []
+    model = HashedNaiveBayes.from_categorizer(ExpenseCategorizer.CATEGORIES, corrections)
+    model.save(args.out)
+    print(f'Trained on {len(corrections)} corrections; wrote {args.out}')
+
+
+if __name__ == '__main__':
+    main()
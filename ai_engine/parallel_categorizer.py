@@ -0,0 +1,143 @@
+"""
+Fin AI – Parallel Statement Categorizer
+Splits a large CSV statement into byte-range shards, categorizes each
+shard in a worker process and merges the per-shard totals.
+
+Usage:  python -m ai_engine.parallel_categorizer statement.csv --workers 4
+"""
+
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from ai_engine.expense_categorizer import ExpenseCategorizer
+from ai_engine.merchant_index import MerchantIndex
+from ai_engine.statement_reader import iter_csv_rows
+
+# Shards per worker: smaller shards even out uneven row lengths.
+SHARDS_PER_WORKER = 4
+
+
+def _exact_add(partials, x):
+    """Add ``x`` to a list of non-overlapping float partials (Shewchuk).
+
+    The partials hold the sum exactly, so shard results can be merged in
+    any order and still round to the same total with ``math.fsum``.
+    """
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        header = f.readline()
+        return header.decode('utf-8-sig'), f.tell()
+
+
+def _shard_lines(f, start, end):
+    """Yield the lines that *start* inside [start, end)."""
+    if start > 0:
+        f.seek(start - 1)
+        if f.read(1) != b'\n':
+            f.readline()
+    while f.tell() < end:
+        line = f.readline()
+        if not line:
+            break
+        yield line.decode('utf-8')
+
+
+def _categorize_shard(path, header, start, end, db_path, word_boundary):
+    index = MerchantIndex(db_path) if db_path else None
+    categorizer = ExpenseCategorizer(word_boundary=word_boundary, merchant_index=index)
+    partials: dict[str, list] = {}
+    total: list = []
+    count = 0
+
+    with open(path, 'rb') as f:
+        rows = iter_csv_rows(chain([header], _shard_lines(f, start, end)))
+        for record in categorizer.categorize_stream(rows):
+            if 'summary' in record:
+                break
+            if 'error' in record:
+                raise ValueError(record['error'])
+            _exact_add(partials.setdefault(record['category'], []), record['amount'])
+            _exact_add(total, record['amount'])
+            count += 1
+
+    return partials, total, count
+
+
+def categorize_file(path, workers=None, db_path=None, word_boundary=False):
+    """Categorize a CSV statement across ``workers`` processes.
+
+    Category totals are summed exactly and listed in ``CATEGORY_CODES``
+    order, so the result is identical for any number of workers.  Rows
+    must not contain quoted newlines, since shards split on line breaks.
+    """
+    workers = workers or os.cpu_count() or 1
+    header, body_start = _read_header(path)
+    size = os.path.getsize(path)
+
+    n_shards = max(1, min(workers * SHARDS_PER_WORKER, size - body_start))
+    step = math.ceil((size - body_start) / n_shards) if size > body_start else 0
+    bounds = [(body_start + i * step, min(size, body_start + (i + 1) * step))
+              for i in range(n_shards)]
+    args = [(path, header, start, end, db_path, word_boundary) for start, end in bounds]
+
+    if workers == 1:
+        shard_results = [_categorize_shard(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shard_results = list(pool.map(_categorize_shard, *zip(*args)))
+
+    merged: dict[str, list] = {}
+    total_parts, count = [], 0
+    for partials, total, n in shard_results:
+        for cat, parts in partials.items():
+            merged.setdefault(cat, []).extend(parts)
+        total_parts.extend(total)
+        count += n
+
+    totals = {cat: math.fsum(merged[cat])
+              for cat in ExpenseCategorizer.CATEGORY_CODES if cat in merged}
+    total = math.fsum(total_parts)
+
+    return {
+        'category_totals': totals,
+        'total': total,
+        'insights': ExpenseCategorizer._insights(totals, total),
+        'num_transactions': count,
+        'categories_found': len(totals),
+        'shards': n_shards,
+        'workers': workers,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Categorize a large CSV statement in parallel.')
+    parser.add_argument('path', help='CSV statement with description and amount columns')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--db', default=None, help='finai.db path for remembered merchants')
+    parser.add_argument('--word-boundary', action='store_true', help='match keywords on word boundaries')
+    args = parser.parse_args(argv)
+
+    result = categorize_file(args.path, workers=args.workers, db_path=args.db,
+                             word_boundary=args.word_boundary)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
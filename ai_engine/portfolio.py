@@ -0,0 +1,95 @@
+"""
+Fin AI – Portfolio Frontier
+Long-only mean-variance efficient frontier over the savings instruments.
+
+The frontier is found by dense random-portfolio sampling: Dirichlet
+draws at several concentrations plus every single instrument and every
+two-instrument mix, scored in one matrix product.  The upper envelope
+of (volatility, return) is kept at ``FRONTIER_POINTS`` volatility
+levels.  It is built once per catalog load, so picking an allocation for
+a request is a bisect.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+FRONTIER_POINTS = 60
+SAMPLES = 40_000
+# Goals shorter than this take proportionally less volatility.
+FULL_RISK_MONTHS = 60
+
+
+def covariance(volatility, correlation):
+    vol = np.asarray(volatility, dtype=np.float64)
+    corr = np.asarray(correlation, dtype=np.float64)
+    if corr.shape != (vol.size, vol.size) or not np.allclose(corr, corr.T):
+        raise ValueError('correlation must be a symmetric matrix with one row per instrument')
+    if not np.allclose(np.diag(corr), 1) or np.linalg.eigvalsh(corr)[0] < -1e-10:
+        raise ValueError('correlation must have a unit diagonal and be positive semi-definite')
+    return corr * np.outer(vol, vol)
+
+
+def _candidates(k, samples, seed):
+    rng = np.random.default_rng(seed)
+    draws = [rng.dirichlet(np.full(k, alpha), samples // 4) for alpha in (0.05, 0.2, 1.0, 5.0)]
+    pairs = []
+    mix = np.linspace(0, 1, 51)
+    for i in range(k):
+        for j in range(i + 1, k):
+            w = np.zeros((mix.size, k))
+            w[:, i], w[:, j] = mix, 1 - mix
+            pairs.append(w)
+    return np.vstack([np.eye(k), *pairs, *draws])
+
+
+def efficient_frontier(expected_return, cov, points=FRONTIER_POINTS, samples=SAMPLES, seed=0):
+    """Return ``(weights, returns, vols)`` along the frontier, by rising volatility."""
+    mu = np.asarray(expected_return, dtype=np.float64)
+    w = _candidates(mu.size, samples, seed)
+    ret = w @ mu
+    vol = np.sqrt(np.einsum('ij,jk,ik->i', w, cov, w))
+
+    # Best return in each volatility bin, then keep the rising envelope.
+    edges = np.linspace(vol.min(), vol.max(), points + 1)
+    bins = np.clip(np.searchsorted(edges, vol, side='right') - 1, 0, points - 1)
+    order = np.lexsort((-ret, bins))
+    first = order[np.r_[True, bins[order][1:] != bins[order][:-1]]]
+    first = first[np.argsort(vol[first])]
+    keep = ret[first] > np.maximum.accumulate(np.r_[-np.inf, ret[first]])[:-1]
+    best = first[keep]
+    return w[best], ret[best], vol[best]
+
+
+class Frontier:
+    """Efficient frontier plus the per-tier slices allocations are read from."""
+
+    __slots__ = ('instruments', 'weights', 'returns', 'vols', 'tiers')
+
+    def __init__(self, instruments, correlation, tier_vols):
+        self.instruments = tuple(i['name'] for i in instruments)
+        mu = [float(i['expected_return']) for i in instruments]
+        cov = covariance([float(i['volatility']) for i in instruments], correlation)
+        weights, returns, vols = efficient_frontier(mu, cov)
+        self.weights = weights
+        self.returns = tuple(returns.tolist())
+        self.vols = tuple(vols.tolist())
+        # Frontier indices open to each tier: everything up to its volatility cap.
+        self.tiers = {tier: max(1, bisect_right(self.vols, cap)) for tier, cap in tier_vols.items()}
+
+    def allocate(self, tier, months):
+        """Highest-return frontier point within the tier's volatility cap,
+        scaled down by sqrt(months / FULL_RISK_MONTHS) for short goals."""
+        end = self.tiers[tier]
+        cap = self.vols[end - 1] * min(1.0, (months / FULL_RISK_MONTHS) ** 0.5)
+        i = max(0, bisect_right(self.vols, cap, 0, end) - 1)
+        return {
+            'weights': {name: round(float(w) * 100, 1)
+                        for name, w in zip(self.instruments, self.weights[i]) if w >= 0.0005},
+            'expected_return': round(self.returns[i] * 100, 2),
+            'volatility': round(self.vols[i] * 100, 2),
+        }
+
+    def points(self):
+        return [{'expected_return': round(r * 100, 2), 'volatility': round(v * 100, 2)}
+                for r, v in zip(self.returns, self.vols)]
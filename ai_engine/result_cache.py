@@ -0,0 +1,220 @@
+"""
+Fin AI – Result Cache
+Content-addressed cache for the pure JSON-in / JSON-out engines
+(budget, loan, savings, risk).  A result is keyed by a SHA-256 of the
+canonical input plus the engine name, method and ``VERSION``, and kept
+in two tiers: a per-engine in-process LRU with TTL, and a SQLite table
+in finai.db shared by every WSGI worker.  Bumping an engine's
+``VERSION`` orphans its old entries; ``invalidate()`` drops them now.
+
+Keys also carry the engine's generation from the shared
+``engine_generation`` table.  ``invalidate()`` bumps it, so every
+worker's in-process entries stop matching, not just the caller's.
+Workers re-read the generation at most every ``GENERATION_TTL``
+seconds, keeping memory hits off the disk; other workers may serve
+stale results for up to that long after an invalidate.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from ai_engine.cache import LRUCache
+
+# Purge expired SQLite rows once every this many writes.
+PURGE_EVERY = 256
+# Seconds a worker trusts its copy of an engine's generation.
+GENERATION_TTL = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value):
+    """Make equivalent inputs hash alike: 5 and 5.0 are the same amount."""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def input_key(engine, version, method, data, generation=0):
+    canonical = json.dumps(_normalize(data), sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return f'{engine}:{version}:{generation}:{method}:{digest}'
+
+
+class ResultCache:
+
+    def __init__(self, db_path='finai.db', maxsize=1024, ttl=3600, generation_ttl=GENERATION_TTL):
+        self.db_path = db_path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation_ttl = generation_ttl
+        self._memory = {}
+        self._counters = {}
+        # engine -> (generation, monotonic time it must be re-read by)
+        self._generations = {}
+        self._unserializable = set()
+        self._lock = threading.Lock()
+        self._writes = 0
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS result_cache (
+                cache_key TEXT PRIMARY KEY,
+                engine TEXT NOT NULL,
+                result TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        # One row per invalidated engine, plus '*' for invalidate-all.
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS engine_generation (
+                engine TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _engine(self, engine):
+        if engine not in self._memory:
+            with self._lock:
+                if engine not in self._memory:
+                    self._counters[engine] = {'db_hits': 0, 'misses': 0}
+                    self._memory[engine] = LRUCache(self.maxsize, ttl=self.ttl)
+        return self._memory[engine], self._counters[engine]
+
+    @staticmethod
+    def _read_generation(conn, engine):
+        # Both rows only ever grow, so their sum changes on every invalidate.
+        return conn.execute("SELECT COALESCE(SUM(generation), 0) FROM engine_generation "
+                            "WHERE engine IN (?, '*')", (engine,)).fetchone()[0]
+
+    def _generation(self, engine):
+        cached = self._generations.get(engine)
+        now = time.monotonic()
+        if cached is not None and now < cached[1]:
+            return cached[0]
+        conn = self._connect()
+        generation = self._read_generation(conn, engine)
+        conn.close()
+        self._generations[engine] = (generation, now + self.generation_ttl)
+        return generation
+
+    def call(self, engine, version, method, data, compute):
+        """Return the cached result of ``compute(data)``, computing on a miss."""
+        memory, counters = self._engine(engine)
+        try:
+            key = input_key(engine, version, method, data, self._generation(engine))
+        except (TypeError, ValueError):
+            return compute(data)
+
+        text = memory.get(key)
+        if text is None:
+            conn = self._connect()
+            row = conn.execute('SELECT result FROM result_cache WHERE cache_key = ? AND expires_at > ?',
+                               (key, time.time())).fetchone()
+            conn.close()
+            if row is None:
+                counters['misses'] += 1
+                result = compute(data)
+                self._store(engine, key, result)
+                return result
+            text = row[0]
+            counters['db_hits'] += 1
+            memory.put(key, text)
+        # Stored as JSON text, so callers always get a private copy.
+        return json.loads(text)
+
+    def _store(self, engine, key, result):
+        try:
+            text = json.dumps(result)
+        except (TypeError, ValueError):
+            if engine not in self._unserializable:
+                self._unserializable.add(engine)
+                logger.warning('%s returned a result that is not JSON-serializable; '
+                               'it is not cached', engine)
+            return
+        self._memory[engine].put(key, text)
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO result_cache (cache_key, engine, result, expires_at) '
+                         'VALUES (?, ?, ?, ?)', (key, engine, text, time.time() + self.ttl))
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                conn.execute('DELETE FROM result_cache WHERE expires_at <= ?', (time.time(),))
+        conn.close()
+
+    def invalidate(self, engine=None):
+        """Drop cached results for one engine, or for all engines, in every worker."""
+        engines = [engine] if engine else list(self._memory)
+        for name in engines:
+            if name in self._memory:
+                self._memory[name].clear()
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT INTO engine_generation (engine, generation) VALUES (?, 1) '
+                         'ON CONFLICT (engine) DO UPDATE SET generation = generation + 1',
+                         (engine or '*',))
+            if engine:
+                cur = conn.execute('DELETE FROM result_cache WHERE engine = ?', (engine,))
+            else:
+                cur = conn.execute('DELETE FROM result_cache')
+        # This worker sees the new generation at once; others within GENERATION_TTL.
+        expires = time.monotonic() + self.generation_ttl
+        for name in [engine] if engine else list(self._generations):
+            self._generations[name] = (self._read_generation(conn, name), expires)
+        conn.close()
+        return {'invalidated': engine or 'all', 'rows_deleted': cur.rowcount}
+
+    def stats(self):
+        """Per-engine counters: memory hits, shared (SQLite) hits, misses."""
+        out = {}
+        for engine, memory in list(self._memory.items()):
+            counters = self._counters[engine]
+            memory_stats = memory.stats()
+            lookups = memory_stats['hits'] + memory_stats['misses']
+            hits = memory_stats['hits'] + counters['db_hits']
+            out[engine] = {
+                'memory_hits': memory_stats['hits'],
+                'db_hits': counters['db_hits'],
+                'misses': counters['misses'],
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_size': memory_stats['size'],
+                'evictions': memory_stats['evictions'],
+                'expirations': memory_stats['expirations'],
+            }
+        return out
+
+
+class CachedEngine:
+    """Wraps an engine so the listed methods go through a ResultCache.
+
+    The key version is the engine's ``cache_version`` when it has one
+    (engines backed by a reloadable catalog include its content hash),
+    otherwise ``VERSION``.  Every other attribute is passed through to
+    the wrapped engine.
+    """
+
+    def __init__(self, engine, cache, *methods):
+        self._engine = engine
+        name = type(engine).__name__
+        for method in methods:
+            compute = getattr(engine, method)
+            setattr(self, method,
+                    lambda data, _m=method, _c=compute: cache.call(name, self._version(), _m, data, _c))
+
+    def _version(self):
+        return getattr(self._engine, 'cache_version', None) or getattr(self._engine, 'VERSION', 0)
+
+    def __getattr__(self, attr):
+        return getattr(self._engine, attr)
@@ -6,11 +6,39 @@ framed for financial-inclusion use cases.
 """
 
 import math
+from itertools import islice
+
+import numpy as np
+
+from ai_engine import finance, monte_carlo
+from ai_engine.amortization import AmortizationSchedule
+
+
+# Key-rate tenors (years); a key-rate shift fades linearly to the neighbouring tenors.
+KEY_TENORS = (1, 2, 3, 5, 7, 10, 20, 30)
+DEFAULT_SHOCKS_BP = tuple(range(-300, 301, 25))
+MAX_SHOCKS = 201
+# Non-parallel curve moves, as basis points at chosen tenors (flat beyond the ends).
+CURVE_SCENARIOS = {
+    'bear_steepener': {1: 0, 10: 100, 30: 150},
+    'bull_flattener': {1: 0, 10: -75, 30: -100},
+    'short_end_up': {1: 200, 5: 50, 10: 0},
+    'twist': {1: -100, 5: 0, 30: 100},
+}
+
+# Two-factor Vasicek (G2-style) curve for VaR: a fast short-end factor and
+# a slow level factor, negatively correlated so the curve twists as well
+# as shifts.  Annual speeds of mean reversion and volatilities.
+RATE_MODEL = {'speeds': (0.5, 0.05), 'volatilities': (0.012, 0.008), 'correlation': -0.3}
+MAX_HORIZON_DAYS = 365
+MAX_ALTERNATIVES = 5000
 
 
 class RiskOptimizationEngine:
     """Provides three core analyses used on the Analytics page."""
 
+    VERSION = 4
+
     #  1. Fixed-Income Risk & Optimization 
     def analyze_fixed_income(self, data):
         """Score risk across the user's fixed-income holdings and suggest
@@ -34,20 +62,16 @@ class RiskOptimizationEngine:
 
             # Macaulay duration proxy for simple instruments
             if r > 0 and t > 0:
-                coupon = p * r
-                pv_coupons = sum(coupon / (1 + r) ** yr for yr in range(1, int(t) + 1))
-                pv_face = p / (1 + r) ** t
-                price = pv_coupons + pv_face
-                mac_dur = sum(yr * (coupon / (1 + r) ** yr) for yr in range(1, int(t) + 1))
-                mac_dur += t * (p / (1 + r) ** t)
-                mac_dur /= price if price else 1
-                mod_dur = mac_dur / (1 + r)
+                bond = finance.bond_metrics(p, r, r, t)
+                mac_dur = bond['macaulay_duration']
+                mod_dur = bond['modified_duration']
+                convexity = bond['convexity']
             else:
-                price = p
                 mac_dur = t
                 mod_dur = t
+                convexity = t * (t + 1)
 
-            maturity_value = p * (1 + r) ** t
+            maturity_value = finance.fv(p, r, t)
             total_return = maturity_value - p
 
             results.append({
@@ -57,6 +81,7 @@ class RiskOptimizationEngine:
                 'tenure': t,
                 'macaulay_duration': round(mac_dur, 2),
                 'modified_duration': round(mod_dur, 2),
+                'convexity': round(convexity, 2),
                 'maturity_value': round(maturity_value, 2),
                 'total_return': round(total_return, 2),
                 'price_sensitivity': round(mod_dur * 0.01 * p, 2),  # Ksh  change per 1% rate move
@@ -95,6 +120,178 @@ class RiskOptimizationEngine:
             'recommendations': recs,
         }
 
+    def rate_shock_grid(self, data):
+        """Reprice every holding under a grid of rate shocks.
+
+        Holdings are ``analyze_fixed_income`` holdings priced at par.
+        Parallel shocks (``shocks_bp``, default -300..+300 bp) are fully
+        repriced in closed form as one holdings x shocks array, next to the
+        duration and duration + convexity approximations.  Non-parallel
+        ``scenarios`` (default ``CURVE_SCENARIOS``) shift each cash flow by
+        its own tenor.  Key-rate durations are exact partial derivatives
+        on ``KEY_TENORS`` and sum to the modified duration.
+        """
+        holdings = data.get('holdings', [])
+        book = self._book(holdings)
+        if isinstance(book, dict):
+            return book
+        face, rate, years = book
+        try:
+            shocks_bp = [float(b) for b in data.get('shocks_bp', DEFAULT_SHOCKS_BP)]
+            scenarios = {str(name): {float(t): float(bp) for t, bp in curve.items()}
+                         for name, curve in data.get('scenarios', CURVE_SCENARIOS).items()}
+        except (TypeError, ValueError, AttributeError):
+            return {'error': 'shocks_bp and scenarios must be numeric.'}
+        if not 1 <= len(shocks_bp) <= MAX_SHOCKS:
+            return {'error': f'Provide between 1 and {MAX_SHOCKS} shocks.'}
+        shocks = np.array(shocks_bp) / 10000
+        if np.any(rate.min() + shocks <= -1):
+            return {'error': 'A shock pushes a yield to -100% or below.'}
+
+        # Base price, duration and convexity from the cash-flow matrix.
+        times, flows = finance.cash_flows(face, rate, years)
+        pv = flows * np.power(1 + rate[:, None], -times)
+        price = pv.sum(axis=1)
+        safe = np.where(price > 0, price, 1.0)
+        mod_dur = (pv * times).sum(axis=1) / (safe * (1 + rate))
+        convexity = (pv * times * (times + 1)).sum(axis=1) / (safe * (1 + rate) ** 2)
+        krd = self._key_rate_durations(pv * times, times) / (safe * (1 + rate))[:, None]
+
+        # Parallel grid: full repricing and its Taylor approximations.
+        shocked = finance.bond_prices(face[:, None], rate[:, None], rate[:, None] + shocks, years[:, None])
+        pnl = shocked - price[:, None]
+        pnl_duration = -(mod_dur * price)[:, None] * shocks
+        pnl_convexity = pnl_duration + (0.5 * convexity * price)[:, None] * shocks ** 2
+
+        curve_pnl = []
+        for name, curve in scenarios.items():
+            tenors = sorted(curve)
+            shift = np.interp(times, tenors, [curve[t] / 10000 for t in tenors])
+            if np.any(rate[:, None] + shift <= -1):
+                return {'error': f'Scenario {name!r} pushes a yield to -100% or below.'}
+            repriced = (flows * np.power(1 + rate[:, None] + shift, -times)).sum(axis=1)
+            curve_pnl.append({'name': name, 'pnl': round(float((repriced - price).sum()), 2)})
+
+        value = float(price.sum())
+        weights = price / value if value else np.zeros_like(price)
+        # Round whole columns, then zip them into rows.
+        columns = zip([h.get('name', 'Unnamed') for h in holdings], price.round(2).tolist(),
+                      mod_dur.round(4).tolist(), convexity.round(4).tolist(),
+                      krd.round(4).tolist(), pnl.min(axis=1).round(2).tolist())
+        rows = [{'name': name, 'price': p, 'modified_duration': d, 'convexity': c,
+                 'key_rate_durations': k, 'worst_pnl': w} for name, p, d, c, k, w in columns]
+        if data.get('holding_pnl'):
+            for row, holding_pnl in zip(rows, pnl.round(2).tolist()):
+                row['pnl'] = holding_pnl
+
+        return {
+            'shocks_bp': shocks_bp,
+            'key_tenors': list(KEY_TENORS),
+            'portfolio': {
+                'value': round(value, 2),
+                'modified_duration': round(float(weights @ mod_dur), 4),
+                'convexity': round(float(weights @ convexity), 4),
+                'key_rate_durations': np.round(weights @ krd, 4).tolist(),
+                'pnl': np.round(pnl.sum(axis=0), 2).tolist(),
+                'pnl_duration': np.round(pnl_duration.sum(axis=0), 2).tolist(),
+                'pnl_duration_convexity': np.round(pnl_convexity.sum(axis=0), 2).tolist(),
+            },
+            'scenarios': curve_pnl,
+            'holdings': rows,
+        }
+
+    def value_at_risk(self, data):
+        """Monte Carlo VaR and expected shortfall of a fixed-income book.
+
+        Simulates ``paths`` states of a two-factor Vasicek curve
+        (``RATE_MODEL``, overridable via ``model``) at ``horizon_days``,
+        fully reprices every remaining cash flow on each path and reports
+        95% / 99% VaR and ES as positive losses.  ``seed`` makes a run
+        reproducible.
+        """
+        book = self._book(data.get('holdings', []))
+        if isinstance(book, dict):
+            return book
+        face, rate, years = book
+        try:
+            horizon_days = int(data.get('horizon_days', 10))
+            paths = int(data.get('paths', 10_000))
+            seed = data.get('seed')
+            seed = None if seed is None else int(seed)
+            model = {**RATE_MODEL, **data.get('model', {})}
+            speeds = np.array(model['speeds'], dtype=np.float64)
+            vols = np.array(model['volatilities'], dtype=np.float64)
+            rho = float(model['correlation'])
+        except (TypeError, ValueError, KeyError):
+            return {'error': 'horizon_days, paths, seed and model parameters must be numeric.'}
+        if not 1 <= horizon_days <= MAX_HORIZON_DAYS:
+            return {'error': f'horizon_days must be between 1 and {MAX_HORIZON_DAYS}.'}
+        if not 100 <= paths <= monte_carlo.MAX_PATHS:
+            return {'error': f'paths must be between 100 and {monte_carlo.MAX_PATHS}.'}
+        if seed is not None and seed < 0:
+            return {'error': 'seed must be non-negative.'}
+        if speeds.shape != (2,) or vols.shape != (2,) or np.any(speeds <= 0) or np.any(vols < 0) \
+                or not -1 <= rho <= 1:
+            return {'error': 'model needs two positive speeds, two volatilities and a correlation in [-1, 1].'}
+
+        # Covariance of the two OU factor states after the horizon.
+        h = horizon_days / 365
+        decay = -np.expm1(-np.add.outer(speeds, speeds) * h) / np.add.outer(speeds, speeds)
+        cov = np.outer(vols, vols) * np.array([[1, rho], [rho, 1]]) * decay
+        cov += np.eye(2) * 1e-18  # keeps the Cholesky factor defined for zero volatility
+
+        times, flows = finance.cash_flows(face, rate, years)
+        used = times > 0
+        yields = np.broadcast_to(rate[:, None], times.shape)
+        entropy, pnl = monte_carlo.simulate_rate_pnl(flows[used], times[used], yields[used], h,
+                                                     speeds, cov, paths=paths, seed=seed)
+
+        value = float((flows * np.power(1 + rate[:, None], -times)).sum())
+        q99, q95 = np.quantile(pnl, [0.01, 0.05])
+        percentiles = np.percentile(pnl, [1, 5, 50, 95, 99])
+        return {
+            'portfolio_value': round(value, 2),
+            'horizon_days': horizon_days,
+            'paths': paths,
+            'seed': entropy,
+            'expected_pnl': round(float(pnl.mean()), 2),
+            'var': {'95': round(-float(q95), 2), '99': round(-float(q99), 2)},
+            'expected_shortfall': {'95': round(-float(pnl[pnl <= q95].mean()), 2),
+                                   '99': round(-float(pnl[pnl <= q99].mean()), 2)},
+            'pnl_percentiles': dict(zip(('p1', 'p5', 'p50', 'p95', 'p99'),
+                                        np.round(percentiles, 2).tolist())),
+            'model': {'speeds': speeds.tolist(), 'volatilities': vols.tolist(), 'correlation': rho},
+        }
+
+    @staticmethod
+    def _book(holdings):
+        """(principal, rate as a fraction, tenure in years) arrays, or an error dict."""
+        if not holdings:
+            return {'error': 'Add at least one fixed-income holding.'}
+        try:
+            face = np.array([float(h.get('principal', 0)) for h in holdings])
+            rate = np.array([float(h.get('rate', 0)) for h in holdings]) / 100
+            years = np.array([float(h.get('tenure_years', 1)) for h in holdings])
+        except (TypeError, ValueError, AttributeError):
+            return {'error': 'Holdings must have numeric principal, rate and tenure_years.'}
+        if np.any(years <= 0) or np.any(face < 0):
+            return {'error': 'Every holding needs a positive tenure and a non-negative principal.'}
+        return face, rate, years
+
+    @staticmethod
+    def _key_rate_durations(exposure, times):
+        """Spread each cash flow's ``exposure`` (time x PV) over the two
+        key tenors around its time, in proportion to its distance."""
+        keys = np.asarray(KEY_TENORS, dtype=np.float64)
+        t = np.clip(times, keys[0], keys[-1])
+        j = np.clip(np.searchsorted(keys, t, side='right') - 1, 0, len(keys) - 2)
+        frac = (t - keys[j]) / (keys[j + 1] - keys[j])
+        n, width = exposure.shape[0], len(keys)
+        base = j + (np.arange(n) * width)[:, None]
+        krd = np.bincount(base.ravel(), (exposure * (1 - frac)).ravel(), minlength=n * width)
+        krd += np.bincount((base + 1).ravel(), (exposure * frac).ravel(), minlength=n * width)
+        return krd.reshape(n, width)
+
     #  2. Balance-Sheet-Aware Valuation 
     def balance_sheet_valuation(self, data):
         """Compute net worth, solvency metrics, and valuation ratios
@@ -211,11 +408,8 @@ class RiskOptimizationEngine:
         monthly_impact = 0
 
         if decision_type == 'loan':
-            r = interest_rate / 12 / 100
-            if r > 0:
-                emi = amount * r * (1 + r) ** tenure_months / ((1 + r) ** tenure_months - 1)
-            else:
-                emi = amount / tenure_months
+            schedule = AmortizationSchedule(amount, interest_rate, tenure_months)
+            emi = schedule.emi
             total_repay = emi * tenure_months
             total_interest = total_repay - amount
             monthly_impact = -emi
@@ -225,19 +419,8 @@ class RiskOptimizationEngine:
             after['net_position'] = after['savings'] - after['debt']
             after['debt_to_income'] = (after['debt'] / (monthly_income * 12) * 100) if monthly_income else 0
 
-            # Month-by-month projection
-            bal = amount
-            for m in range(1, min(tenure_months + 1, 25)):
-                interest_part = bal * r
-                principal_part = emi - interest_part
-                bal -= principal_part
-                timeline.append({
-                    'month': m,
-                    'emi': round(emi, 2),
-                    'principal': round(principal_part, 2),
-                    'interest': round(interest_part, 2),
-                    'balance': round(max(0, bal), 2),
-                })
+            # Month-by-month projection (first 24; see /api/loan/schedule)
+            timeline = list(islice(schedule.iter_rows(), 24))
 
         elif decision_type == 'investment':
             monthly_return = amount * (interest_rate / 100 / 12)
@@ -247,9 +430,9 @@ class RiskOptimizationEngine:
             after['monthly_surplus'] = before['monthly_surplus'] + monthly_return
             after['net_position'] = after['savings'] - after['debt']
 
-            acc = amount
-            for m in range(1, min(tenure_months + 1, 25)):
-                acc *= (1 + interest_rate / 100 / 12)
+            months = np.arange(1, min(tenure_months, 24) + 1)
+            values = finance.fv(amount, interest_rate / 100 / 12, months)
+            for m, acc in zip(months.tolist(), values.tolist()):
                 timeline.append({
                     'month': m,
                     'value': round(acc, 2),
@@ -300,3 +483,136 @@ class RiskOptimizationEngine:
             'timeline': timeline,
             'decision_type': decision_type,
         }
+
+    def compare_decisions(self, data):
+        """Evaluate many decision alternatives at once and rank them.
+
+        ``data`` holds the ``decision_impact`` profile fields plus
+        ``alternatives`` (a list of decision_type / amount /
+        interest_rate / tenure_months dicts, optionally with a ``label``)
+        and/or ``grid`` (lists of amount, interest_rate and tenure_months,
+        crossed; ``decision_type`` defaults to loan).  Every alternative
+        gets the same before/after, score and verdict as a single
+        ``decision_impact`` call, computed as arrays.  Alternatives come
+        back ranked by impact score, then surplus, then total interest, and
+        ``pareto`` lists those no other alternative beats on both monthly
+        surplus and total interest.
+        """
+        alternatives = list(data.get('alternatives', []))
+        grid = data.get('grid')
+        if grid:
+            axes = [grid.get(k, [data.get(k, d)]) for k, d in
+                    (('amount', 0), ('interest_rate', 10), ('tenure_months', 12))]
+            if np.prod([len(a) for a in axes]) + len(alternatives) > MAX_ALTERNATIVES:
+                return {'error': f'Compare at most {MAX_ALTERNATIVES} alternatives.'}
+            kind = grid.get('decision_type', 'loan')
+            alternatives += [{'decision_type': kind, 'amount': a, 'interest_rate': r, 'tenure_months': t}
+                             for a in axes[0] for r in axes[1] for t in axes[2]]
+        if not alternatives:
+            return {'error': 'Provide alternatives or a grid to compare.'}
+        if len(alternatives) > MAX_ALTERNATIVES:
+            return {'error': f'Compare at most {MAX_ALTERNATIVES} alternatives.'}
+
+        try:
+            monthly_income = float(data.get('monthly_income', 0))
+            monthly_expenses = float(data.get('monthly_expenses', 0))
+            current_savings = float(data.get('current_savings', 0))
+            current_debt = float(data.get('current_debt', 0))
+            kinds = np.array([a.get('decision_type', 'loan') for a in alternatives])
+            amount = np.array([float(a.get('amount', 0)) for a in alternatives])
+            rate = np.array([float(a.get('interest_rate', 10)) for a in alternatives])
+            tenure = np.maximum(1, np.array([int(a.get('tenure_months', 12)) for a in alternatives]))
+        except (TypeError, ValueError, AttributeError):
+            return {'error': 'Alternatives must have numeric amount, interest_rate and tenure_months.'}
+
+        before = {
+            'monthly_surplus': monthly_income - monthly_expenses,
+            'savings': current_savings,
+            'debt': current_debt,
+            'net_position': current_savings - current_debt,
+            'debt_to_income': (current_debt / (monthly_income * 12) * 100) if monthly_income else 0,
+        }
+        loan, invest, expense = (kinds == k for k in ('loan', 'investment', 'expense'))
+
+        # The per-type branches of decision_impact, as masks.
+        emi = np.where(loan, finance.emi(amount, rate / 100 / 12, tenure), 0.0)
+        monthly_impact = np.select([loan, invest, expense],
+                                   [-emi, amount * (rate / 100 / 12), -amount / tenure], 0.0)
+        debt = np.where(loan, current_debt + amount, current_debt)
+        savings = np.where(invest | expense, current_savings - amount, current_savings)
+        surplus = np.where(loan | invest | expense, before['monthly_surplus'] + monthly_impact,
+                           before['monthly_surplus'])
+        net = np.where(loan | invest | expense, savings - debt, before['net_position'])
+        dti = np.where(loan, (debt / (monthly_income * 12) * 100) if monthly_income else 0.0,
+                       before['debt_to_income'])
+        # In cents, so a zero-rate loan's rounding error cannot win the Pareto front.
+        total_interest = np.round(np.where(loan, emi * tenure - amount, 0.0), 2) + 0.0
+
+        score = np.full(len(alternatives), 50.0)
+        change = surplus - before['monthly_surplus']
+        income = monthly_income or 1
+        score -= np.where(change < 0, np.minimum(30, np.abs(change) / income * 100), 0.0)
+        score += np.where(change < 0, 0.0, np.minimum(20, change / income * 100))
+        negative = surplus < 0
+        high_dti = dti > 50
+        thin_savings = savings < monthly_expenses * 3
+        score -= 20 * negative + 10 * high_dti + 10 * thin_savings
+        improves = surplus > before['monthly_surplus']
+        low_risk = score >= 60
+        score = np.clip(np.trunc(score), 0, 100).astype(np.int64)
+        verdicts = np.select([score >= 60, score >= 40], ['Recommended', 'Proceed with Caution'],
+                             'High Risk')
+
+        # Rank: score desc, then surplus desc, then total interest asc.
+        order = np.lexsort((total_interest, -surplus, -score))
+        # Pareto set over (max surplus, min total interest).
+        by_interest = np.lexsort((-surplus, total_interest))
+        best_before = np.maximum.accumulate(np.r_[-np.inf, surplus[by_interest]])[:-1]
+        pareto = np.zeros(len(order), dtype=bool)
+        pareto[by_interest[surplus[by_interest] > best_before]] = True
+
+        columns = zip(order.tolist(), kinds[order].tolist(), amount[order].tolist(),
+                      rate[order].tolist(), tenure[order].tolist(),
+                      *(np.round(c[order], 2).tolist() for c in (surplus, savings, debt, net, dti,
+                                                                  monthly_impact, total_interest)),
+                      score[order].tolist(), verdicts[order].tolist(), pareto[order].tolist(),
+                      *(c[order].tolist() for c in (negative, high_dti, thin_savings, improves,
+                                                    low_risk)))
+        ranked = []
+        for (i, kind, amt, r, t, sur, sav, dbt, nt, d, impact, interest, sc, verdict, on_front,
+             neg, high, thin, better, safe) in columns:
+            indicators = []
+            if neg:
+                indicators.append({'type': 'critical', 'text': 'This decision will make your monthly expenses exceed income!'})
+            if high:
+                indicators.append({'type': 'warning', 'text': f'Debt-to-income will rise to {dti[i]:.0f}% — above safe levels.'})
+            if thin:
+                indicators.append({'type': 'warning', 'text': 'Savings will drop below 3-month emergency-fund level.'})
+            if better:
+                indicators.append({'type': 'success', 'text': 'This decision improves your monthly cash flow!'})
+            if safe:
+                indicators.append({'type': 'success', 'text': 'Overall low-risk decision — proceed with confidence.'})
+            ranked.append({
+                'rank': len(ranked) + 1,
+                'index': i,
+                'label': alternatives[i].get('label', f'{kind} {amt:,.0f} @ {r:g}% / {t}m'),
+                'decision_type': kind,
+                'amount': amt,
+                'interest_rate': r,
+                'tenure_months': t,
+                'after': {'monthly_surplus': sur, 'savings': sav, 'debt': dbt,
+                          'net_position': nt, 'debt_to_income': d},
+                'monthly_impact': impact,
+                'total_interest': interest,
+                'impact_score': sc,
+                'verdict': verdict,
+                'risk_indicators': indicators,
+                'pareto': on_front,
+            })
+
+        return {
+            'before': {k: round(v, 2) for k, v in before.items()},
+            'count': len(ranked),
+            'alternatives': ranked,
+            'pareto': by_interest[pareto[by_interest]].tolist(),
+        }
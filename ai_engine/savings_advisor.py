@@ -1,40 +1,59 @@
 """
 Fin AI – Savings Advisor
 Creates personalised savings plans with investment strategy
-recommendations and projected growth scenarios.
+recommendations and projected growth scenarios.  Strategies and their
+expected rates come from ai_engine/catalogs/savings_strategies.json.
+
+Scenario values and milestones use the closed-form annuity formulas in
+``finance``, so a 40-year retirement goal costs the same as a 1-year
+one.  By default milestones cover the first 12 months; pass
+``projection='full'`` for the whole horizon, optionally downsampled
+with ``sample='yearly'`` or ``sample=<number of points>``.
+
+``simulate=True`` adds a Monte Carlo view: ``paths`` lognormal return
+paths per strategy, using each strategy's catalog volatility, giving
+the probability of reaching the goal and P5/P50/P95 bands.  Pass
+``seed`` to make a run reproducible.
+
+``solve_goal`` inverts the growth formulas instead: the contribution a
+goal needs at each strategy's rate, the months it takes at a given
+contribution and the return it would need.  ``solve_goals`` does the
+same for whole columns of goals at once.
+
+Each plan also carries a mean-variance ``allocation`` over the catalog's
+instruments, read from an efficient frontier built when the catalog
+loads (see ``ai_engine.portfolio``).
 """
 
+import math
+import os
+
+import numpy as np
+
+from ai_engine import finance, monte_carlo
+from ai_engine.catalog import CATALOG_DIR, Catalog, build_strategy_catalog
+
+# Full projections longer than this are downsampled to this many points.
+MAX_MILESTONES = 1200
+# Months reported in Monte Carlo percentile bands.
+BAND_POINTS = 60
+# Highest annual return (percent) the goal solver will search.
+MAX_SOLVED_RATE = 100
+# Columns accepted by the bulk goal solver.
+GOAL_COLUMNS = ('target_amount', 'current_savings', 'target_months', 'monthly_contribution', 'annual_rate')
+
 
 class SavingsAdvisor:
 
-    STRATEGIES = {
-        'conservative': [
-            {'name': 'Fixed Deposit', 'allocation': 50, 'expected_return': '6-7%',
-             'risk': 'Very Low', 'description': 'Safe bank deposits with guaranteed returns.'},
-            {'name': 'Recurring Deposit', 'allocation': 30, 'expected_return': '5.5-6.5%',
-             'risk': 'Very Low', 'description': 'Monthly deposits with fixed returns.'},
-            {'name': 'Government Bonds', 'allocation': 20, 'expected_return': '7-8%',
-             'risk': 'Low', 'description': 'Sovereign-backed securities.'},
-        ],
-        'moderate': [
-            {'name': 'Balanced Mutual Funds', 'allocation': 40, 'expected_return': '10-12%',
-             'risk': 'Medium', 'description': 'Equity + debt mix for balanced growth.'},
-            {'name': 'Fixed Deposit', 'allocation': 30, 'expected_return': '6-7%',
-             'risk': 'Very Low', 'description': 'Safety net for stability.'},
-            {'name': 'SIP (Index Funds)', 'allocation': 30, 'expected_return': '12-15%',
-             'risk': 'Medium', 'description': 'Systematic market-index investment.'},
-        ],
-        'aggressive': [
-            {'name': 'Equity Mutual Funds', 'allocation': 50, 'expected_return': '14-18%',
-             'risk': 'High', 'description': 'High-growth equity investments.'},
-            {'name': 'SIP (Small Cap)', 'allocation': 30, 'expected_return': '15-20%',
-             'risk': 'High', 'description': 'Small-cap funds for maximum growth.'},
-            {'name': 'Balanced Funds', 'allocation': 20, 'expected_return': '10-12%',
-             'risk': 'Medium', 'description': 'Stability anchor for portfolio.'},
-        ],
-    }
-
-    RATES = {'conservative': 0.06, 'moderate': 0.10, 'aggressive': 0.14}
+    VERSION = 6
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog or Catalog(os.path.join(CATALOG_DIR, 'savings_strategies.json'),
+                                          build_strategy_catalog)
+
+    @property
+    def cache_version(self):
+        return f'{self.VERSION}:{self.catalog.snapshot().version}'
 
     def create_plan(self, data):
         income   = float(data.get('monthly_income', 0))
@@ -44,6 +63,7 @@ class SavingsAdvisor:
         months   = max(1, int(data.get('target_months', 12)))
         goal     = data.get('goal_name', 'My Goal')
         risk     = data.get('risk_tolerance', 'moderate')
+        catalog  = self.catalog.snapshot().value
 
         disposable = income - expenses
         remaining  = max(0, target - current)
@@ -53,36 +73,50 @@ class SavingsAdvisor:
 
         # Growth scenarios
         scenarios = []
-        for label, r in [('Conservative (6%)', 0.06),
-                         ('Moderate (10%)', 0.10),
-                         ('Aggressive (14%)', 0.14)]:
+        for name, r in catalog.rates.items():
+            label = f'{name.title()} ({r * 100:g}%)'
             mr = r / 12
-            fv = current * (1 + mr) ** months
-            for m in range(months):
-                fv += monthly_needed * (1 + mr) ** (months - m - 1)
+            fv = finance.fv(current, mr, months) + finance.fv_annuity(monthly_needed, mr, months)
             scenarios.append({
                 'label': label,
+                'monthly_required': round(finance.required_payment(target, current, mr, months), 2),
                 'projected_value': round(fv, 2),
                 'returns': round(fv - current - monthly_needed * months, 2),
                 'meets_goal': fv >= target,
             })
 
-        # Monthly milestones (first 12)
-        rate = self.RATES.get(risk, 0.10)
+        # Milestones: first 12 months, or the whole (downsampled) horizon
+        rate = catalog.rates.get(risk, catalog.rates[catalog.default])
         mr = rate / 12
-        milestones, acc = [], current
-        for m in range(1, min(months + 1, 13)):
-            acc = acc * (1 + mr) + monthly_needed
+        projection = data.get('projection', 'first_year')
+        if projection == 'full':
+            steps = self._milestone_months(months, data.get('sample'))
+            if isinstance(steps, dict):
+                return steps
+        else:
+            steps = np.arange(1, min(months, 12) + 1)
+        milestones = []
+        balances = finance.fv(current, mr, steps) + finance.fv_annuity(monthly_needed, mr, steps)
+        for m, acc in zip(steps.tolist(), balances.tolist()):
             milestones.append({
                 'month': m,
                 'amount': round(acc, 2),
                 'percentage': round(min(100, acc / target * 100), 1) if target > 0 else 0,
             })
 
+        simulation = None
+        if data.get('simulate'):
+            simulation = self._simulate(data, current, monthly_needed, months, target, catalog)
+            if 'error' in simulation:
+                return simulation
+
+        allocation = self._allocation(catalog, risk, months)
+
         # Tips
         tips = []
         if not feasible:
-            safe_months = int(remaining / (disposable * 0.6)) if disposable > 0 else 0
+            safe = finance.periods_to_target(target, current, disposable * 0.6, mr) if disposable > 0 else 0
+            safe_months = math.ceil(safe - 1e-9) if math.isfinite(safe) else 0
             tips.append(
                 f'Goal requires Ksh {monthly_needed:,.0f}/month but you have '
                 f'Ksh {disposable:,.0f} disposable. Consider extending to ~{safe_months} months.'
@@ -108,9 +142,183 @@ class SavingsAdvisor:
             'feasible': feasible,
             'disposable_income': disposable,
             'scenarios': scenarios,
-            'strategies': self.STRATEGIES.get(risk, self.STRATEGIES['moderate']),
+            'strategies': [dict(s) for s in catalog.strategies.get(risk, catalog.strategies[catalog.default])],
             'milestones': milestones,
             'tips': tips,
             'target_months': months,
             'recommended_monthly': round(min(monthly_needed, disposable * 0.6), 2),
+            'projection': 'full' if projection == 'full' else 'first_year',
+            'simulation': simulation,
+            'allocation': allocation,
+        }
+
+    @staticmethod
+    def _allocation(catalog, risk, months):
+        if catalog.frontier is None:
+            return None
+        tier = risk if risk in catalog.frontier.tiers else catalog.default
+        return {'risk_tolerance': tier, **catalog.frontier.allocate(tier, months)}
+
+    def frontier(self, data):
+        """The efficient frontier and the allocation picked on it for
+        ``risk_tolerance`` and ``target_months``."""
+        catalog = self.catalog.snapshot().value
+        if catalog.frontier is None:
+            return {'error': 'The strategy catalog has no instrument parameters.'}
+        months = max(1, int(data.get('target_months', 12)))
+        return {
+            'instruments': list(catalog.frontier.instruments),
+            'allocation': self._allocation(catalog, data.get('risk_tolerance', 'moderate'), months),
+            'tier_volatility': {t: round(v * 100, 2) for t, v in catalog.volatility.items()},
+            'frontier': catalog.frontier.points(),
         }
+
+    def solve_goal(self, data):
+        """Exact contribution and time to goal for every catalog strategy.
+
+        Takes the ``create_plan`` fields plus an optional
+        ``monthly_contribution`` (default: 60% of disposable income), and
+        reports the return that contribution needs to hit the goal on time.
+        """
+        income = float(data.get('monthly_income', 0))
+        expenses = float(data.get('monthly_expenses', 0))
+        current = float(data.get('current_savings', 0))
+        target = float(data.get('target_amount', 0))
+        months = max(1, int(data.get('target_months', 12)))
+        contribution = float(data.get('monthly_contribution', max(0, income - expenses) * 0.6))
+        catalog = self.catalog.snapshot().value
+
+        names = list(catalog.rates)
+        rates = np.array([catalog.rates[n] for n in names]) * 100
+        result = self.solve_goals({'target_amount': [target] * len(names),
+                                   'current_savings': [current] * len(names),
+                                   'target_months': [months] * len(names),
+                                   'monthly_contribution': [contribution] * len(names),
+                                   'annual_rate': rates})
+        months_to_goal = result['months_to_goal'].tolist()
+        strategies = []
+        for i, name in enumerate(names):
+            strategies.append({
+                'strategy': name,
+                'label': f'{name.title()} ({catalog.rates[name] * 100:g}%)',
+                'monthly_required': round(float(result['monthly_required'][i]), 2),
+                'months_to_goal': months_to_goal[i] if months_to_goal[i] >= 0 else None,
+                'meets_deadline': 0 <= months_to_goal[i] <= months,
+            })
+        required = float(result['required_annual_rate'][0])
+        return {
+            'target_amount': target,
+            'current_savings': current,
+            'target_months': months,
+            'monthly_contribution': round(contribution, 2),
+            'straight_line_monthly': round(max(0, target - current) / months, 2),
+            'required_annual_rate': None if math.isnan(required) else round(required, 2),
+            'strategies': strategies,
+        }
+
+    def solve_goals(self, columns):
+        """Solve many goals in one vectorized call.
+
+        ``columns`` maps ``target_amount``, ``current_savings``,
+        ``target_months``, ``monthly_contribution`` and ``annual_rate`` (a
+        percentage; defaults to the catalog's default strategy) to
+        equal-length sequences.  Returns NumPy arrays: ``monthly_required``,
+        whole ``months_to_goal`` at the given contribution (-1 if never)
+        and ``required_annual_rate`` in percent (NaN above
+        ``MAX_SOLVED_RATE``).  Returns ``{'error': ...}`` when a column is
+        not a flat list of finite numbers or the lengths differ.
+        """
+        if not isinstance(columns, dict):
+            return {'error': 'goals must map column names to lists of values.'}
+        try:
+            given = {name: np.asarray(columns[name], dtype=np.float64)
+                     for name in GOAL_COLUMNS if columns.get(name) is not None}
+        except (TypeError, ValueError):
+            return {'error': 'Goal columns must be numeric.'}
+        if not given:
+            return {'error': f'Provide at least one of: {", ".join(GOAL_COLUMNS)}.'}
+        if any(v.ndim != 1 or not np.all(np.isfinite(v)) for v in given.values()):
+            return {'error': 'Goal columns must be flat lists of finite numbers.'}
+        if len({v.size for v in given.values()}) > 1:
+            return {'error': 'Goal columns must have the same length.'}
+        n = next(iter(given.values())).size
+
+        def col(name, default=0):
+            values = given.get(name)
+            if values is None:
+                return np.full(n, float(default))
+            return values
+
+        catalog = self.catalog.snapshot().value
+        target = col('target_amount')
+        current = col('current_savings')
+        months = np.maximum(1, np.trunc(col('target_months', 12)))
+        contribution = col('monthly_contribution')
+        mr = col('annual_rate', catalog.rates[catalog.default] * 100) / 100 / 12
+
+        periods = finance.periods_to_target(target, current, contribution, mr)
+        with np.errstate(invalid='ignore'):
+            whole = np.ceil(periods - 1e-9)
+        return {
+            'monthly_required': finance.required_payment(target, current, mr, months),
+            'months_to_goal': np.where(np.isfinite(periods), whole, -1).astype(np.int64),
+            'required_annual_rate': finance.solve_rate(target, current, contribution, months,
+                                                       hi=MAX_SOLVED_RATE / 100 / 12) * 12 * 100,
+        }
+
+    def _simulate(self, data, current, monthly, months, target, catalog):
+        try:
+            paths = int(data.get('paths', 10_000))
+            seed = data.get('seed')
+            seed = None if seed is None else int(seed)
+        except (TypeError, ValueError):
+            return {'error': 'paths and seed must be integers.'}
+        if not 1 <= paths <= monte_carlo.MAX_PATHS:
+            return {'error': f'paths must be between 1 and {monte_carlo.MAX_PATHS}.'}
+        if seed is not None and seed < 0:
+            return {'error': 'seed must be non-negative.'}
+
+        names = list(catalog.rates)
+        steps = self._milestone_months(months, BAND_POINTS)
+        entropy, results = monte_carlo.simulate_savings(
+            current, monthly, [(catalog.rates[n], catalog.volatility[n]) for n in names],
+            months, target, steps, paths=paths, seed=seed)
+
+        strategies = []
+        month_list = steps.tolist()
+        for name, res in zip(names, results):
+            p5, p50, p95 = (np.round(res[k], 2).tolist() for k in ('p5', 'p50', 'p95'))
+            strategies.append({
+                'strategy': name,
+                'label': f'{name.title()} ({catalog.rates[name] * 100:g}%)',
+                'volatility': catalog.volatility[name],
+                'probability_of_goal': round(res['probability'] * 100, 1),
+                'final': {'p5': p5[-1], 'p50': p50[-1], 'p95': p95[-1]},
+                'bands': [{'month': m, 'p5': a, 'p50': b, 'p95': c}
+                          for m, a, b, c in zip(month_list, p5, p50, p95)],
+            })
+        return {'paths': paths, 'seed': entropy, 'strategies': strategies}
+
+    @staticmethod
+    def _milestone_months(months, sample=None):
+        """Months to report over a full horizon, always ending at ``months``.
+
+        ``sample`` is None (every month), ``'yearly'`` (every 12th month)
+        or a target number of points spread evenly over the horizon.
+        """
+        if sample is None:
+            points = min(months, MAX_MILESTONES)
+        elif sample == 'yearly':
+            steps = np.arange(12, months + 1, 12)
+            return steps if steps.size and steps[-1] == months else np.append(steps, months)
+        else:
+            try:
+                points = int(sample)
+            except (TypeError, ValueError):
+                return {'error': "sample must be 'yearly' or a number of points."}
+            if points < 1:
+                return {'error': 'sample must be at least 1 point.'}
+            points = min(points, months, MAX_MILESTONES)
+        if points == months:
+            return np.arange(1, months + 1)
+        return np.unique(np.linspace(months / points, months, points).round().astype(np.int64))
@@ -0,0 +1,82 @@
+"""
+Fin AI – Statement Reader
+Lazily parses uploaded bank / M-Pesa statements (CSV or NDJSON)
+into transaction dicts, one row at a time.  A malformed row becomes an
+``{'error': ..., 'line': n}`` record so the rest of the statement still
+streams.
+"""
+
+import csv
+import json
+import re
+
+DESCRIPTION_COLUMNS = ('description', 'details', 'narration', 'particulars', 'merchant')
+AMOUNT_COLUMNS = ('amount', 'withdrawn', 'debit', 'paid_out')
+_CURRENCY = re.compile(r'k(?:sh|es)\.?', re.IGNORECASE)
+
+
+def parse_amount(value):
+    """Parse '1,250.00', 'Ksh 300', 'KES 300' or '' into a float."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = _CURRENCY.sub('', str(value or '').replace(',', '')).strip()
+    return float(text) if text else 0.0
+
+
+def _find_column(fieldnames, candidates):
+    lookup = {name.strip().lower().replace(' ', '_'): name for name in fieldnames or []}
+    for c in candidates:
+        if c in lookup:
+            return lookup[c]
+    return None
+
+
+def iter_csv_rows(lines):
+    """Yield {'description', 'amount'} dicts from CSV text lines."""
+    reader = csv.DictReader(lines)
+    desc_col = _find_column(reader.fieldnames, DESCRIPTION_COLUMNS)
+    amount_col = _find_column(reader.fieldnames, AMOUNT_COLUMNS)
+    if desc_col is None or amount_col is None:
+        raise ValueError('CSV statement needs a description and an amount column.')
+
+    for row in reader:
+        try:
+            amount = parse_amount(row.get(amount_col))
+        except ValueError:
+            yield {'error': f'Amount is not a number: {row.get(amount_col)!r}', 'line': reader.line_num}
+            continue
+        yield {'description': row.get(desc_col) or '', 'amount': amount}
+
+
+def iter_ndjson_rows(lines):
+    """Yield transaction dicts from newline-delimited JSON lines."""
+    for n, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            txn = json.loads(line)
+            if not isinstance(txn, dict):
+                raise ValueError('Each line must be a JSON object.')
+            amount = parse_amount(txn.get('amount', 0))
+        except ValueError as e:
+            yield {'error': str(e), 'line': n}
+            continue
+        yield {'description': str(txn.get('description') or ''), 'amount': amount}
+
+
+def detect_format(filename='', content_type=''):
+    """Guess 'csv' or 'ndjson' from an upload's filename / content type."""
+    name = (filename or '').lower()
+    ctype = (content_type or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in ctype or 'jsonl' in ctype:
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_rows(lines, fmt='csv'):
+    if fmt == 'ndjson':
+        return iter_ndjson_rows(lines)
+    if fmt == 'csv':
+        return iter_csv_rows(lines)
+    raise ValueError(f'Unsupported statement format: {fmt}')
@@ -0,0 +1,94 @@
+"""
+Fin AI – Transaction Table
+Compact struct-of-arrays container for categorized transactions:
+amounts in ``array('d')``, category ids in ``array('B')`` and
+descriptions packed into one UTF-8 string table addressed by offsets.
+No Python object is kept per row.
+"""
+
+import math
+from array import array
+
+import numpy as np
+
+
+def category_sums(codes, amounts):
+    """{code: total} for the codes present, in code order.
+
+    Each total is a correctly rounded ``math.fsum``, so it does not depend
+    on row order and matches the sharded file categorizer bit for bit.
+    """
+    codes = np.asarray(codes)
+    order = np.argsort(codes, kind='stable')
+    present, starts = np.unique(codes[order], return_index=True)
+    groups = np.split(np.asarray(amounts, dtype=np.float64)[order], starts[1:])
+    return {code: math.fsum(group.tolist()) for code, group in zip(present.tolist(), groups)}
+
+
+class TransactionTable:
+
+    __slots__ = ('categories', 'amounts', 'category_ids', 'text', 'offsets')
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.amounts = array('d')
+        self.category_ids = array('B')
+        # Description i is text[offsets[i]:offsets[i + 1]].
+        self.text = bytearray()
+        self.offsets = array('Q', [0])
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def append(self, description, amount, category_id):
+        self.text += description.encode()
+        self.offsets.append(len(self.text))
+        self.amounts.append(amount)
+        self.category_ids.append(category_id)
+
+    def extend(self, descriptions, amounts, category_ids):
+        text, offsets = self.text, self.offsets
+        for d in descriptions:
+            text += d.encode()
+            offsets.append(len(text))
+        self.amounts.extend(amounts)
+        self.category_ids.extend(category_ids)
+
+    def description(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1]].decode()
+
+    def __getitem__(self, i):
+        return self.description(i), self.amounts[i], self.categories[self.category_ids[i]]
+
+    def __iter__(self):
+        text, offsets, categories = self.text, self.offsets, self.categories
+        for i, (amount, cid) in enumerate(zip(self.amounts, self.category_ids)):
+            yield text[offsets[i]:offsets[i + 1]].decode(), amount, categories[cid]
+
+    #  Columnar views (zero-copy)
+    def amount_array(self):
+        return np.frombuffer(self.amounts, dtype=np.float64) if self.amounts else np.empty(0)
+
+    def category_array(self):
+        return np.frombuffer(self.category_ids, dtype=np.uint8) if self.category_ids else np.empty(0, np.uint8)
+
+    def category_totals(self):
+        """{category: exact total} for categories present."""
+        sums = category_sums(self.category_array(), self.amount_array())
+        return {self.categories[code]: total for code, total in sums.items()}
+
+    def category_counts(self):
+        counts = np.bincount(self.category_array(), minlength=len(self.categories))
+        return {self.categories[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    #  Export
+    def iter_records(self, icons=None):
+        """Yield one JSON-ready dict per row, built only when consumed."""
+        icons = icons or {}
+        for desc, amount, cat in self:
+            yield {
+                'description': desc,
+                'amount': amount,
+                'category': cat,
+                'icon': icons.get(cat, ''),
+            }
@@ -1,19 +1,28 @@
+import io
 import os
+import json
 import sqlite3
 import random
 from datetime import timedelta
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
 from dotenv import load_dotenv
 
 load_dotenv()  # Load variables from .env
 from werkzeug.utils import secure_filename
 
+from ai_engine.amortization import AmortizationSchedule
 from ai_engine.budget_analyzer import BudgetAnalyzer
+from ai_engine.budget_history import BudgetHistory, valid_month
 from ai_engine.loan_eligibility import LoanEligibilityChecker
 from ai_engine.expense_categorizer import ExpenseCategorizer
 from ai_engine.savings_advisor import SavingsAdvisor
 from ai_engine.chatbot import FinancialChatbot
 from ai_engine.risk_optimization import RiskOptimizationEngine
+from ai_engine.expense_ledger import ExpenseLedger
+from ai_engine.merchant_index import MerchantIndex
+from ai_engine.result_cache import CachedEngine, ResultCache
+from ai_engine.naive_bayes import HashedNaiveBayes
+from ai_engine.statement_reader import detect_format, iter_rows
 
 app = Flask(__name__)
 
@@ -27,20 +36,32 @@ app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=3)
 def make_session_permanent():
     session.permanent = True
 
+DB_PATH = 'finai.db'
+
 # Initialize AI engines
-budget_analyzer = BudgetAnalyzer()
-loan_checker = LoanEligibilityChecker()
-expense_categorizer = ExpenseCategorizer()
-savings_advisor = SavingsAdvisor()
+# Pure engines share a two-tier result cache (in-process LRU + finai.db)
+result_cache = ResultCache(DB_PATH)
+budget_analyzer = CachedEngine(BudgetAnalyzer(), result_cache, 'analyze', 'analyze_batch')
+budget_history = BudgetHistory(DB_PATH)
+loan_checker = CachedEngine(LoanEligibilityChecker(), result_cache, 'check_eligibility', 'what_if_grid')
+merchant_index = MerchantIndex(DB_PATH)
+# Optional offline fallback for 'other' rows (python -m ai_engine.naive_bayes)
+NB_MODEL_PATH = os.environ.get('EXPENSE_NB_MODEL', 'expense_nb.npz')
+fallback_model = HashedNaiveBayes.load(NB_MODEL_PATH) if os.path.exists(NB_MODEL_PATH) else None
+expense_categorizer = ExpenseCategorizer(merchant_index=merchant_index, fallback_model=fallback_model)
+expense_ledger = ExpenseLedger(expense_categorizer, DB_PATH)
+savings_advisor = CachedEngine(SavingsAdvisor(), result_cache, 'create_plan', 'solve_goal', 'frontier')
 chatbot = FinancialChatbot()
-risk_engine = RiskOptimizationEngine()
+risk_engine = CachedEngine(RiskOptimizationEngine(), result_cache, 'analyze_fixed_income',
+                           'rate_shock_grid', 'value_at_risk', 'balance_sheet_valuation',
+                           'decision_impact', 'compare_decisions')
 
 UPLOAD_FOLDER = os.path.join('static', 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
 def get_db_connection():
-    conn = sqlite3.connect('finai.db')
+    conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -114,10 +135,26 @@ def onboarding():
 @app.route('/api/budget/analyze', methods=['POST'])
 def analyze_budget():
     data = request.json
+    if data.get('user_id') and data.get('month') is not None and not valid_month(data['month']):
+        return jsonify({'error': "month must be 'YYYY-MM'."}), 400
     result = budget_analyzer.analyze(data)
+    if data.get('user_id') and 'error' not in result:
+        budget_history.record(data['user_id'], result, data.get('month'))
     return jsonify(result)
 
 
+@app.route('/api/budget/analyze-batch', methods=['POST'])
+def analyze_budget_batch():
+    data = request.json
+    result = budget_analyzer.analyze_batch(data)
+    return jsonify(result)
+
+
+@app.route('/api/budget/trends/<user_id>', methods=['GET'])
+def budget_trends(user_id):
+    return jsonify(budget_history.trends(user_id))
+
+
 @app.route('/api/loan/check', methods=['POST'])
 def check_loan():
     data = request.json
@@ -125,6 +162,29 @@ def check_loan():
     return jsonify(result)
 
 
+@app.route('/api/loan/what-if', methods=['POST'])
+def loan_what_if():
+    data = request.json
+    result = loan_checker.what_if_grid(data)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+
+@app.route('/api/loan/schedule', methods=['GET'])
+def loan_schedule():
+    schedule = AmortizationSchedule.from_request(request.args)
+    if isinstance(schedule, dict):
+        return jsonify(schedule), 400
+    month = request.args.get('month', type=int)
+    if month is not None:
+        if not 1 <= month <= schedule.tenure_months:
+            return jsonify({'error': 'month is outside the loan tenure.'}), 400
+        return jsonify({'summary': schedule.summary(), 'row': schedule.row(month)})
+    return jsonify(schedule.page(request.args.get('from_month', 1, type=int),
+                                 request.args.get('limit', 12, type=int)))
+
+
 @app.route('/api/expense/categorize', methods=['POST'])
 def categorize_expense():
     data = request.json
@@ -132,6 +192,99 @@ def categorize_expense():
     return jsonify(result)
 
 
+@app.route('/api/expense/categorize/stream', methods=['POST'])
+def categorize_expense_stream():
+    """Categorize a CSV / NDJSON statement upload and stream NDJSON back.
+
+    Accepts either a multipart ``file`` field or the raw request body.
+    The format comes from ``?format=csv|ndjson`` or is guessed from the
+    filename / content type.  Malformed lines come back as ``error``
+    records in place; the last line is a ``summary`` trailer.
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        # Werkzeug closes uploaded files once the view returns, so keep
+        # our own handle on the spooled temp file for the generator.
+        upload.stream.rollover()
+        raw = os.fdopen(os.dup(upload.stream.fileno()), 'rb')
+        raw.seek(0)
+        filename, ctype = upload.filename, upload.mimetype
+    else:
+        raw, filename, ctype = request.stream, '', request.content_type
+    fmt = request.args.get('format') or detect_format(filename, ctype)
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': f'Unsupported statement format: {fmt}'}), 400
+
+    lines = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+
+    def generate():
+        try:
+            for record in expense_categorizer.categorize_stream(iter_rows(lines, fmt)):
+                yield json.dumps(record) + '\n'
+        except ValueError as e:
+            yield json.dumps({'error': str(e)}) + '\n'
+        finally:
+            lines.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/expense/categorize-batch', methods=['POST'])
+def categorize_expense_batch():
+    data = request.json
+    result = expense_categorizer.categorize_batch(data.get('descriptions', []),
+                                                  data.get('amounts', []))
+    if 'codes' in result:
+        result['codes'] = result['codes'].tolist()
+    return jsonify(result)
+
+
+@app.route('/api/expense/correct', methods=['POST'])
+def correct_expense():
+    data = request.json
+    result = expense_categorizer.correct(data.get('description', ''), data.get('category', ''))
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+
+@app.route('/api/expense/ledger', methods=['POST'])
+def append_expense_ledger():
+    data = request.json
+    result = expense_ledger.append(data.get('user_id', 'anonymous'), data.get('transactions', []))
+    return jsonify(result)
+
+
+@app.route('/api/expense/ledger/<user_id>', methods=['GET'])
+def expense_ledger_summary(user_id):
+    return jsonify(expense_ledger.summary(user_id))
+
+
+@app.route('/api/expense/cache-stats', methods=['GET'])
+def expense_cache_stats():
+    return jsonify(expense_categorizer.cache_stats())
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def result_cache_stats():
+    return jsonify(result_cache.stats())
+
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_result_cache():
+    data = request.get_json(silent=True) or {}
+    return jsonify(result_cache.invalidate(data.get('engine')))
+
+
+@app.route('/api/admin/catalogs/reload', methods=['POST'])
+def reload_catalogs():
+    token = os.environ.get('FINAI_ADMIN_TOKEN')
+    if not token or request.headers.get('X-Admin-Token') != token:
+        return jsonify({'error': 'Forbidden'}), 403
+    catalogs = {'loan_products': loan_checker.catalog, 'savings_strategies': savings_advisor.catalog}
+    return jsonify({name: {'reloaded': c.reload(), **c.status()} for name, c in catalogs.items()})
+
+
 @app.route('/api/savings/plan', methods=['POST'])
 def plan_savings():
     data = request.json
@@ -139,6 +292,32 @@ def plan_savings():
     return jsonify(result)
 
 
+@app.route('/api/savings/solve', methods=['POST'])
+def solve_savings_goal():
+    data = request.json
+    if 'goals' not in data:
+        return jsonify(savings_advisor.solve_goal(data))
+    # Bulk planning: {'goals': {'target_amount': [...], 'annual_rate': [...], ...}}
+    result = savings_advisor.solve_goals(data['goals'])
+    if 'error' in result:
+        return jsonify(result), 400
+    rates = result['required_annual_rate']
+    return jsonify({
+        'monthly_required': result['monthly_required'].round(2).tolist(),
+        'months_to_goal': result['months_to_goal'].tolist(),
+        'required_annual_rate': [None if r != r else r for r in rates.round(4).tolist()],
+    })
+
+
+@app.route('/api/savings/frontier', methods=['POST'])
+def savings_frontier():
+    data = request.json
+    result = savings_advisor.frontier(data)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     data = request.json
@@ -153,6 +332,24 @@ def fixed_income():
     return jsonify(result)
 
 
+@app.route('/api/risk/rate-shocks', methods=['POST'])
+def rate_shocks():
+    data = request.json
+    result = risk_engine.rate_shock_grid(data)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+
+@app.route('/api/risk/var', methods=['POST'])
+def value_at_risk():
+    data = request.json
+    result = risk_engine.value_at_risk(data)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+
 @app.route('/api/risk/balance-sheet', methods=['POST'])
 def balance_sheet():
     data = request.json
@@ -167,6 +364,15 @@ def decision_impact():
     return jsonify(result)
 
 
+@app.route('/api/risk/decision-compare', methods=['POST'])
+def decision_compare():
+    data = request.json
+    result = risk_engine.compare_decisions(data)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+
 @app.route('/api/onboarding/kyc', methods=['POST'])
 def upload_kyc():
     if 'file' not in request.files:
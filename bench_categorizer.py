@@ -0,0 +1,95 @@
+"""
+Benchmark: compiled keyword automaton vs the original per-keyword scan
+in ExpenseCategorizer._match, the merchant cache on a statement with
+repeating merchants and per-row reference codes, and the columnar
+categorize_batch API against row-wise categorize().
+
+Run with:  python bench_categorizer.py [num_rows]
+"""
+
+import random
+import sys
+import time
+
+from ai_engine.expense_categorizer import ExpenseCategorizer
+
+SAMPLES = [
+    'Rent payment for apartment', 'KPLC electricity token', 'Safaricom mobile airtime',
+    'Naivas supermarket groceries', 'Uber trip to town', 'Matatu bus fare',
+    'Pharmacy medicine', 'LIC premium', 'Netflix subscription', 'Java coffee house',
+    'Swiggy order', 'Amazon shopping', 'School fees term 2', 'Fixed deposit top-up',
+    'Loan EMI repayment', 'M-PESA transfer to John Doe', 'Cash withdrawal ATM',
+    'POS purchase QUICKMART WESTLANDS', 'Paybill 888880 account 12345',
+]
+
+
+def statement_rows(rng, n):
+    """Realistic rows: a few hundred merchants, each line with its own codes."""
+    merchants = [f'{rng.choice(SAMPLES)} {rng.choice(["", "Nairobi", "Mombasa", "CBD", "Online"])}'
+                 for _ in range(300)]
+    return [f'{rng.choice(merchants)} {rng.randint(1000, 9999)} '
+            f'{rng.choice("QRSTUVW")}{rng.randint(10, 99)}K{rng.randint(100, 999)}X'
+            for _ in range(n)]
+
+
+def legacy_match(description):
+    desc = description.lower()
+    for cat, keywords in ExpenseCategorizer.CATEGORIES.items():
+        if any(kw in desc for kw in keywords):
+            return cat
+    return 'other'
+
+
+def run(label, fn, rows):
+    start = time.perf_counter()
+    for d in rows:
+        fn(d)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<32} {elapsed:8.3f}s  {len(rows) / elapsed:12,.0f} rows/s')
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    rows = [f'{rng.choice(SAMPLES)} REF{rng.randint(100000, 999999)}' for _ in range(n)]
+
+    categorizer = ExpenseCategorizer()
+    bounded = ExpenseCategorizer(word_boundary=True)
+
+    mismatches = sum(legacy_match(d) != categorizer._match(d) for d in rows)
+    print(f'{n:,} rows, {mismatches} mismatches vs legacy scan\n')
+
+    base = run('legacy any(kw in desc)', legacy_match, rows)
+    fast = run('automaton', categorizer._match, rows)
+    run('automaton (word boundary)', bounded._match, rows)
+    print(f'\nspeed-up: {base / fast:.2f}x\n')
+
+    rows = statement_rows(rng, n)
+    print(f'statement with repeating merchants ({n:,} rows)\n')
+    for word_boundary in (False, True):
+        suffix = ' (word boundary)' if word_boundary else ''
+        uncached = ExpenseCategorizer(word_boundary=word_boundary)
+        cached = ExpenseCategorizer(word_boundary=word_boundary)
+        base = run('automaton' + suffix, uncached._match, rows)
+        fast = run('merchant cache' + suffix, cached._categorize_one, rows)
+        stats = cached.cache_stats()
+        print(f'  hit rate {stats["hit_rate"]:.1%}, {stats["evictions"]} evictions, '
+              f'speed-up {base / fast:.2f}x\n')
+
+    amounts = [round(rng.uniform(50, 5000), 2) for _ in rows]
+    payload = {'transactions': [{'description': d, 'amount': a} for d, a in zip(rows, amounts)]}
+    categorizer = ExpenseCategorizer()
+    start = time.perf_counter()
+    categorizer.categorize(payload)
+    base = time.perf_counter() - start
+    start = time.perf_counter()
+    categorizer.categorize_batch(rows, amounts)
+    fast = time.perf_counter() - start
+    print(f'{"categorize (row dicts)":<32} {base:8.3f}s')
+    print(f'{"categorize_batch (columns)":<32} {fast:8.3f}s')
+    print(f'  speed-up {base / fast:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: the inline annuity / compounding loops the engines used
+before ai_engine.finance vs the shared kernel.
+
+Run with:  python bench_finance.py [num_loans]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ai_engine import finance
+
+
+def legacy_emi(principal, annual_rate, months):
+    if principal <= 0 or months <= 0:
+        return 0
+    r = annual_rate / 12 / 100
+    if r == 0:
+        return principal / months
+    return principal * r * (1 + r) ** months / ((1 + r) ** months - 1)
+
+
+def legacy_fv(current, monthly, mr, months):
+    fv = current * (1 + mr) ** months
+    for m in range(months):
+        fv += monthly * (1 + mr) ** (months - m - 1)
+    return fv
+
+
+def legacy_duration(p, r, t):
+    coupon = p * r
+    pv_coupons = sum(coupon / (1 + r) ** yr for yr in range(1, int(t) + 1))
+    price = pv_coupons + p / (1 + r) ** t
+    mac = sum(yr * (coupon / (1 + r) ** yr) for yr in range(1, int(t) + 1)) + t * (p / (1 + r) ** t)
+    return mac / price
+
+
+def timed(label, fn, repeat=3):
+    best = min(_run(fn) for _ in range(repeat))
+    print(f'  {label:<34} {best * 1e3:9.2f} ms')
+    return best
+
+
+def _run(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = np.random.default_rng(0)
+    principal = rng.uniform(1000, 100000, n)
+    principal_list = principal.tolist()
+
+    print(f'EMI, {n:,} loans on one product (12%, 24 months)')
+    old = timed('inline formula, per loan', lambda: [legacy_emi(p, 12, 24) for p in principal_list])
+    new = timed('finance.emi, per loan', lambda: [finance.emi(p, 0.01, 24) for p in principal_list])
+    vec = timed('finance.emi, one array call', lambda: finance.emi(principal, 0.01, 24))
+    print(f'  speedup: per loan {old / new:.1f}x, array {old / vec:.0f}x')
+
+    print('Savings projection, 10,000 plans x 120 months')
+    plans = rng.uniform(0, 50000, 10_000).tolist()
+    old = timed('per-month loop', lambda: [legacy_fv(c, 2500.0, 0.1 / 12, 120) for c in plans])
+    new = timed('finance.fv + fv_annuity', lambda: [finance.fv(c, 0.1 / 12, 120)
+                                                    + finance.fv_annuity(2500.0, 0.1 / 12, 120)
+                                                    for c in plans])
+    print(f'  speedup: {old / new:.1f}x')
+
+    print('Duration, 10,000 bonds x 30 years')
+    old = timed('generator sums', lambda: [legacy_duration(p, 0.08, 30) for p in plans])
+    new = timed('finance.bond_metrics', lambda: [finance.bond_metrics(p, 0.08, 0.08, 30) for p in plans])
+    print(f'  speedup: {old / new:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
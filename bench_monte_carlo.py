@@ -0,0 +1,35 @@
+"""
+Benchmark: Monte Carlo savings simulation, one strategy, paths x months
+as one matrix per chunk.
+
+Run with:  python bench_monte_carlo.py [paths] [months]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ai_engine import monte_carlo
+
+
+def main():
+    paths = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    months = int(sys.argv[2]) if len(sys.argv) > 2 else 360
+    steps = np.arange(12, months + 1, 12)
+    if steps[-1] != months:
+        steps = np.append(steps, months)
+
+    print(f'Monte Carlo, {paths:,} paths x {months} months')
+    for label, workers in (('single process', 1), ('process pool', None)):
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            monte_carlo.simulate_savings(100000.0, 5000.0, [(0.1, 0.12)], months, 1e7, steps,
+                                         paths=paths, seed=0, workers=workers)
+            best = min(best, time.perf_counter() - start)
+        print(f'  {label:<34} {best * 1e3:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
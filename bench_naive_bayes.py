@@ -0,0 +1,57 @@
+"""
+Benchmark: hashed-feature naive Bayes fallback (train, save / load,
+batch prediction throughput).
+
+Run with:  python bench_naive_bayes.py [num_rows]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from ai_engine.expense_categorizer import ExpenseCategorizer, normalize_merchant
+from ai_engine.naive_bayes import HashedNaiveBayes
+
+WORDS = ['kplc', 'electric', 'token', 'pharmaceuticals', 'cinema', 'supermkt', 'matatu',
+         'bookshop', 'airtime', 'chemist', 'petroleum', 'eatery', 'boutique', 'hardware']
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f'{label:<24} {(time.perf_counter() - start) * 1000:10.2f} ms')
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    texts = [normalize_merchant(' '.join(rng.sample(WORDS, 2)) + f' {rng.randint(1, 999)}')
+             for _ in range(n)]
+
+    model = timed('train', lambda: HashedNaiveBayes.from_categorizer(ExpenseCategorizer.CATEGORIES))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'expense_nb.npz')
+        timed('save', lambda: model.save(path))
+        print(f'{"model size":<24} {os.path.getsize(path) / 1024:10.1f} KB')
+        model = timed('load', lambda: HashedNaiveBayes.load(path))
+
+    start = time.perf_counter()
+    model.predict(texts)
+    elapsed = time.perf_counter() - start
+    print(f'\npredict {n:,} rows       {elapsed:8.3f}s  {n / elapsed:12,.0f} rows/s')
+
+    chunk = texts[:4096]
+    start = time.perf_counter()
+    model._matrix(chunk) @ model.feature_log_prob.T
+    dense = time.perf_counter() - start
+    start = time.perf_counter()
+    model._joint_log_likelihood(chunk)
+    sparse = time.perf_counter() - start
+    print(f'  4,096 rows: dense X @ W {dense * 1000:.1f} ms, sparse gather {sparse * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: sharded process-pool categorization of a large CSV statement.
+
+Run with:  python bench_parallel_categorizer.py [num_rows]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from ai_engine.parallel_categorizer import categorize_file
+from bench_categorizer import statement_rows
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'statement.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('Date,Details,Withdrawn\n')
+            for desc in statement_rows(rng, n):
+                f.write(f'2024-01-01,{desc},{rng.uniform(10, 5000):.2f}\n')
+        print(f'{n:,} rows, {os.path.getsize(path) / 1e6:.1f} MB, {os.cpu_count()} cores\n')
+
+        baseline = first = None
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            start = time.perf_counter()
+            result = categorize_file(path, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            first = first or result
+            same = (result['category_totals'], result['total']) == (first['category_totals'], first['total'])
+            print(f'{workers:>2} workers {elapsed:8.2f}s  {n / elapsed:12,.0f} rows/s  '
+                  f'speed-up {baseline / elapsed:5.2f}x  identical={same}')
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
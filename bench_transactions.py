@@ -0,0 +1,63 @@
+"""
+Benchmark: resident memory of a categorized ledger held as per-row
+request + result dicts vs the struct-of-arrays TransactionTable.
+Rows are generated inside each measurement, as when parsing a file,
+so description strings are counted for both layouts.
+
+Run with:  python bench_transactions.py [num_rows]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from ai_engine.expense_categorizer import ExpenseCategorizer
+from ai_engine.transactions import TransactionTable
+from bench_categorizer import statement_rows
+
+
+def measure(label, build, n):
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'  {label:<24} {size / 1e6:9.1f} MB  {size / n:7.1f} B/row')
+    return obj, size
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    categorizer = ExpenseCategorizer()
+    code_of = {c: i for i, c in enumerate(categorizer.CATEGORY_CODES)}
+
+    variants = [
+        ('unique descriptions', lambda rng: statement_rows(rng, n)),
+        ('repeating merchants', lambda rng: [r.rsplit(' ', 2)[0] for r in statement_rows(rng, n)]),
+    ]
+    for label, make_rows in variants:
+        sample = make_rows(random.Random(1))
+        cats = categorizer._categorize_many(sample)
+        amounts = [round(random.Random(i).uniform(10, 5000), 2) for i in range(100)]
+        print(f'{n:,} rows, {label}')
+
+        def build_dicts():
+            rows = make_rows(random.Random(1))
+            requests = [{'description': d, 'amount': amounts[i % 100]} for i, d in enumerate(rows)]
+            return requests, [
+                {'description': t['description'], 'amount': float(t['amount']),
+                 'category': c, 'icon': categorizer.ICONS[c]}
+                for t, c in zip(requests, cats)]
+
+        def build_table():
+            table = TransactionTable(categorizer.CATEGORY_CODES)
+            table.extend(make_rows(random.Random(1)), (amounts[i % 100] for i in range(n)),
+                         (code_of[c] for c in cats))
+            return table
+
+        _, dicts = measure('request + result dicts', build_dicts, n)
+        _, table = measure('TransactionTable', build_table, n)
+        print(f'  reduction {dicts / table:.1f}x\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+
+from ai_engine.budget_analyzer import BudgetAnalyzer
+from ai_engine.budget_history import BudgetHistory
+
+
+def random_household(rng, analyzer):
+    categories = analyzer.NEEDS + analyzer.WANTS + analyzer.SAVINGS
+    expenses = {c: round(rng.uniform(0, 15000), 2)
+                for c in rng.sample(categories, rng.randint(0, len(categories)))}
+    return {'income': rng.choice([0, rng.uniform(5000, 150000)]), 'expenses': expenses}
+
+
+def test_batch_matches_analyze():
+    analyzer = BudgetAnalyzer()
+    rng = random.Random(3)
+    households = [random_household(rng, analyzer) for _ in range(500)]
+    print("Testing cohort budget analysis...")
+    result = analyzer.analyze_batch({'households': households})
+    for household, row in zip(households, result['results']):
+        assert row == analyzer.analyze(household)
+
+    valid = [r for r in result['results'] if 'error' not in r]
+    cohort = result['cohort']
+    assert cohort['households'] == 500
+    assert cohort['analyzed'] == len(valid)
+    assert sum(cohort['risk_levels'].values()) == len(valid)
+    assert cohort['overspending_households'] == sum(r['remaining'] < 0 for r in valid)
+    assert analyzer.analyze_batch({'households': []})['cohort']['analyzed'] == 0
+    print("SUCCESS")
+
+
+def test_rule_sets():
+    analyzer = BudgetAnalyzer()
+    household = {'income': 10000, 'expenses': {'housing': 5600, 'shopping': 2700,
+                                                'education': 300, 'savings': 1000}}
+    print("Testing budget rule sets...")
+    classic = analyzer.analyze(household)
+    assert classic['rule_set'] == '50/30/20'
+    assert classic['unmapped_categories'] == ['education']
+    assert classic['budget_data']['wants']['amount'] == 3000.0
+    assert classic['health_score'] == 65
+
+    regional = analyzer.analyze({**household, 'rule_set': '60/20/20'})
+    assert regional['budget_data']['needs']['ideal'] == 60
+    assert regional['budget_data']['needs']['status'] == 'good'
+    assert regional['health_score'] == 70
+    assert regional['optimized_budget']['wants'] == 2000.0
+
+    batch = analyzer.analyze_batch({'households': [household], 'rule_set': '60/20/20'})
+    assert batch['results'] == [regional]
+    assert 'error' in analyzer.analyze({**household, 'rule_set': '70/10/20'})
+
+
+def test_history_trends():
+    analyzer = BudgetAnalyzer()
+    rng = random.Random(5)
+    print("Testing budget history trends...")
+    with tempfile.TemporaryDirectory() as tmp:
+        history = BudgetHistory(os.path.join(tmp, 'finai.db'))
+        assert history.trends('u1')['months_recorded'] == 0
+
+        months = [f'2024-{m:02d}' for m in range(1, 13)] + ['2025-01', '2025-02']
+        order = months[:]
+        rng.shuffle(order)
+        snapshots = {}
+        # Back-filled and re-recorded months must leave the running sums right.
+        for month in order + months[5:8]:
+            household = {'income': rng.uniform(20000, 80000), 'expenses': {
+                'housing': rng.uniform(5000, 30000), 'dining_out': rng.uniform(0, 9000),
+                'savings': rng.uniform(0, 12000)}}
+            snapshots[month] = analyzer.analyze(household)
+            history.record('u1', snapshots[month], month)
+        history.record('u2', snapshots['2024-01'], '2024-01')
+
+        trends = history.trends('u1')
+        assert trends['months_recorded'] == 14
+        assert trends['latest']['month'] == '2025-02'
+        for size in (3, 6, 12):
+            window = [snapshots[m] for m in months[-size:]]
+            rolling = trends['rolling'][f'{size}m']
+            assert rolling['months'] == size
+            expected = sum(r['health_score'] for r in window) / size
+            assert abs(rolling['health_score'] - expected) < 0.01
+            expected = sum(r['income'] for r in window) / size
+            assert abs(rolling['income'] - expected) < 0.01
+        assert [p['month'] for p in trends['health_trajectory']] == months[-12:]
+        assert history.trends('u2')['rolling']['12m']['months'] == 1
+
+        for bad in ('2024-1', '2024-13', '24-01', '2024/01'):
+            try:
+                history.record('u1', snapshots['2024-01'], bad)
+                assert False, bad
+            except ValueError:
+                pass
+
+
+def test_history_concurrent_records():
+    analyzer = BudgetAnalyzer()
+    print("Testing concurrent budget snapshots...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'finai.db')
+        BudgetHistory(path)
+        months = [f'{y}-{m:02d}' for y in (2023, 2024) for m in range(1, 13)]
+        analyses = {m: analyzer.analyze({'income': 30000 + i * 1000, 'expenses': {'housing': 9000 + i * 100}})
+                    for i, m in enumerate(months)}
+
+        def worker(offset):
+            history = BudgetHistory(path)
+            for month in months[offset::4]:
+                history.record('u1', analyses[month], month)
+
+        threads = [threading.Thread(target=worker, args=(k,)) for k in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        conn = sqlite3.connect(path)
+        rows = conn.execute('SELECT month, seq, income, cum_income FROM budget_snapshots '
+                            'WHERE user_id = ? ORDER BY month', ('u1',)).fetchall()
+        conn.close()
+        assert [r[0] for r in rows] == months
+        assert [r[1] for r in rows] == list(range(1, len(months) + 1))
+        running = 0.0
+        for _, _, income, cum in rows:
+            running += income
+            assert abs(cum - running) < 1e-6
+
+
+if __name__ == "__main__":
+    test_batch_matches_analyze()
+    test_rule_sets()
+    test_history_trends()
+    test_history_concurrent_records()
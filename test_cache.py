@@ -0,0 +1,92 @@
+import logging
+import os
+import tempfile
+
+from ai_engine.budget_analyzer import BudgetAnalyzer
+from ai_engine.loan_eligibility import LoanEligibilityChecker
+from ai_engine.result_cache import CachedEngine, ResultCache, input_key, logger
+
+
+def test_result_cache_tiers():
+    household = {'income': 30000, 'expenses': {'housing': 9000, 'dining_out': 2500, 'savings': 4000}}
+    print("Testing two-tier result cache...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'finai.db')
+        cache = ResultCache(db)
+        budget = CachedEngine(BudgetAnalyzer(), cache, 'analyze')
+        expected = BudgetAnalyzer().analyze(household)
+
+        first = budget.analyze(household)
+        assert first == expected
+        # Key order and 9000 vs 9000.0 do not change the key.
+        reordered = {'expenses': {'savings': 4000.0, 'dining_out': 2500, 'housing': 9000}, 'income': 30000.0}
+        assert input_key('b', 1, 'analyze', household) == input_key('b', 1, 'analyze', reordered)
+        second = budget.analyze(reordered)
+        assert second['health_score'] == expected['health_score']
+        second['health_score'] = -1
+        assert budget.analyze(household)['health_score'] == expected['health_score']
+
+        # A second worker process sees the same SQLite tier.  It re-reads
+        # the shared generation on every call, as if GENERATION_TTL had passed.
+        other_cache = ResultCache(db, generation_ttl=0)
+        other = CachedEngine(BudgetAnalyzer(), other_cache, 'analyze')
+        assert other.analyze(household)['budget_data'] == first['budget_data']
+        assert other_cache.stats()['BudgetAnalyzer']['db_hits'] == 1
+        stats = cache.stats()['BudgetAnalyzer']
+        assert (stats['memory_hits'], stats['misses']) == (2, 1)
+
+        loans = CachedEngine(LoanEligibilityChecker(), cache, 'check_eligibility')
+        loans.check_eligibility({'monthly_income': 30000, 'monthly_expenses': 20000})
+        assert set(cache.stats()) == {'BudgetAnalyzer', 'LoanEligibilityChecker'}
+
+        assert cache.invalidate('BudgetAnalyzer')['rows_deleted'] == 1
+        budget.analyze(household)
+        assert cache.stats()['BudgetAnalyzer']['misses'] == 2
+
+        # The other worker still holds the old result in memory, but the
+        # shared generation moved on, so it misses too.
+        other.analyze(household)
+        assert other_cache.stats()['BudgetAnalyzer']['memory_hits'] == 0
+        assert other_cache.stats()['BudgetAnalyzer']['db_hits'] == 2
+        other_cache.invalidate()
+        other.analyze(household)
+        assert other_cache.stats()['BudgetAnalyzer']['misses'] == 1
+        # The first worker trusts its generation for GENERATION_TTL...
+        budget.analyze(household)
+        assert cache.stats()['BudgetAnalyzer']['memory_hits'] == 3
+        # ...then re-reads it and picks up the other worker's fresh row.
+        cache._generations.clear()
+        budget.analyze(household)
+        assert cache.stats()['BudgetAnalyzer']['db_hits'] == 1
+        assert cache.stats()['BudgetAnalyzer']['memory_hits'] == 3
+
+        # Within GENERATION_TTL a memory hit never touches SQLite.
+        def no_db():
+            raise AssertionError('memory hit opened the database')
+        cache._connect = no_db
+        assert budget.analyze(household)['budget_data'] == first['budget_data']
+        assert cache.stats()['BudgetAnalyzer']['memory_hits'] == 4
+    print("SUCCESS")
+
+
+def test_unserializable_results_are_logged():
+    print("Testing uncacheable results...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(os.path.join(tmp, 'finai.db'))
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger.addHandler(handler)
+        try:
+            for _ in range(2):
+                assert cache.call('Sets', 1, 'run', {'x': 1}, lambda data: {1, 2}) == {1, 2}
+        finally:
+            logger.removeHandler(handler)
+        assert cache.stats()['Sets']['misses'] == 2
+        assert len(records) == 1 and 'Sets' in records[0].getMessage()
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_result_cache_tiers()
+    test_unserializable_results_are_logged()
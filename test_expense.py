@@ -0,0 +1,261 @@
+import os
+import random
+import tempfile
+
+from ai_engine.budget_analyzer import BudgetAnalyzer
+from ai_engine.expense_categorizer import ExpenseCategorizer, normalize_merchant
+from ai_engine.expense_ledger import ExpenseLedger
+from ai_engine.merchant_index import MerchantIndex
+from ai_engine.naive_bayes import HashedNaiveBayes
+from ai_engine.parallel_categorizer import categorize_file
+from ai_engine.statement_reader import iter_rows
+
+
+def legacy_match(description):
+    desc = description.lower()
+    for cat, keywords in ExpenseCategorizer.CATEGORIES.items():
+        if any(kw in desc for kw in keywords):
+            return cat
+    return 'other'
+
+
+def test_automaton_matches_legacy_scan():
+    categorizer = ExpenseCategorizer()
+    rng = random.Random(7)
+    words = [kw for kws in ExpenseCategorizer.CATEGORIES.values() for kw in kws]
+    words += ['the', 'to', 'ref', 'xyz', 'payment', 'ksh', '-', '*', '123']
+    print("Testing keyword automaton against legacy scan...")
+    for _ in range(5000):
+        desc = ''.join(rng.choice(words) + rng.choice(['', ' ', '/'])
+                       for _ in range(rng.randint(0, 6)))
+        if rng.random() < 0.5:
+            desc = desc.upper()
+        assert categorizer._match(desc) == legacy_match(desc), desc
+
+
+def test_digits_keep_legacy_categories():
+    categorizer = ExpenseCategorizer()
+    rng = random.Random(11)
+    # Single-word keywords only: joining runs with spaces may complete a
+    # multi-word keyword ('home2loan') that the raw scan never sees.
+    words = [kw for kws in ExpenseCategorizer.CATEGORIES.values() for kw in kws if ' ' not in kw]
+    words += ['pay', 'to', 'ref', 'xq', 'k', 'order', 'shell', 'go', 'txn']
+    print("Testing digit-bearing descriptions against legacy scan...")
+    for fixed in ('Netflix4K', 'UBER2GO', 'Petrol95Shell', 'Swiggy123Order'):
+        assert categorizer._categorize_one(fixed) == legacy_match(fixed) != 'other', fixed
+    descriptions = []
+    for _ in range(3000):
+        tokens = []
+        for _ in range(rng.randint(1, 4)):
+            token = rng.choice(words)
+            digits = str(rng.randint(0, 9999))
+            form = rng.randrange(4)
+            if form == 1:
+                token = digits + token
+            elif form == 2:
+                token += digits
+            elif form == 3:
+                token += digits + rng.choice(words)
+            tokens.append(token.upper() if rng.random() < 0.5 else token)
+        descriptions.append(' '.join(tokens))
+    result = categorizer.categorize({'transactions': [{'description': d, 'amount': 1.0}
+                                                      for d in descriptions]})
+    for d, t in zip(descriptions, result['transactions']):
+        assert t['category'] == legacy_match(d), d
+
+
+def test_word_boundary_matching():
+    loose = ExpenseCategorizer()
+    strict = ExpenseCategorizer(word_boundary=True)
+    assert loose._match('Wordpress hosting') == 'savings'
+    assert strict._match('Wordpress hosting') == 'other'
+    assert strict._match('Automobile spares') == 'other'
+    assert strict._match('Auto rickshaw') == 'transportation'
+    assert strict._match('FD renewal') == 'savings'
+    assert strict._match('Home loan EMI') == 'housing'
+
+
+def test_stream_matches_categorize():
+    categorizer = ExpenseCategorizer()
+    lines = [
+        'Date,Details,Withdrawn\n',
+        '2024-01-02,Uber trip,"1,200.00"\n',
+        '2024-01-03,Pizza Inn,900\n',
+        '2024-01-04,Supermarket,400\n',
+        '2024-01-05,M-PESA transfer,\n',
+    ]
+    print("Testing streaming categorization...")
+    records = list(categorizer.categorize_stream(iter_rows(lines, 'csv')))
+    summary = records.pop()['summary']
+    expected = categorizer.categorize({'transactions': records})
+
+    assert [r['category'] for r in records] == ['transportation', 'dining_out', 'groceries', 'other']
+    assert summary['category_totals'] == expected['category_totals']
+    assert summary['insights'] == expected['insights']
+    assert summary['num_transactions'] == 4
+
+    # Bad lines become error records in place; the stream carries on.
+    lines = ['{"description": "Uber trip", "amount": "KSh 1,200"}\n', '[1, 2]\n', '{"amount": "ksh"}\n',
+             '{"description": null, "amount": "kes 50"}\n', 'not json\n', '{"amount": "lots"}\n',
+             '{"description": "Pizza Inn", "amount": 900}\n']
+    records = list(categorizer.categorize_stream(iter_rows(lines, 'ndjson')))
+    summary = records.pop()['summary']
+    assert [r.get('line') for r in records] == [None, 2, None, None, 5, 6, None]
+    assert [r['amount'] for r in records if 'error' not in r] == [1200.0, 0.0, 50.0, 900.0]
+    assert (summary['num_transactions'], summary['errors'], summary['total']) == (4, 3, 2150.0)
+    rows = list(iter_rows(['Details,Amount\n', 'Uber,abc\n', 'Rent,KSh 5\n'], 'csv'))
+    assert rows[0]['line'] == 2 and rows[1] == {'description': 'Rent', 'amount': 5.0}
+
+
+def test_merchant_cache():
+    assert normalize_merchant('UBER *TRIP 8X2') == 'uber trip'
+    assert normalize_merchant('SWIGGY ORDER 1234') == 'swiggy order'
+    assert normalize_merchant('M-PESA TRF SLK4H7XQ2P') == 'm pesa trf'
+    assert normalize_merchant('petrol95 Shell') == 'petrol shell'
+    # Single letters inside codes are never rescued.
+    assert normalize_merchant('Q60K706X netflix4k', lambda run: True) == 'netflix'
+
+    categorizer = ExpenseCategorizer(cache_size=2)
+    print("Testing merchant cache...")
+    for ref in range(10):
+        assert categorizer._categorize_one(f'UBER *TRIP {ref}X{ref}') == 'transportation'
+    stats = categorizer.cache_stats()
+    assert stats['hits'] == 9 and stats['misses'] == 1
+
+    categorizer._categorize_one('Netflix 123')
+    categorizer._categorize_one('Zomato 456')
+    assert categorizer.cache_stats()['evictions'] == 1
+
+
+def test_batch_matches_categorize():
+    categorizer = ExpenseCategorizer()
+    descriptions = ['Uber trip', 'Pizza Inn', 'Rent March', 'Pizza Inn', 'Cash', 'Netflix']
+    amounts = [300.0, 1200.0, 15000.0, 800.0, 50.0, 1100.0]
+    print("Testing columnar batch categorization...")
+    batch = categorizer.categorize_batch(descriptions, amounts)
+    rows = categorizer.categorize({'transactions': [
+        {'description': d, 'amount': a} for d, a in zip(descriptions, amounts)]})
+
+    names = [batch['categories'][c] for c in batch['codes']]
+    assert names == [t['category'] for t in rows['transactions']]
+    assert batch['category_totals'] == rows['category_totals']
+    assert batch['insights'] == rows['insights']
+    assert batch['total'] == rows['total']
+
+
+def test_merchant_index_overrides_keywords():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = MerchantIndex(os.path.join(tmp, 'finai.db'))
+        categorizer = ExpenseCategorizer(merchant_index=index)
+        print("Testing merchant index corrections...")
+        assert categorizer._categorize_many(['Java House 0012'])[0] == 'housing'
+
+        assert categorizer.correct('JAVA HOUSE #3391', 'dining_out')['merchant_key'] == 'java house'
+        assert 'error' in categorizer.correct('Java House', 'not_a_category')
+
+        result = categorizer.categorize({'transactions': [
+            {'description': 'Java House 0012', 'amount': 450},
+            {'description': 'Uber trip', 'amount': 300},
+        ]})
+        assert [t['category'] for t in result['transactions']] == ['dining_out', 'transportation']
+        assert index.lookup_many(['java house', 'uber trip']) == {'java house': 'dining_out'}
+
+
+def test_sharded_file_matches_single_process():
+    rng = random.Random(3)
+    samples = ['Uber trip', 'Pizza Inn', 'Rent', 'Naivas supermarket', 'Netflix', 'Cash out']
+    rows = [(rng.choice(samples), round(rng.uniform(1, 5000), 2)) for _ in range(3000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'statement.csv')
+        with open(path, 'w') as f:
+            f.write('Date,Description,Amount\n')
+            f.writelines(f'2024-01-01,{d},{a}\n' for d, a in rows)
+
+        print("Testing sharded statement categorization...")
+        single = categorize_file(path, workers=1)
+        sharded = categorize_file(path, workers=3)
+
+    for key in ('category_totals', 'total', 'insights', 'num_transactions'):
+        assert single[key] == sharded[key], key
+    expected = ExpenseCategorizer().categorize(
+        {'transactions': [{'description': d, 'amount': a} for d, a in rows]})
+    assert single['num_transactions'] == 3000
+    assert single['category_totals'] == expected['category_totals']
+    assert single['total'] == expected['total']
+    batch = ExpenseCategorizer().categorize_batch([d for d, _ in rows], [a for _, a in rows])
+    assert batch['category_totals'] == expected['category_totals']
+    assert batch['total'] == expected['total']
+
+
+def test_ledger_totals_are_incremental():
+    batches = [
+        [{'description': 'Naivas supermarket', 'amount': 2000}, {'description': 'Pizza Inn', 'amount': 800}],
+        [{'description': 'Pizza Inn', 'amount': 1900}, {'description': 'Netflix', 'amount': 1100}],
+        [{'description': 'Shoes', 'amount': 3000}],
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        categorizer = ExpenseCategorizer()
+        ledger = ExpenseLedger(categorizer, os.path.join(tmp, 'finai.db'))
+        print("Testing incremental expense ledger...")
+        for batch in batches:
+            summary = ledger.append('amina', batch)
+        assert ledger.summary('bob')['num_transactions'] == 0
+
+    history = [t for batch in batches for t in batch]
+    expected = categorizer.categorize({'transactions': history})
+    assert summary['category_totals'] == expected['category_totals']
+    assert summary['insights'] == expected['insights']
+    assert summary['num_transactions'] == 5 and summary['appended'] == 1
+    assert summary['ranking'][0] == 'shopping'
+    assert summary['dining_to_groceries'] == 1.35
+
+
+def test_naive_bayes_fallback():
+    model = HashedNaiveBayes.from_categorizer(ExpenseCategorizer.CATEGORIES,
+                                              [('java house', 'dining_out')])
+    texts = ['kplc electric token', 'pharmaceuticals ltd', 'java house westlands']
+    print("Testing naive Bayes fallback...")
+    dense = model._matrix(texts) @ model.feature_log_prob.T + model.log_prior
+    assert abs(dense - model._joint_log_likelihood(texts)).max() < 1e-3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'expense_nb.npz')
+        model.save(path)
+        loaded = HashedNaiveBayes.load(path)
+    labels, confidence = loaded.predict(texts)
+    assert labels[:2] == ['utilities', 'healthcare'] and min(confidence[:2]) > 0.9
+
+    categorizer = ExpenseCategorizer(fallback_model=loaded)
+    result = categorizer.categorize({'transactions': [
+        {'description': 'KPLC ELECTRIC TOKEN 1234', 'amount': 500},
+        {'description': 'Cash withdrawal', 'amount': 100},
+    ]})
+    assert [t['category'] for t in result['transactions']] == ['utilities', 'other']
+
+
+def test_transaction_table():
+    categorizer = ExpenseCategorizer()
+    print("Testing compact transaction table...")
+    table = categorizer.categorize_table(['Rent', 'Café Java', 'Naivas supermarket'], [9000, 350.5, 4000])
+    assert len(table) == 3
+    assert table[1] == ('Café Java', 350.5, 'other')
+    assert list(table)[2] == ('Naivas supermarket', 4000.0, 'groceries')
+    assert table.category_totals() == {'housing': 9000.0, 'groceries': 4000.0, 'other': 350.5}
+
+    result = BudgetAnalyzer().analyze_table(table, income=30000)
+    assert result['budget_data']['needs']['amount'] == 13000.0
+
+
+if __name__ == "__main__":
+    test_automaton_matches_legacy_scan()
+    test_digits_keep_legacy_categories()
+    test_word_boundary_matching()
+    test_stream_matches_categorize()
+    test_merchant_cache()
+    test_batch_matches_categorize()
+    test_merchant_index_overrides_keywords()
+    test_sharded_file_matches_single_process()
+    test_ledger_totals_are_incremental()
+    test_naive_bayes_fallback()
+    test_transaction_table()
+    print("SUCCESS")
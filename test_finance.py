@@ -0,0 +1,52 @@
+import numpy as np
+
+from ai_engine import finance
+
+
+def test_annuity_kernel():
+    print("Testing finance kernel...")
+    rates = np.array([0.0, 0.005, 0.01, 0.02])
+    principal = np.array([0.0, 10000.0, 50000.0, 250000.0])
+    emi = finance.emi(principal, rates, 24)
+    for p, r, e in zip(principal, rates, emi):
+        assert finance.emi(float(p), float(r), 24) == e
+    assert finance.emi(1000.0, 0.01, 0) == 0.0
+    assert np.allclose(finance.pv_annuity(emi, rates, 24), principal)
+    assert np.allclose(finance.fv(finance.pv_annuity(100.0, 0.01, 12), 0.01, 12),
+                       finance.fv_annuity(100.0, 0.01, 12))
+
+    payment, interest, principal_paid, balance = finance.amortization(50000.0, 0.01, 24)
+    assert len(balance) == 24 and abs(balance[-1]) < 1e-6
+    assert np.allclose(interest + principal_paid, payment)
+    assert np.isclose(principal_paid.sum(), 50000.0)
+    assert len(finance.amortization(50000.0, 0.01, 24, months=6)[3]) == 6
+
+    before = finance.annuity_factors.cache_info().hits
+    finance.emi(1000.0, 0.01, 24)
+    assert finance.annuity_factors.cache_info().hits == before + 1
+    print("SUCCESS")
+
+
+def test_bond_metrics():
+    zero = finance.bond_metrics(1000.0, 0.0, 0.08, 5)
+    assert np.isclose(zero['macaulay_duration'], 5)
+    assert np.isclose(zero['convexity'], 5 * 6 / 1.08 ** 2)
+
+    bond = finance.bond_metrics(1000.0, 0.08, 0.08, 10)
+    assert np.isclose(bond['price'], 1000.0)
+    # Second-order price approximation against a full reprice.
+    dy = 0.001
+    shocked = finance.bond_metrics(1000.0, 0.08, 0.08 + dy, 10)['price']
+    approx = bond['price'] * (1 - bond['modified_duration'] * dy + 0.5 * bond['convexity'] * dy ** 2)
+    assert abs(shocked - approx) < 1e-3
+
+    # Fractional tenures keep every coupon, dated back from maturity.
+    assert list(finance.coupon_times(2.5)) == [0.5, 1.5, 2.5]
+    years = np.array([0.5, 2.5, 7.25, 10.0])
+    prices = finance.bond_prices(1000.0, 0.08, 0.07, years)
+    assert np.allclose(prices, [finance.bond_metrics(1000.0, 0.08, 0.07, t)['price'] for t in years])
+
+
+if __name__ == "__main__":
+    test_annuity_kernel()
+    test_bond_metrics()
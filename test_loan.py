@@ -1,3 +1,14 @@
+import base64
+import io
+import json
+import os
+import random
+import tempfile
+
+import numpy as np
+
+from ai_engine.catalog import Catalog, build_product_index
+from ai_engine.loan_book import read_book, write_results
 from ai_engine.loan_eligibility import LoanEligibilityChecker
 
 def test_loan_logic():
@@ -20,5 +31,120 @@ def test_loan_logic():
     except Exception as e:
         print(f"FAILED: {e}")
 
+def test_batch_matches_scalar():
+    checker = LoanEligibilityChecker()
+    rng = random.Random(11)
+    applicants = [{
+        'monthly_income': rng.choice([0, rng.uniform(2000, 90000)]),
+        'monthly_expenses': rng.uniform(0, 60000),
+        'existing_debt': rng.uniform(0, 200000),
+        'savings': rng.uniform(0, 300000),
+        'employment_months': rng.randint(0, 60),
+        'dependents': rng.randint(0, 7),
+        'has_bank_account': rng.random() < 0.6,
+        'requested_amount': rng.choice([0, rng.uniform(1000, 150000)]),
+    } for _ in range(2000)]
+    columns = {k: [a[k] for a in applicants] for k in applicants[0]}
+
+    print("Testing applicant book scoring...")
+    batch = checker.check_eligibility_batch(columns)
+    for i, a in enumerate(applicants):
+        expected = checker.check_eligibility(a)
+        assert batch['score'][i] == expected['score']
+        assert batch['verdict'][i] == expected['verdict']
+        assert batch['risk_level'][i] == expected['risk_level']
+        assert round(float(batch['monthly_disposable'][i]), 2) == expected['monthly_disposable']
+        assert batch['safe_emi'][i] == expected['safe_emi']
+        factors = {name: round(float(v[i]), 1) for name, v in batch['factors'].items() if v[i] == v[i]}
+        assert factors == {f['name']: f['score'] for f in expected['factors']}
+        products = [{'name': name, 'max_eligible_amount': int(batch['max_eligible_amount'][i, j]),
+                     'monthly_emi': int(batch['monthly_emi'][i, j]),
+                     'affordable': bool(batch['affordable'][i, j])}
+                    for j, name in enumerate(batch['products']) if batch['eligible'][i, j]]
+        assert products == [{k: p[k] for k in ('name', 'max_eligible_amount', 'monthly_emi', 'affordable')}
+                            for p in expected['eligible_products']]
+
+    book = io.StringIO('applicant_id,monthly_income,monthly_expenses,has_bank_account,employment_months\r\n'
+                       'A1,"30,000",12000,yes,24\r\nA2,,,no,\r\n')
+    ids, columns = read_book(book)
+    out = io.StringIO()
+    write_results(out, ids, checker.check_eligibility_batch(columns))
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 3 and lines[1].startswith('A1,')
+    assert int(lines[1].split(',')[1]) == checker.check_eligibility(
+        {'monthly_income': 30000, 'monthly_expenses': 12000, 'has_bank_account': True,
+         'employment_months': 24})['score']
+    print("SUCCESS")
+
+
+def test_what_if_grid_matches_scalar():
+    checker = LoanEligibilityChecker()
+    applicant = {'monthly_income': 30000, 'monthly_expenses': 18000, 'existing_debt': 20000,
+                 'savings': 15000, 'employment_months': 18, 'dependents': 2,
+                 'has_bank_account': True, 'requested_amount': 60000}
+    print("Testing what-if grid...")
+    grid = checker.what_if_grid(applicant)
+    assert grid['shape'] == [50, 50, 20]
+
+    def decode(typed):
+        return np.frombuffer(base64.b64decode(typed['data']), dtype=typed['dtype']).reshape(grid['shape'])
+
+    score, eligible = decode(grid['score']), decode(grid['eligible_mask'])
+    rng = random.Random(2)
+    for _ in range(200):
+        i, j, k = rng.randrange(50), rng.randrange(50), rng.randrange(20)
+        expected = checker.check_eligibility({
+            **applicant, 'monthly_income': grid['axes']['monthly_income'][i],
+            'existing_debt': grid['axes']['existing_debt'][j], 'savings': grid['axes']['savings'][k]})
+        assert score[i, j, k] == expected['score']
+        names = {p['name'] for p in expected['eligible_products']}
+        assert {p for b, p in enumerate(grid['products']) if eligible[i, j, k] >> b & 1} == names
+
+    small = checker.what_if_grid({**applicant, 'grid': {'savings': {'values': [0, 50000]}}})
+    assert small['shape'] == [50, 50, 2]
+    assert 'error' in checker.what_if_grid({**applicant, 'grid': {'savings': {'steps': 1000}}})
+    for grid in ([1, 2], {'savings': 5}, {'savings': {'steps': 0}}, {'savings': {'steps': -3}},
+                 {'savings': {'steps': 'many'}}, {'savings': {'values': [1, 'x']}},
+                 {'savings': {'values': [[1, 2]]}}, {'savings': {'max': None}},
+                 {'savings': {'max': float('inf')}}):
+        assert 'error' in checker.what_if_grid({**applicant, 'grid': grid}), grid
+    print("SUCCESS")
+
+def test_catalog_reload():
+    products = [
+        {'name': 'Gold', 'min_score': 80, 'max_amount': 90000, 'interest_rate': 8, 'tenure_months': 36},
+        {'name': 'Starter', 'min_score': 20, 'max_amount': 20000, 'interest_rate': 12, 'tenure_months': 12},
+    ]
+    applicant = {'monthly_income': 30000, 'monthly_expenses': 18000, 'employment_months': 24,
+                 'has_bank_account': True, 'requested_amount': 15000}
+    print("Testing catalog reload...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'loan_products.json')
+        with open(path, 'w') as f:
+            json.dump({'products': products}, f)
+        checker = LoanEligibilityChecker(Catalog(path, build_product_index, check_interval=0))
+        version = checker.cache_version
+        assert checker.catalog.snapshot().value.min_scores == (20, 80)
+        score = checker.check_eligibility(applicant)['score']
+        assert 20 <= score < 80
+        assert [p['name'] for p in checker.check_eligibility(applicant)['eligible_products']] == ['Starter']
+
+        products[1]['min_score'] = 95
+        with open(path, 'w') as f:
+            json.dump({'products': products}, f)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        assert checker.check_eligibility(applicant)['eligible_products'] == []
+        assert checker.cache_version != version
+
+        with open(path, 'w') as f:
+            f.write('{"products": [{"name": "broken"}]}')
+        assert checker.catalog.reload() is False
+        assert 'missing' in checker.catalog.status()['last_error']
+        assert checker.catalog.snapshot().value.min_scores == (80, 95)
+    print("SUCCESS")
+
 if __name__ == "__main__":
     test_loan_logic()
+    test_batch_matches_scalar()
+    test_what_if_grid_matches_scalar()
+    test_catalog_reload()
@@ -1,4 +1,8 @@
-from ai_engine.risk_optimization import RiskOptimizationEngine
+import numpy as np
+
+from ai_engine import finance, monte_carlo
+from ai_engine.amortization import AmortizationSchedule
+from ai_engine.risk_optimization import KEY_TENORS, RiskOptimizationEngine
 
 def test_risk_logic():
     engine = RiskOptimizationEngine()
@@ -24,5 +28,178 @@ def test_risk_logic():
     except Exception as e:
         print(f"FAILED: {e}")
 
+def test_amortization_schedule_pages():
+    schedule = AmortizationSchedule(3_000_000, 13, 360)
+    print("Testing paginated amortization schedule...")
+    rows, cursor = [], 1
+    while cursor is not None:
+        page = schedule.page(cursor, limit=100)
+        rows.extend(page['rows'])
+        cursor = page['next_from_month']
+    assert [r['month'] for r in rows] == list(range(1, 361))
+    assert rows[-1]['balance'] == 0
+    assert abs(sum(r['principal'] for r in rows) - 3_000_000) < 1
+    assert abs(rows[-1]['total_interest_paid'] - schedule.summary()['total_interest']) < 0.01
+
+    # Direct rows agree with an iterative walk of the loan.
+    bal, r = 3_000_000, 13 / 12 / 100
+    for month in range(1, 301):
+        interest = bal * r
+        bal -= schedule.emi - interest
+    assert schedule.row(300)['balance'] == round(bal, 2)
+    assert schedule.row(300) == rows[299]
+    assert next(schedule.iter_rows(359))['month'] == 359
+
+    # Previous 24-month timeline is a prefix of the full schedule.
+    impact = RiskOptimizationEngine().decision_impact({
+        'decision_type': 'loan', 'amount': 3_000_000, 'interest_rate': 13, 'tenure_months': 360,
+        'monthly_income': 90000, 'monthly_expenses': 40000})
+    assert [{k: t[k] for k in ('month', 'principal', 'interest', 'balance')} for t in impact['timeline']] == \
+        [{k: r[k] for k in ('month', 'principal', 'interest', 'balance')} for r in rows[:24]]
+    assert 'error' in AmortizationSchedule.from_request({'principal': 1000, 'tenure_months': 0})
+    print("SUCCESS")
+
+
+def test_rate_shock_grid():
+    print("Testing rate-shock grid...")
+    engine = RiskOptimizationEngine()
+    holdings = [{'name': 'T-bond', 'principal': 100000, 'rate': 12, 'tenure_years': 10},
+                {'name': 'FD', 'principal': 50000, 'rate': 8, 'tenure_years': 2.5},
+                {'name': 'Zero', 'principal': 20000, 'rate': 0, 'tenure_years': 4}]
+    grid = engine.rate_shock_grid({'holdings': holdings, 'holding_pnl': True})
+    shocks = grid['shocks_bp']
+    assert shocks[0] == -300 and shocks[-1] == 300 and grid['portfolio']['pnl'][shocks.index(0)] == 0
+
+    for h, row in zip(holdings, grid['holdings']):
+        r, t = h['rate'] / 100, h['tenure_years']
+        base = finance.bond_metrics(h['principal'], r, r, t)
+        assert abs(row['price'] - base['price']) < 0.01
+        assert abs(row['modified_duration'] - base['modified_duration']) < 1e-4
+        assert abs(row['convexity'] - base['convexity']) < 1e-4
+        assert abs(sum(row['key_rate_durations']) - row['modified_duration']) < 1e-3
+        for bp, pnl in zip(shocks, row['pnl']):
+            shocked = finance.bond_metrics(h['principal'], r, r + bp / 10000, t)['price']
+            assert abs(pnl - (shocked - base['price'])) < 0.01
+    # The fractional FD keeps its final coupon: 0.5, 1.5 and 2.5 years.
+    assert grid['holdings'][1]['price'] > 50000
+
+    # Convexity closes most of the gap left by duration alone.
+    p = grid['portfolio']
+    for full, dur, conv in zip(p['pnl'], p['pnl_duration'], p['pnl_duration_convexity']):
+        assert abs(full - conv) <= abs(full - dur) + 0.01
+
+    # Key-rate durations match a 1bp bump of the 10-year key rate.
+    bond = holdings[0]
+    times, flows = finance.cash_flows(100000.0, 0.12, 10.0)
+    tent = np.interp(times, KEY_TENORS, np.eye(len(KEY_TENORS))[KEY_TENORS.index(10)])
+    up, down = ((flows * (1.12 + s * 1e-4 * tent) ** -times).sum() for s in (1, -1))
+    krd = (down - up) / (2e-4 * grid['holdings'][0]['price'])
+    assert abs(krd - grid['holdings'][0]['key_rate_durations'][KEY_TENORS.index(10)]) < 1e-4
+
+    # A flat curve scenario is the same as a parallel shock.
+    flat = engine.rate_shock_grid({'holdings': [bond], 'shocks_bp': [100], 'scenarios': {'flat': {5: 100}}})
+    assert abs(flat['scenarios'][0]['pnl'] - flat['portfolio']['pnl'][0]) < 0.01
+
+    assert 'error' in engine.rate_shock_grid({'holdings': []})
+    assert 'error' in engine.rate_shock_grid({'holdings': [{**bond, 'tenure_years': 0}]})
+    assert 'error' in engine.rate_shock_grid({'holdings': [bond], 'shocks_bp': ['x']})
+    print("SUCCESS")
+
+
+def test_value_at_risk():
+    print("Testing Monte Carlo VaR...")
+    engine = RiskOptimizationEngine()
+    holdings = [{'name': 'T-bond', 'principal': 100000, 'rate': 12, 'tenure_years': 10},
+                {'name': 'FD', 'principal': 50000, 'rate': 8, 'tenure_years': 2.5}]
+    request = {'holdings': holdings, 'paths': 20000, 'seed': 11}
+    result = engine.value_at_risk(request)
+    assert engine.value_at_risk(request) == result and result['seed'] == 11
+    assert 0 < result['var']['95'] < result['var']['99']
+    assert result['expected_shortfall']['95'] >= result['var']['95']
+    assert result['expected_shortfall']['99'] >= result['var']['99']
+    longer = engine.value_at_risk({**request, 'horizon_days': 90})
+    width = [r['pnl_percentiles']['p95'] - r['pnl_percentiles']['p5'] for r in (result, longer)]
+    assert width[1] > width[0]
+
+    # Without volatility every path earns the same carry.
+    calm = engine.value_at_risk({**request, 'model': {'volatilities': [0, 0]}})
+    assert calm['pnl_percentiles']['p1'] == calm['pnl_percentiles']['p99'] == calm['expected_pnl']
+
+    # A near-parallel one-factor curve matches the duration + convexity normal VaR.
+    sigma, days = 0.01, 30
+    parallel = engine.value_at_risk({**request, 'horizon_days': days, 'paths': 50000,
+                                     'model': {'speeds': [1e-6, 1e-6], 'volatilities': [sigma, 0]}})
+    grid = engine.rate_shock_grid({'holdings': holdings, 'shocks_bp': [0]})['portfolio']
+    dy = 1.6449 * sigma * (days / 365) ** 0.5
+    value = grid['value']
+    loss = value * (grid['modified_duration'] * dy - 0.5 * grid['convexity'] * dy * dy)
+    carry = calm['expected_pnl'] * days / 10
+    assert abs(parallel['var']['95'] - (loss - carry)) < 0.05 * loss
+
+    # Chunks give the same paths in a pool as in-process.
+    args = ([1080.0, 80.0, 80.0], [2.5, 1.5, 0.5], [0.08] * 3, 0.1, [0.5, 0.05],
+            [[1e-5, 0.0], [0.0, 4e-6]])
+    pool_min, cells = monte_carlo.POOL_MIN_PATHS, monte_carlo.MAX_CELLS
+    monte_carlo.POOL_MIN_PATHS, monte_carlo.MAX_CELLS = 0, 3000
+    try:
+        _, pooled = monte_carlo.simulate_rate_pnl(*args, paths=5000, seed=3, workers=2)
+        _, serial = monte_carlo.simulate_rate_pnl(*args, paths=5000, seed=3, workers=1)
+    finally:
+        monte_carlo.POOL_MIN_PATHS, monte_carlo.MAX_CELLS = pool_min, cells
+    assert np.array_equal(pooled, serial)
+
+    assert 'error' in engine.value_at_risk({**request, 'horizon_days': 0})
+    assert 'error' in engine.value_at_risk({**request, 'model': {'speeds': [0, 1]}})
+    assert 'error' in engine.value_at_risk({'holdings': []})
+    print("SUCCESS")
+
+
+def test_compare_decisions():
+    print("Testing decision comparison...")
+    engine = RiskOptimizationEngine()
+    rng = np.random.default_rng(4)
+    profile = {'monthly_income': 90000, 'monthly_expenses': 55000, 'current_savings': 150000,
+               'current_debt': 80000}
+    kinds = ['loan', 'investment', 'expense', 'loan']
+    alternatives = [{'decision_type': kinds[i % 4], 'amount': float(rng.uniform(0, 2e6)),
+                     'interest_rate': float(rng.choice([0, rng.uniform(5, 25)])),
+                     'tenure_months': int(rng.integers(1, 360))} for i in range(200)]
+    result = engine.compare_decisions({**profile, 'alternatives': alternatives})
+    assert result['count'] == 200 and [a['rank'] for a in result['alternatives']] == list(range(1, 201))
+
+    for alt in result['alternatives']:
+        single = engine.decision_impact({**profile, **alternatives[alt['index']]})
+        for key in ('after', 'monthly_impact', 'impact_score', 'verdict', 'risk_indicators'):
+            assert alt[key] == single[key], key
+    assert result['before'] == single['before']
+    scores = [a['impact_score'] for a in result['alternatives']]
+    assert scores == sorted(scores, reverse=True)
+
+    # Pareto set: nothing beats a member on both surplus and interest.
+    points = {a['index']: (a['after']['monthly_surplus'], a['total_interest'])
+              for a in result['alternatives']}
+    front = set(result['pareto'])
+    undominated = {i for i, (surplus, interest) in points.items()
+                   if not any(s >= surplus and t <= interest and (s, t) != (surplus, interest)
+                              for s, t in points.values())}
+    # Exact duplicates of a front point are listed once.
+    assert front <= undominated and {points[i] for i in front} == {points[i] for i in undominated}
+
+    grid = engine.compare_decisions({**profile, 'grid': {'amount': [200000, 500000],
+                                                          'interest_rate': [10, 14],
+                                                          'tenure_months': [12, 24, 36]}})
+    assert grid['count'] == 12
+    best = grid['alternatives'][0]
+    assert best['amount'] == 200000 and best['interest_rate'] == 10 and best['tenure_months'] == 36
+    assert 'error' in engine.compare_decisions(profile)
+    assert 'error' in engine.compare_decisions({**profile, 'grid': {'amount': list(range(100)),
+                                                                    'tenure_months': list(range(100))}})
+    print("SUCCESS")
+
+
 if __name__ == "__main__":
     test_risk_logic()
+    test_amortization_schedule_pages()
+    test_rate_shock_grid()
+    test_value_at_risk()
+    test_compare_decisions()
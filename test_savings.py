@@ -0,0 +1,203 @@
+import numpy as np
+
+import json
+
+from ai_engine import finance, monte_carlo
+from ai_engine.portfolio import covariance
+from ai_engine.savings_advisor import SavingsAdvisor
+
+
+def _loop_value(current, monthly, annual_rate, months):
+    # Month-by-month compounding the advisor used before the closed form.
+    mr = annual_rate / 12
+    fv = current * (1 + mr) ** months
+    for m in range(months):
+        fv += monthly * (1 + mr) ** (months - m - 1)
+    return fv
+
+
+def test_long_horizon_projection():
+    print("Testing savings projections...")
+    advisor = SavingsAdvisor()
+    goal = {'monthly_income': 120000, 'monthly_expenses': 70000, 'current_savings': 250000,
+            'target_amount': 20_000_000, 'target_months': 480, 'risk_tolerance': 'moderate'}
+    plan = advisor.create_plan(goal)
+    assert plan['projection'] == 'first_year'
+    assert [m['month'] for m in plan['milestones']] == list(range(1, 13))
+    rates = advisor.catalog.snapshot().value.rates
+    monthly = (20_000_000 - 250000) / 480
+    for scenario, rate in zip(plan['scenarios'], rates.values()):
+        expected = _loop_value(250000, monthly, rate, 480)
+        assert abs(scenario['projected_value'] - expected) < 0.01
+
+    full = advisor.create_plan({**goal, 'projection': 'full'})
+    assert [m['month'] for m in full['milestones']] == list(range(1, 481))
+    assert full['milestones'][:12] == plan['milestones']
+    final = full['milestones'][-1]['amount']
+    assert abs(final - _loop_value(250000, monthly, rates['moderate'], 480)) < 0.01
+
+    yearly = advisor.create_plan({**goal, 'projection': 'full', 'sample': 'yearly'})
+    assert [m['month'] for m in yearly['milestones']] == list(range(12, 481, 12))
+    assert yearly['milestones'][-1]['amount'] == final
+    odd = advisor.create_plan({**goal, 'target_months': 30, 'projection': 'full', 'sample': 'yearly'})
+    assert [m['month'] for m in odd['milestones']] == [12, 24, 30]
+
+    chart = advisor.create_plan({**goal, 'projection': 'full', 'sample': 50})
+    months = [m['month'] for m in chart['milestones']]
+    assert len(months) == 50 and months[-1] == 480 and months == sorted(set(months))
+    assert 'error' in advisor.create_plan({**goal, 'projection': 'full', 'sample': 'weekly'})
+    print("SUCCESS")
+
+
+def test_monte_carlo_simulation():
+    print("Testing Monte Carlo savings simulation...")
+    advisor = SavingsAdvisor()
+    goal = {'monthly_income': 90000, 'monthly_expenses': 60000, 'current_savings': 100000,
+            'target_amount': 6_000_000, 'target_months': 360, 'simulate': True,
+            'paths': 5000, 'seed': 42}
+    plan = advisor.create_plan(goal)
+    sim = plan['simulation']
+    assert sim['seed'] == 42 and sim['paths'] == 5000
+    assert advisor.create_plan(goal)['simulation'] == sim
+    assert advisor.create_plan({**goal, 'seed': 43})['simulation'] != sim
+    assert advisor.create_plan({**goal, 'simulate': False})['simulation'] is None
+
+    by_name = {s['strategy']: s for s in sim['strategies']}
+    for s in sim['strategies']:
+        assert s['bands'][-1]['month'] == 360
+        assert all(b['p5'] <= b['p50'] <= b['p95'] for b in s['bands'])
+        assert 0 <= s['probability_of_goal'] <= 100
+    # Riskier strategies spread wider.
+    spread = {n: s['final']['p95'] - s['final']['p5'] for n, s in by_name.items()}
+    assert spread['conservative'] < spread['moderate'] < spread['aggressive']
+
+    # Zero volatility collapses every path onto the closed-form value.
+    steps = np.array([12, 120, 360])
+    _, (flat,) = monte_carlo.simulate_savings(100000, 5000, [(0.1, 0.0)], 360, 0, steps,
+                                              paths=10, seed=1)
+    expected = finance.fv(100000, 0.1 / 12, steps) + finance.fv_annuity(5000, 0.1 / 12, steps)
+    assert np.allclose(flat['p5'], expected) and np.allclose(flat['p95'], expected)
+
+    # Same seed, same result whether the chunks run in a pool or not.
+    args = (100000, 5000, [(0.1, 0.12), (0.14, 0.2)], 120, 1e6, np.array([60, 120]))
+    pool_min = monte_carlo.POOL_MIN_PATHS
+    monte_carlo.POOL_MIN_PATHS = 0
+    try:
+        _, pooled = monte_carlo.simulate_savings(*args, paths=9000, seed=7, workers=2)
+    finally:
+        monte_carlo.POOL_MIN_PATHS = pool_min
+    _, serial = monte_carlo.simulate_savings(*args, paths=9000, seed=7, workers=1)
+    for a, b in zip(pooled, serial):
+        assert a['probability'] == b['probability'] and np.array_equal(a['p50'], b['p50'])
+
+    assert 'error' in advisor.create_plan({**goal, 'paths': 10 ** 7})
+    assert 'error' in advisor.create_plan({**goal, 'seed': 'abc'})
+    print("SUCCESS")
+
+
+def test_goal_solver():
+    print("Testing goal solver...")
+    advisor = SavingsAdvisor()
+    goal = {'monthly_income': 90000, 'monthly_expenses': 60000, 'current_savings': 100000,
+            'target_amount': 6_000_000, 'target_months': 240}
+    solved = advisor.solve_goal(goal)
+    rates = advisor.catalog.snapshot().value.rates
+    for s in solved['strategies']:
+        mr = rates[s['strategy']] / 12
+        # The solved contribution lands on the target, up to its rounding.
+        value = _loop_value(100000, s['monthly_required'], rates[s['strategy']], 240)
+        assert abs(value - 6_000_000) <= 0.005 * finance.fv_annuity(1.0, mr, 240)
+        assert s['monthly_required'] < solved['straight_line_monthly']
+        # months_to_goal is the first month the balance reaches the target.
+        m = s['months_to_goal']
+        reached = [finance.fv(100000, mr, k) + finance.fv_annuity(18000, mr, k) >= 6_000_000
+                   for k in (m - 1, m)]
+        assert reached == [False, True]
+    r = solved['required_annual_rate'] / 100
+    assert _loop_value(100000, 18000, r - 5e-5, 240) < 6_000_000 < _loop_value(100000, 18000, r + 5e-5, 240)
+
+    # Bulk: each row of the vectorized call matches the scalar inversion.
+    rng = np.random.default_rng(0)
+    n = 2000
+    columns = {'target_amount': rng.uniform(1e4, 1e7, n), 'current_savings': rng.uniform(0, 2e5, n),
+               'target_months': rng.integers(1, 480, n), 'monthly_contribution': rng.uniform(0, 3e4, n),
+               'annual_rate': rng.choice([0.0, 6.0, 10.0, 14.0], n)}
+    bulk = advisor.solve_goals(columns)
+    for i in range(0, n, 97):
+        t, p, m, c, a = (columns[k][i] for k in columns)
+        mr = a / 1200
+        assert np.isclose(bulk['monthly_required'][i],
+                          max(0.0, (t - finance.fv(p, mr, int(m))) / finance.fv_annuity(1.0, mr, int(m))))
+        k = bulk['months_to_goal'][i]
+        if k < 0:
+            assert c == 0 or (mr == 0 and c <= 0)
+        elif k > 0:
+            assert finance.fv(p, mr, int(k)) + finance.fv_annuity(c, mr, int(k)) >= t * (1 - 1e-12)
+            assert finance.fv(p, mr, int(k) - 1) + finance.fv_annuity(c, mr, int(k) - 1) < t
+    rate = bulk['required_annual_rate']
+    ok = ~np.isnan(rate)
+    value = (finance.fv(columns['current_savings'], rate / 1200, columns['target_months'])
+             + finance.fv_annuity(columns['monthly_contribution'], rate / 1200, columns['target_months']))
+    assert np.all((value >= columns['target_amount'] * (1 - 1e-6))[ok])
+
+    for bad in ({'target_amount': [1e5, 2e5], 'annual_rate': [6.0]},
+                {'target_amount': [1e5, 'lots']},
+                {'target_amount': [1e5, None]},
+                {'target_amount': [[1e5]]},
+                {'target_amount': 1e5},
+                {'other': [1.0]},
+                [1e5]):
+        assert 'error' in advisor.solve_goals(bad), bad
+    assert advisor.solve_goals({'target_amount': [], 'annual_rate': []})['monthly_required'].size == 0
+    print("SUCCESS")
+
+
+def test_efficient_frontier():
+    print("Testing efficient frontier...")
+    advisor = SavingsAdvisor()
+    catalog = advisor.catalog.snapshot().value
+    frontier = catalog.frontier
+    returns, vols = np.array(frontier.returns), np.array(frontier.vols)
+    assert np.all(np.diff(returns) > 0) and np.all(np.diff(vols) > 0)
+    assert np.allclose(frontier.weights.sum(axis=1), 1) and np.all(frontier.weights >= 0)
+
+    # No random long-only portfolio beats the frontier at its volatility.
+    with open(advisor.catalog.path) as f:
+        raw = json.load(f)
+    mu = np.array([i['expected_return'] for i in raw['instruments']])
+    cov = covariance([i['volatility'] for i in raw['instruments']], raw['correlation'])
+    w = np.random.default_rng(1).dirichlet(np.ones(mu.size), 5000)
+    ret, vol = w @ mu, np.sqrt(np.einsum('ij,jk,ik->i', w, cov, w))
+    # (up to the spacing of the frontier points and sampling precision)
+    above = np.minimum(np.searchsorted(vols, vol), len(vols) - 1)
+    assert np.all(ret <= returns[above] + 1e-4)
+
+    plans = {}
+    for tier, cap in catalog.volatility.items():
+        plan = advisor.create_plan({'monthly_income': 80000, 'monthly_expenses': 50000,
+                                    'target_amount': 2_000_000, 'target_months': 120,
+                                    'risk_tolerance': tier})
+        allocation = plan['allocation']
+        assert allocation['risk_tolerance'] == tier
+        assert allocation['volatility'] <= cap * 100
+        assert abs(sum(allocation['weights'].values()) - 100) < 1
+        plans[tier] = allocation
+    assert (plans['conservative']['expected_return'] < plans['moderate']['expected_return']
+            < plans['aggressive']['expected_return'])
+    short = advisor.frontier({'risk_tolerance': 'aggressive', 'target_months': 12})
+    assert short['allocation']['volatility'] < plans['aggressive']['volatility']
+    assert len(short['frontier']) == len(frontier.vols)
+
+    try:
+        covariance([0.1, 0.2], [[1, 2], [2, 1]])
+        assert False, 'non-PSD correlation accepted'
+    except ValueError:
+        pass
+    print("SUCCESS")
+
+
+if __name__ == "__main__":
+    test_long_horizon_projection()
+    test_monte_carlo_simulation()
+    test_goal_solver()
+    test_efficient_frontier()